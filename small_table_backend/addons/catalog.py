@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+
+from api.cache import LRUCache
+from .models import Addon
+
+# (package_id, version, changed_at) -> grouped addons; every Addon / AddonCategory write
+# bumps the package menu version (packages.signals), so old entries are never asked for again
+_catalog_cache = LRUCache(maxsize=getattr(settings, 'ADDON_CATALOG_CACHE_SIZE', 1000))
+
+
+def build_addon_catalog(package_id):
+    """
+    Active addons of the package grouped by category, in one query:
+    [(category data, [(addon, addon data), ...]), ...] – categories and addons by name.
+    """
+    addons = Addon.objects.filter(package_id=package_id, is_active=True) \
+        .select_related('category') \
+        .order_by('category__name', 'category_id', 'name', 'id')
+
+    groups = []
+    for addon in addons:
+        if not groups or groups[-1][0]['id'] != addon.category_id:
+            groups.append(({
+                'id': addon.category_id,
+                'name': addon.category.name,
+                'description': addon.category.description,
+            }, []))
+
+        groups[-1][1].append((addon, {
+            'id': addon.id,
+            'name': addon.name,
+            'price': str(addon.price),
+            'pricing_type': addon.pricing_type,
+            'is_included': addon.is_included,
+        }))
+    return groups
+
+
+def get_addon_catalog(package):
+    """Grouped addons of the package version (build_addon_catalog), from the cache when built."""
+    try:
+        document = package.menu_document
+    except ObjectDoesNotExist:
+        # חבילה בלי מסמך תפריט – בלי גרסה, ולכן בלי cache
+        return build_addon_catalog(package.id)
+
+    key = (package.id, document.version, document.changed_at)
+    groups = _catalog_cache.get(key)
+    if groups is None:
+        groups = build_addon_catalog(package.id)
+        _catalog_cache.set(key, groups)
+    return groups
+
+
+def addon_catalog(package, guests_count):
+    """
+    The order wizard's addon step: active addons grouped by category, each with its
+    price for guests_count (Addon.calculate_price_for_guests), and the total of the
+    addons that are included by default.
+    """
+    categories = []
+    included_total = 0
+    for category, addons in get_addon_catalog(package):
+        entries = []
+        for addon, data in addons:
+            price = addon.calculate_price_for_guests(guests_count)
+            if addon.is_included:
+                included_total += price
+            entries.append({**data, 'price_for_guests': str(price)})
+        categories.append({**category, 'addons': entries})
+
+    return {
+        'package': package.id,
+        'guests': guests_count,
+        'included_total': f"{included_total:.2f}",
+        'categories': categories,
+    }
+
+
+def clear_addon_catalogs():
+    _catalog_cache.clear()
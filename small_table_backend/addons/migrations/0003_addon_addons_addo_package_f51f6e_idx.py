@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('addons', '0002_initial'),
+        ('packages', '0004_packagemenudocument_changed_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='addon',
+            index=models.Index(fields=['package', 'is_included', 'is_active'], name='addons_addo_package_f51f6e_idx'),
+        ),
+    ]
@@ -120,6 +120,10 @@ class Addon(models.Model):
         verbose_name_plural = 'תוספות בחבילות'
         ordering = ['package', 'category', 'name']
         unique_together = ('package', 'name')
+        indexes = [
+            # סכום התוספות הכלולות לכל חבילה (packages.services.with_guest_totals)
+            models.Index(fields=['package', 'is_included', 'is_active']),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name} ({self.package.name})"
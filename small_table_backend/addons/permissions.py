@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from users.roles import get_role_context
+
 
 class IsAdminOrReadOnly(permissions.BasePermission):
     """
@@ -15,11 +17,7 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         if not user or not user.is_authenticated:
             return False
 
-        has_admin_role = getattr(user, 'user_roles', None) and user.user_roles.filter(
-            role__name='admin'
-        ).exists()
-
-        return bool(has_admin_role or user.is_staff or user.is_superuser)
+        return get_role_context(request).is_admin
 
 
 class IsAddonOwnerOrAdmin(permissions.BasePermission):
@@ -39,15 +37,13 @@ class IsAddonOwnerOrAdmin(permissions.BasePermission):
         if not user or not user.is_authenticated:
             return False
 
-        has_admin_role = getattr(user, 'user_roles', None) and user.user_roles.filter(
-            role__name='admin'
-        ).exists()
+        role_context = get_role_context(request)
 
-        if has_admin_role or user.is_staff or user.is_superuser:
+        if role_context.is_admin:
             return True
 
         # ספקים רשאים להגיש בקשות כתיבה – נבדוק בעלות ברמת האובייקט
-        return hasattr(user, 'vendor_profile')
+        return role_context.is_vendor
 
     def has_object_permission(self, request, view, obj):
         user = request.user
@@ -56,15 +52,13 @@ class IsAddonOwnerOrAdmin(permissions.BasePermission):
             return False
 
         # admin
-        has_admin_role = getattr(user, 'user_roles', None) and user.user_roles.filter(
-            role__name='admin'
-        ).exists()
+        role_context = get_role_context(request)
 
-        if has_admin_role or user.is_staff or user.is_superuser:
+        if role_context.is_admin:
             return True
 
         # ספק בעל החבילה
-        if hasattr(user, 'vendor_profile') and obj.package.vendor == user.vendor_profile:
+        if role_context.is_vendor and obj.package.vendor_id == role_context.vendor_id:
             return True
 
         return False
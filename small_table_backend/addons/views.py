@@ -5,9 +5,12 @@ from django_filters.rest_framework import DjangoFilterBackend
 from .models import AddonCategory, Addon
 from .serializers import AddonCategorySerializer, AddonSerializer
 from .permissions import IsAdminOrReadOnly, IsAddonOwnerOrAdmin
+from api.conditional import ConditionalGetMixin
+from api.pagination import CatalogPageNumberPagination
+from users.roles import get_role_context
 
 
-class AddonCategoryViewSet(viewsets.ModelViewSet):
+class AddonCategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     Manage add-on categories:
     - list/retrieve: read
@@ -15,6 +18,7 @@ class AddonCategoryViewSet(viewsets.ModelViewSet):
     """
     queryset = AddonCategory.objects.all()
     serializer_class = AddonCategorySerializer
+    pagination_class = CatalogPageNumberPagination
 
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['is_active']
@@ -30,7 +34,7 @@ class AddonCategoryViewSet(viewsets.ModelViewSet):
         return [p() for p in permission_classes]
 
 
-class AddonViewSet(viewsets.ModelViewSet):
+class AddonViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     Manage package add-ons:
 
@@ -41,6 +45,10 @@ class AddonViewSet(viewsets.ModelViewSet):
 
     """
     serializer_class = AddonSerializer
+    pagination_class = CatalogPageNumberPagination
+
+    # package_name / category_name
+    conditional_fields = ('updated_at', 'package__updated_at', 'category__updated_at')
 
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['package', 'category', 'is_active', 'pricing_type', 'is_included']
@@ -62,15 +70,13 @@ class AddonViewSet(viewsets.ModelViewSet):
             return qs.filter(is_active=True)
 
         # admin – רואה הכל
-        has_admin_role = getattr(user, 'user_roles', None) and user.user_roles.filter(
-            role__name='admin'
-        ).exists()
-        if user.is_staff or user.is_superuser or has_admin_role:
+        role_context = get_role_context(self.request)
+        if role_context.is_admin:
             return qs
 
         # ספק – רואה רק תוספות של החבילות שלו
-        if hasattr(user, 'vendor_profile'):
-            return qs.filter(package__vendor=user.vendor_profile)
+        if role_context.is_vendor:
+            return qs.filter(package__vendor_id=role_context.vendor_id)
 
         # לקוח רגיל – רק תוספות פעילות
         return qs.filter(is_active=True)
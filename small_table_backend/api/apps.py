@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from django.conf import settings
+
+        from . import image_fields, search_indexes  # noqa: F401
+        from .request_logging import start_queue_logging
+
+        for logger_name in getattr(settings, 'QUEUE_LOGGERS', []):
+            start_queue_logging(logger_name)
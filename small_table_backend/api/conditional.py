@@ -0,0 +1,97 @@
+import functools
+import hashlib
+
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified (conditional GET) for list and retrieve of a ModelViewSet:
+    - validators come from `conditional_fields` – the updated_at of the row and of the
+      related rows its serializer shows (lookups, e.g. 'vendor__updated_at')
+    - list: MAX of each field + COUNT of the filtered queryset, in one aggregate query;
+      ETag only – a deleted row lowers the COUNT but not the MAX, so a Last-Modified
+      from the row dates would keep answering 304 to If-Modified-Since
+    - retrieve: the loaded instance – no extra query when the relations are select_related
+    - a matching If-None-Match / If-Modified-Since returns 304 before the page is
+      fetched and serialized
+    - the ETag also covers the URL, the media type and the queryset SQL, so role-scoped
+      querysets never share a validator
+    """
+    conditional_fields = ('updated_at',)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_response(
+            request,
+            self.get_list_validators(queryset),
+            functools.partial(super().list, request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return self.conditional_response(
+            request,
+            self.get_object_validators(instance),
+            lambda: Response(self.get_serializer(instance).data),
+        )
+
+    def conditional_response(self, request, validators, render):
+        """304 when the client copy is still valid, otherwise render(); both carry the validators."""
+        etag, last_modified = validators
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=int(last_modified.timestamp()) if last_modified else None,
+        )
+        if response is None:
+            response = render()
+
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        # התוכן תלוי במשתמש (תוספות לא פעילות, חבילות של ספק...) – cache משותף לא יחלק אותו
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def get_list_validators(self, queryset):
+        aggregates = {
+            f'max_{n}': Max(field) for n, field in enumerate(self.conditional_fields)
+        }
+        row = queryset.order_by().aggregate(count=Count('pk'), **aggregates)
+
+        try:
+            sql, params = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            sql, params = '', ()
+
+        timestamps = [row[key] for key in aggregates]
+        etag, _ = self.make_validators([sql, params, row['count']], timestamps)
+        return etag, None
+
+    def get_object_validators(self, instance):
+        timestamps = [self.resolve_field(instance, field) for field in self.conditional_fields]
+        return self.make_validators([instance._meta.label, instance.pk], timestamps)
+
+    @staticmethod
+    def resolve_field(instance, lookup):
+        value = instance
+        for name in lookup.split('__'):
+            # relation חסרה (למשל one-to-one שעוד לא נוצר) – אין תאריך
+            value = getattr(value, name, None)
+            if value is None:
+                return None
+        return value
+
+    def make_validators(self, parts, timestamps):
+        request = self.request
+        parts = [request.build_absolute_uri(), request.accepted_media_type, *parts]
+        parts += [timestamp.isoformat() if timestamp else '' for timestamp in timestamps]
+        etag = '"%s"' % hashlib.md5(repr(parts).encode()).hexdigest()
+
+        last_modified = max((timestamp for timestamp in timestamps if timestamp), default=None)
+        return etag, last_modified
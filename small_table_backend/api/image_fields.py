@@ -0,0 +1,9 @@
+from packages.models import Package
+from products.models import Product
+from vendors.models import VendorProfile
+from .images import register
+
+# תמונות שמקבלות גרסאות מוקטנות (WebP / JPEG) – ה-serializers שלהן מחזירים image_srcset
+register(Product, 'image')
+register(Package, 'image')
+register(VendorProfile, 'image')
@@ -0,0 +1,249 @@
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.db.models.signals import post_save
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+logger = logging.getLogger('small_table.images')
+
+# format -> (Pillow format, file extension, save options)
+FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def render_variants(data, widths, formats):
+    """
+    Resized copies of one image (bytes) – runs in a worker process, no Django here:
+    {format: {width: bytes}} for every width smaller than the original (never upscaled;
+    an image narrower than all widths gets one copy at its own width).
+    EXIF orientation is applied; JPEG copies of transparent images get a white background.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        image.load()
+
+    sizes = [width for width in sorted(widths) if width < image.width] or [image.width]
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    variants = {name: {} for name in formats}
+    for width in sizes:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+
+        for name in formats:
+            pillow_format, _, options = FORMATS[name]
+            copy = resized
+            if pillow_format == 'JPEG' and has_alpha:
+                copy = Image.new('RGB', resized.size, 'white')
+                copy.paste(resized, mask=resized.getchannel('A'))
+
+            buffer = io.BytesIO()
+            copy.save(buffer, pillow_format, **options)
+            variants[name][width] = buffer.getvalue()
+
+    return variants
+
+
+_lock = threading.Lock()
+_workers = None
+
+
+def get_workers():
+    """
+    (thread pool, process pool) of the pipeline, created on first use:
+    a background thread reads the original, waits for the worker process
+    that resizes it, and stores the result – the request never waits.
+    """
+    global _workers
+    with _lock:
+        if _workers is None:
+            count = getattr(settings, 'IMAGE_VARIANT_WORKERS', 2)
+            _workers = (
+                ThreadPoolExecutor(max_workers=count, thread_name_prefix='image-variants'),
+                # spawn – fork of a process with threads (logging listener, pool) is not safe
+                ProcessPoolExecutor(max_workers=count, mp_context=multiprocessing.get_context('spawn')),
+            )
+        return _workers
+
+
+def shutdown_workers(wait=True):
+    global _workers
+    with _lock:
+        if _workers is not None:
+            for executor in _workers:
+                executor.shutdown(wait=wait)
+            _workers = None
+
+
+class ImageVariants:
+    """
+    Variant pipeline of one ImageField (e.g. Product.image), stored in the JSONField
+    next to it (image -> image_variants):
+    {"source": <original name>, "webp": {"320": <name>, ...}, "jpeg": {...}}
+    The variants belong to the original they were built from – when the image is
+    replaced they are ignored (ImageSrcsetField) until the new ones are stored.
+    """
+
+    def __init__(self, model, field):
+        self.model = model
+        self.field = field
+        self.variants_field = f'{field}_variants'
+        self.label = f'{model._meta.label_lower}.{field}'
+        # (pk, source) of the builds that were submitted and did not finish yet
+        self.pending = set()
+        self.pending_lock = threading.Lock()
+
+    def is_current(self, instance):
+        file = getattr(instance, self.field)
+        variants = getattr(instance, self.variants_field) or {}
+        return bool(file) and variants.get('source') == file.name
+
+    def schedule(self, pk, source):
+        """Build the variants of `source` after the current transaction commits."""
+        transaction.on_commit(lambda: self.submit(pk, source))
+
+    def submit(self, pk, source):
+        """
+        Start the build of `source` – unless one for the same row and file is still
+        pending (e.g. the row was saved again, with another field, during the build).
+        Returns False when it was skipped.
+        """
+        key = (pk, source)
+        with self.pending_lock:
+            if key in self.pending:
+                return False
+            self.pending.add(key)
+
+        if getattr(settings, 'IMAGE_VARIANTS_ASYNC', True):
+            get_workers()[0].submit(self.build_in_background, pk, source)
+        else:
+            try:
+                self.build(pk, source)
+            finally:
+                self.finished(key)
+        return True
+
+    def finished(self, key):
+        with self.pending_lock:
+            self.pending.discard(key)
+
+    def build_in_background(self, pk, source):
+        try:
+            self.build(pk, source, pool=get_workers()[1])
+        except Exception:
+            logger.exception('image variants failed', extra={'fields': {'image': self.label, 'id': pk}})
+        finally:
+            self.finished((pk, source))
+            # חיבורי ה-DB של ה-thread הזה – לא נשארים פתוחים אחרי העבודה
+            connections.close_all()
+
+    def build(self, pk, source, pool=None):
+        """Render (in `pool`, or here) and store the variants of `source`, then save them on the row."""
+        storage = self.model._meta.get_field(self.field).storage
+        with storage.open(source, 'rb') as file:
+            data = file.read()
+
+        widths = getattr(settings, 'IMAGE_VARIANT_WIDTHS', (320, 640, 1280))
+        formats = list(getattr(settings, 'IMAGE_VARIANT_FORMATS', FORMATS))
+        if pool is not None:
+            rendered = pool.submit(render_variants, data, widths, formats).result()
+        else:
+            rendered = render_variants(data, widths, formats)
+
+        root = os.path.splitext(source)[0]
+        variants = {'source': source}
+        for name, copies in rendered.items():
+            extension = FORMATS[name][1]
+            variants[name] = {
+                str(width): storage.save(f'variants/{root}_{width}w.{extension}', ContentFile(content))
+                for width, content in copies.items()
+            }
+
+        with transaction.atomic():
+            instance = self.model._default_manager.select_for_update().filter(pk=pk).first()
+            # התמונה הוחלפה (או נמחקה) בזמן הבנייה – הגרסאות האלה כבר לא שלה
+            if instance is None or getattr(instance, self.field).name != source:
+                self.delete_files(storage, variants)
+                return None
+
+            previous = getattr(instance, self.variants_field) or {}
+            setattr(instance, self.variants_field, variants)
+            # דרך save – כדי שמסמכי התפריט / ה-ETag יתעדכנו
+            instance.save(update_fields=[self.variants_field, 'updated_at'])
+
+        self.delete_files(storage, previous)
+        return variants
+
+    @staticmethod
+    def delete_files(storage, variants):
+        for name, copies in variants.items():
+            if name != 'source':
+                for stored in copies.values():
+                    storage.delete(stored)
+
+    def saved(self, sender, instance, update_fields=None, **kwargs):
+        if update_fields is not None and self.field not in update_fields:
+            return
+        file = getattr(instance, self.field)
+        if file and not self.is_current(instance):
+            self.schedule(instance.pk, file.name)
+
+
+_registry = {}
+
+
+def register(model, field='image'):
+    """Build resized variants of `field` whenever a new file is saved in it."""
+    variants = ImageVariants(model, field)
+    _registry[variants.label] = variants
+    post_save.connect(variants.saved, sender=model, weak=False, dispatch_uid=f'images:{variants.label}')
+    return variants
+
+
+def get_image_variants(model, field='image'):
+    return _registry.get(f'{model._meta.label_lower}.{field}')
+
+
+class ImageSrcsetField(serializers.Field):
+    """
+    Read-only srcset strings of an image's variants, per format:
+    {"webp": "<url> 320w, <url> 640w", "jpeg": "..."} – null until the variants of
+    the current image are built (clients fall back to the original image URL).
+    """
+
+    def __init__(self, image_field='image', **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        self.image_field = image_field
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        file = getattr(instance, self.image_field)
+        variants = getattr(instance, f'{self.image_field}_variants') or {}
+        if not file or variants.get('source') != file.name:
+            return None
+
+        request = self.context.get('request')
+        srcset = {}
+        for name, copies in variants.items():
+            if name == 'source':
+                continue
+            urls = []
+            for width, stored in sorted(copies.items(), key=lambda copy: int(copy[0])):
+                url = file.storage.url(stored)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                urls.append(f'{url} {width}w')
+            srcset[name] = ', '.join(urls)
+        return srcset
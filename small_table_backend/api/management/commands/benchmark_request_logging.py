@@ -0,0 +1,83 @@
+import logging
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueListener
+from queue import SimpleQueue
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from api.request_logging import DeferredQueueHandler, StructuredFormatter
+
+
+class Command(BaseCommand):
+    help = (
+        "Latency of an endpoint under concurrent load with request logging off, "
+        "queued (QueueHandler / QueueListener) and synchronous (handler on the request thread)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='/api/packages/')
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--threads', type=int, default=4)
+
+    def handle(self, *args, **options):
+        target = logging.getLogger('small_table')
+        saved_handlers, saved_level = target.handlers, target.level
+
+        # אותו formatter כמו בפרודקשן, נכתב ל-devnull – מודדים את העבודה, לא את הטרמינל
+        sink = logging.StreamHandler(open(os.devnull, 'w'))
+        sink.setFormatter(StructuredFormatter())
+
+        results = {}
+        try:
+            target.setLevel(logging.WARNING)
+            results['off'] = self.run(options)
+
+            target.setLevel(logging.INFO)
+            records = SimpleQueue()
+            listener = QueueListener(records, sink)
+            target.handlers = [DeferredQueueHandler(records)]
+            listener.start()
+            try:
+                results['queue'] = self.run(options)
+            finally:
+                listener.stop()
+
+            target.handlers = [sink]
+            results['sync'] = self.run(options)
+        finally:
+            target.handlers, target.level = saved_handlers, saved_level
+            sink.stream.close()
+
+        self.stdout.write(f"{options['url']} – {options['requests']} requests, {options['threads']} threads")
+        self.stdout.write(f"{'mode':<8}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}{'vs off':>10}")
+        off = results['off']['mean']
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{mode:<8}{result['p50']:>10.2f}{result['p95']:>10.2f}{result['mean']:>10.2f}"
+                f"{(result['mean'] - off) / off:>+10.1%}"
+            )
+
+    def run(self, options):
+        host = next((host for host in settings.ALLOWED_HOSTS if host not in ('*', '')), 'localhost')
+        url = options['url']
+
+        def request(_):
+            client = Client(HTTP_HOST=host.lstrip('.'))
+            start = time.perf_counter()
+            client.get(url).getvalue()
+            return (time.perf_counter() - start) * 1000
+
+        with ThreadPoolExecutor(options['threads']) as pool:
+            list(pool.map(request, range(options['threads'] * 2)))  # חימום
+            timings = sorted(pool.map(request, range(options['requests'])))
+
+        return {
+            'p50': timings[len(timings) // 2],
+            'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+            'mean': statistics.fmean(timings),
+        }
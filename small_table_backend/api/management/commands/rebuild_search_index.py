@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.search import registered_indexes
+
+
+class Command(BaseCommand):
+    help = "Recreate the full-text search documents (api.SearchDocument) from the indexed tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'entities', nargs='*',
+            help="Model labels to rebuild, e.g. packages.package (default: all indexed models).",
+        )
+
+    def handle(self, *args, **options):
+        indexes = {index.entity: index for index in registered_indexes()}
+
+        entities = [entity.lower() for entity in options['entities']] or list(indexes)
+        unknown = sorted(set(entities) - set(indexes))
+        if unknown:
+            raise CommandError(f"Not indexed: {', '.join(unknown)} (indexed: {', '.join(sorted(indexes))})")
+
+        for entity in entities:
+            with transaction.atomic():
+                count = indexes[entity].rebuild()
+            self.stdout.write(f"{entity}: {count} documents")
+
+        if connection.vendor == 'sqlite':
+            # דוחס את אינדקס ה-FTS5 אחרי הרבה מחיקות / הוספות
+            with connection.cursor() as cursor:
+                cursor.execute("INSERT INTO api_searchdocument_fts(api_searchdocument_fts) VALUES ('optimize')")
+
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
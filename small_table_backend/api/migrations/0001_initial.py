@@ -0,0 +1,80 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:20
+
+from django.db import migrations, models
+
+# FTS5 external-content table kept in sync with api_searchdocument by triggers
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE api_searchdocument_fts USING fts5(
+        body, content='api_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER api_searchdocument_fts_ai AFTER INSERT ON api_searchdocument BEGIN
+        INSERT INTO api_searchdocument_fts(rowid, body) VALUES (new.id, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER api_searchdocument_fts_ad AFTER DELETE ON api_searchdocument BEGIN
+        INSERT INTO api_searchdocument_fts(api_searchdocument_fts, rowid, body) VALUES ('delete', old.id, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER api_searchdocument_fts_au AFTER UPDATE ON api_searchdocument BEGIN
+        INSERT INTO api_searchdocument_fts(api_searchdocument_fts, rowid, body) VALUES ('delete', old.id, old.body);
+        INSERT INTO api_searchdocument_fts(rowid, body) VALUES (new.id, new.body);
+    END
+    """,
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS api_searchdocument_fts_ai",
+    "DROP TRIGGER IF EXISTS api_searchdocument_fts_ad",
+    "DROP TRIGGER IF EXISTS api_searchdocument_fts_au",
+    "DROP TABLE IF EXISTS api_searchdocument_fts",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE INDEX api_searchdocument_body_gin ON api_searchdocument USING GIN (to_tsvector('simple', body))",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS api_searchdocument_body_gin",
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        # שאר מסדי הנתונים – api.search חוזר ל-icontains
+        for sql in statements.get(schema_editor.connection.vendor, ()):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(max_length=100, verbose_name='ישות')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='מזהה')),
+                ('body', models.TextField(blank=True, default='', verbose_name='טקסט לחיפוש')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='תאריך עדכון')),
+            ],
+            options={
+                'verbose_name': 'מסמך חיפוש',
+                'verbose_name_plural': 'מסמכי חיפוש',
+                'constraints': [models.UniqueConstraint(fields=('entity', 'object_id'), name='unique_search_document')],
+            },
+        ),
+        migrations.RunPython(
+            run_for_vendor({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            run_for_vendor({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-17 22:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchIndexBuild',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(max_length=100, unique=True, verbose_name='ישות')),
+                ('built_at', models.DateTimeField(auto_now=True, verbose_name='תאריך בנייה')),
+            ],
+            options={
+                'verbose_name': 'בניית אינדקס חיפוש',
+                'verbose_name_plural': 'בניות אינדקס חיפוש',
+            },
+        ),
+    ]
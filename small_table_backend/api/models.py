@@ -1,3 +1,66 @@
 from django.db import models
 
-# Create your models here.
+
+class SearchDocument(models.Model):
+    """
+    Denormalized search text of one indexed row (api.search):
+    - entity: model label, e.g. 'packages.package'
+    - body: the row's search_fields (incl. joined columns), Hebrew-normalized words
+    Full-text indexed by an FTS5 table on SQLite / a GIN index on PostgreSQL (migration 0001).
+    """
+
+    entity = models.CharField(
+        max_length=100,
+        verbose_name='ישות'
+    )
+
+    object_id = models.PositiveBigIntegerField(
+        verbose_name='מזהה'
+    )
+
+    body = models.TextField(
+        blank=True,
+        default='',
+        verbose_name='טקסט לחיפוש'
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='תאריך עדכון'
+    )
+
+    class Meta:
+        verbose_name = 'מסמך חיפוש'
+        verbose_name_plural = 'מסמכי חיפוש'
+        constraints = [
+            models.UniqueConstraint(fields=['entity', 'object_id'], name='unique_search_document'),
+        ]
+
+    def __str__(self):
+        return f"{self.entity} #{self.object_id}"
+
+
+class SearchIndexBuild(models.Model):
+    """
+    Marker of an index (api.search) that rebuild_search_index filled from its whole table.
+    Until it exists, the saves of single rows keep only a partial set of documents,
+    so ?search= stays on icontains.
+    """
+
+    entity = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name='ישות'
+    )
+
+    built_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='תאריך בנייה'
+    )
+
+    class Meta:
+        verbose_name = 'בניית אינדקס חיפוש'
+        verbose_name_plural = 'בניות אינדקס חיפוש'
+
+    def __str__(self):
+        return f"{self.entity} ({self.built_at})"
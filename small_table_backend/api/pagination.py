@@ -0,0 +1,85 @@
+import hashlib
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Default pagination for all list endpoints – keyset (cursor) pagination:
+    - ordered on (created_at, id), backed by an index on the high-volume tables
+    - no COUNT and no OFFSET, so a page costs the same on page 1 and page 10,000
+    - respects the view's ordering / ?ordering=, with id added as a tie-breaker
+    """
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            direction = '-' if ordering[0].startswith('-') else ''
+            ordering += (f'{direction}id',)
+
+        return ordering
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator that does not run COUNT(*) on every request:
+    - large unfiltered tables on PostgreSQL – the planner estimate (pg_class.reltuples)
+    - otherwise – an exact count, cached for a short time per query
+    """
+    count_timeout = 60
+    estimate_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, 'query'):
+            return len(queryset)
+
+        sql, params = queryset.query.sql_with_params()
+        key = 'pagination:count:' + hashlib.md5(f'{sql}{params!r}'.encode()).hexdigest()
+
+        count = cache.get(key)
+        if count is None:
+            count = self._estimated_count(queryset)
+            if count is None:
+                count = queryset.count()
+            cache.set(key, count, self.count_timeout)
+
+        return count
+
+    def _estimated_count(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql' or queryset.query.where:
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+
+        if not row or row[0] < self.estimate_threshold:
+            return None
+        return row[0]
+
+
+class CatalogPageNumberPagination(PageNumberPagination):
+    """
+    Opt-in page-number pagination for small catalogs (categories, roles, addons...),
+    where clients want page numbers and a total count.
+    The count is cached / estimated (CachedCountPaginator).
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    django_paginator_class = CachedCountPaginator
@@ -0,0 +1,26 @@
+from rest_framework.renderers import BaseRenderer
+
+
+class StreamingRenderer(BaseRenderer):
+    """
+    Renderer for views that return a StreamingHttpResponse themselves.
+    Only lets content negotiation (?format= / Accept) pick the format –
+    the body is written by the view, row by row.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # only used for error responses (e.g. 401/403) – the stream itself is not rendered
+        if data is None:
+            return b''
+        return str(data).encode(self.charset)
+
+
+class CSVStreamRenderer(StreamingRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONStreamRenderer(StreamingRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
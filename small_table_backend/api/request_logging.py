@@ -0,0 +1,160 @@
+import atexit
+import json
+import logging
+import queue
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+
+from django.db import connection
+from django.utils.functional import empty
+
+logger = logging.getLogger('small_table.requests')
+
+# שדות ה-extra שנכתבים לכל רשומה מובנית, בסדר הזה
+STRUCTURED_FIELDS = (
+    'request_id', 'method', 'endpoint', 'path', 'status',
+    'user_id', 'vendor_id', 'duration_ms', 'queries',
+)
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, logger, message and the structured
+    extra fields of the record (STRUCTURED_FIELDS, plus `fields` for event data).
+    Runs on the listener thread – request handlers never pay for it.
+    """
+
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for name in STRUCTURED_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                data[name] = value
+        data.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler for an in-process queue: the record is enqueued as is – message
+    interpolation and formatting are left to the QueueListener thread.
+    The extra values are plain ids / numbers, so sharing the record is safe.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+_listeners = {}
+
+
+def start_queue_logging(logger_name):
+    """
+    Move the handlers configured (settings.LOGGING) on logger_name behind a queue:
+    the logger keeps only a DeferredQueueHandler, and a QueueListener thread runs
+    the real handlers. Idempotent; the listener is flushed and stopped at exit.
+    """
+    target = logging.getLogger(logger_name)
+    if logger_name in _listeners or not target.handlers:
+        return _listeners.get(logger_name)
+
+    records = queue.SimpleQueue()
+    listener = QueueListener(records, *target.handlers, respect_handler_level=True)
+    target.handlers = [DeferredQueueHandler(records)]
+    listener.start()
+
+    if not _listeners:
+        atexit.register(stop_queue_logging)
+    _listeners[logger_name] = listener
+    return listener
+
+
+def stop_queue_logging():
+    for listener in _listeners.values():
+        listener.stop()
+    _listeners.clear()
+
+
+class QueryCounter:
+    """connection.execute_wrapper that counts the queries of one request."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def request_user_id(request):
+    user = request.__dict__.get('user')
+    # request.user עצלני שלא נקרא (לא DRF) – לא מפעילים בגללנו שאילתת session
+    if user is None or getattr(user, '_wrapped', None) is empty:
+        return None
+    return user.pk if user.is_authenticated else None
+
+
+class RequestLogMiddleware:
+    """
+    One structured record per request on the 'small_table.requests' logger:
+    request id (X-Request-ID, generated when missing and echoed back), user id,
+    vendor id, endpoint (URL name), status, duration and query count.
+    Only the record is built here – the queue listener formats and writes it.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+        if not logger.isEnabledFor(logging.INFO):
+            response = self.get_response(request)
+            response['X-Request-ID'] = request.request_id
+            return response
+
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        # ה-role context כבר נטען ע"י ה-view (אם בכלל) – לא טוענים אותו בשביל הלוג
+        role_context = getattr(request, '_role_context', None)
+        match = request.resolver_match
+
+        logger.info('request', extra={
+            'request_id': request.request_id,
+            'method': request.method,
+            'endpoint': match.view_name if match else None,
+            'path': request.path,
+            'status': response.status_code,
+            'user_id': request_user_id(request),
+            'vendor_id': getattr(role_context, 'vendor_id', None),
+            'duration_ms': round(duration * 1000, 2),
+            'queries': counter.count,
+        })
+
+        response['X-Request-ID'] = request.request_id
+        return response
+
+
+def log_event(request, message, **fields):
+    """
+    Structured event of a view (e.g. a product was created) with the request's id,
+    user and endpoint – enqueued like the request records.
+    """
+    match = getattr(request, 'resolver_match', None)
+    logging.getLogger('small_table.events').info(message, extra={
+        'request_id': getattr(request, 'request_id', None),
+        'endpoint': match.view_name if match else None,
+        'user_id': request_user_id(getattr(request, '_request', request)),
+        'fields': fields,
+    })
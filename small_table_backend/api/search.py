@@ -0,0 +1,273 @@
+import re
+
+from django.db import connection
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from rest_framework import filters
+
+# טעמים וניקוד (U+0591–U+05C7), גרש / גרשיים ומרכאות – לא חלק מהמילה
+NIQQUD = re.compile('[\u0591-\u05c7]')
+GERESH = re.compile('[\'"\u05f3\u05f4]')
+FINAL_LETTERS = str.maketrans('ךםןףץ', 'כמנפצ')
+WORD = re.compile(r'\w+')
+
+
+def normalize(text):
+    """Hebrew-aware normalization of documents and queries: no niqqud, final letters folded, casefolded."""
+    text = str(text).replace('\u05be', ' ')  # מקף עברי מפריד מילים
+    text = NIQQUD.sub('', text)
+    text = GERESH.sub('', text)
+    return text.translate(FINAL_LETTERS).casefold()
+
+
+def tokenize(text):
+    return WORD.findall(normalize(text))
+
+
+class SearchIndex:
+    """
+    Search document definition of one model: the values of `fields` (lookups,
+    like a viewset's search_fields), joined into one normalized SearchDocument.body.
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = list(fields)
+        self.entity = model._meta.label_lower
+
+        # 'vendor__user__email' -> related path 'vendor__user' with attribute 'email'
+        self.related = {}
+        for field in self.fields:
+            path, _, name = field.rpartition('__')
+            if path:
+                self.related.setdefault(path, set()).add(name)
+
+    def queryset(self):
+        return self.model._default_manager.select_related(*self.related).order_by()
+
+    def is_built(self):
+        """
+        True once rebuild_search_index filled the index from the whole table (SearchIndexBuild).
+        The documents that single saves add before that cover only some of the rows,
+        so searching them would hide the rest. Checked per search – one indexed lookup.
+        """
+        from .models import SearchIndexBuild
+
+        return SearchIndexBuild.objects.filter(entity=self.entity).exists()
+
+    def document(self, obj):
+        words = []
+        for field in self.fields:
+            value = obj
+            for name in field.split('__'):
+                value = getattr(value, name, None)
+                if value is None:
+                    break
+            if value is not None:
+                words += tokenize(value)
+        return ' '.join(words)
+
+    def update(self, objects):
+        """Upsert the documents of the given rows – one INSERT ... ON CONFLICT per batch."""
+        from .models import SearchDocument
+
+        return SearchDocument.objects.bulk_create(
+            [
+                SearchDocument(entity=self.entity, object_id=obj.pk, body=self.document(obj))
+                for obj in objects
+            ],
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['entity', 'object_id'],
+            update_fields=['body', 'updated_at'],
+        )
+
+    def delete(self, object_ids):
+        from .models import SearchDocument
+
+        SearchDocument.objects.filter(entity=self.entity, object_id__in=object_ids).delete()
+
+    def rebuild(self, chunk_size=1000):
+        """Recreate every document of the table and mark the index as built."""
+        from .models import SearchDocument, SearchIndexBuild
+
+        SearchDocument.objects.filter(entity=self.entity).delete()
+        batch = []
+        count = 0
+        for obj in self.queryset().iterator(chunk_size=chunk_size):
+            batch.append(obj)
+            if len(batch) >= chunk_size:
+                count += len(self.update(batch))
+                batch = []
+        if batch:
+            count += len(self.update(batch))
+
+        SearchIndexBuild.objects.update_or_create(entity=self.entity)
+        return count
+
+
+_indexes = {}
+
+
+def register(model, fields):
+    """
+    Index `model` by `fields` and keep its documents in sync:
+    - the model's save / delete – upsert / delete its document
+    - save of a related model in a lookup (e.g. VendorProfile for 'vendor__business_name') –
+      re-index the rows that point to it
+    queryset.update() / bulk_create() bypass the signals – run rebuild_search_index after them.
+    """
+    index = SearchIndex(model, fields)
+    _indexes[index.entity] = index
+
+    def saved(sender, instance, **kwargs):
+        index.update([index.queryset().get(pk=instance.pk)])
+
+    def deleted(sender, instance, **kwargs):
+        index.delete([instance.pk])
+
+    post_save.connect(saved, sender=model, weak=False, dispatch_uid=f'search:{index.entity}')
+    post_delete.connect(deleted, sender=model, weak=False, dispatch_uid=f'search:{index.entity}')
+
+    for path, names in index.related.items():
+        related_model = model
+        for name in path.split('__'):
+            related_model = related_model._meta.get_field(name).related_model
+
+        def related_saved(sender, instance, created, update_fields=None, path=path, names=names, **kwargs):
+            # שורה חדשה – אין עדיין מסמכים שמצביעים עליה; last_login וכו' – לא בחיפוש
+            if created or (update_fields is not None and not names & set(update_fields)):
+                return
+            index.update(index.queryset().filter(**{path: instance.pk}))
+
+        post_save.connect(
+            related_saved, sender=related_model, weak=False,
+            dispatch_uid=f'search:{index.entity}:{path}',
+        )
+
+    return index
+
+
+def get_index(model):
+    return _indexes.get(model._meta.label_lower)
+
+
+def registered_indexes():
+    return list(_indexes.values())
+
+
+def match_sql(index, words):
+    """
+    (sql, params) selecting the object_ids of the index documents that contain every
+    word (as a prefix), and a function outer_pk -> (sql, params) of the rank of the
+    document of the outer row (higher = better match).
+    None when the database has no full-text backend.
+    """
+    if connection.vendor == 'sqlite':
+        query = ' '.join(f'"{word}"*' for word in words)
+        matches = (
+            "SELECT d.object_id FROM api_searchdocument_fts"
+            " JOIN api_searchdocument d ON d.id = api_searchdocument_fts.rowid"
+            " WHERE api_searchdocument_fts MATCH %s AND d.entity = %s",
+            [query, index.entity],
+        )
+
+        def rank(outer_pk):
+            # MATCH + rowid = – FTS5 ניגש ישר לשורה, bm25 עדיין מחושב מול כל האינדקס
+            return (
+                "SELECT -bm25(api_searchdocument_fts) FROM api_searchdocument_fts"
+                " WHERE api_searchdocument_fts MATCH %s AND api_searchdocument_fts.rowid = ("
+                f"SELECT d.id FROM api_searchdocument d WHERE d.entity = %s AND d.object_id = {outer_pk})",
+                [query, index.entity],
+            )
+
+    elif connection.vendor == 'postgresql':
+        query = ' & '.join(f'{word}:*' for word in words)
+        matches = (
+            "SELECT object_id FROM api_searchdocument"
+            " WHERE entity = %s AND to_tsvector('simple', body) @@ to_tsquery('simple', %s)",
+            [index.entity, query],
+        )
+
+        def rank(outer_pk):
+            return (
+                "SELECT ts_rank(to_tsvector('simple', body), to_tsquery('simple', %s)) FROM api_searchdocument"
+                f" WHERE entity = %s AND object_id = {outer_pk}",
+                [query, index.entity],
+            )
+
+    else:
+        return None
+
+    return matches, rank
+
+
+def search(index, text, limit=None):
+    """
+    {object_id: rank} of the matching documents of the index, best first
+    (every word must match, as a prefix). None when the database has no full-text backend.
+    """
+    words = tokenize(text)
+    if not words:
+        return {}
+    sql = match_sql(index, words)
+    if sql is None:
+        return None
+
+    (matches, params), rank = sql
+    rank_sql, rank_params = rank('m.object_id')
+    sql = f"SELECT m.object_id, ({rank_sql}) AS rank FROM ({matches}) m ORDER BY rank DESC"
+    params = [*params, *rank_params]
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return {object_id: rank for object_id, rank in cursor.fetchall()}
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    Drop-in replacement of SearchFilter for models registered in api.search_indexes:
+    ?search= runs against the full-text index instead of icontains over joined columns,
+    and annotates search_rank (used by RankedOrderingFilter).
+    The match and the rank are subqueries of the viewset's own (scoped) queryset, so
+    pagination and ordering happen in the database – no cutoff before the scoping.
+    Models that are not indexed, databases without FTS and an index that was not built
+    yet (rebuild_search_index) keep the SearchFilter behaviour.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        index = get_index(queryset.model)
+        words = tokenize(' '.join(terms)) if terms else []
+        if not words or index is None:
+            return super().filter_queryset(request, queryset, view)
+
+        sql = match_sql(index, words)
+        if sql is None or not index.is_built():
+            return super().filter_queryset(request, queryset, view)
+
+        (matches, params), rank = sql
+        opts = queryset.model._meta
+        quote = connection.ops.quote_name
+        rank_sql, rank_params = rank(f'{quote(opts.db_table)}.{quote(opts.pk.column)}')
+
+        return queryset.filter(pk__in=RawSQL(matches, params)).annotate(
+            search_rank=RawSQL(rank_sql, rank_params, output_field=FloatField()),
+        )
+
+
+class RankedOrderingFilter(filters.OrderingFilter):
+    """
+    OrderingFilter that puts the best full-text matches first when ?search= is used
+    without an explicit ?ordering=.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) \
+                and 'search_rank' in queryset.query.annotations:
+            return ['-search_rank'] + list(self.get_default_ordering(view) or [])
+        return super().get_ordering(request, queryset, view)
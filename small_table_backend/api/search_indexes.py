@@ -0,0 +1,15 @@
+from packages.models import Package
+from packages.views import PackageViewSet
+from products.models import Product
+from products.views import ProductViewSet
+from reviews.models import Review
+from reviews.views import ReviewViewSet
+from vendors.models import VendorProfile
+from vendors.views import VendorProfileViewSet
+from .search import register
+
+# המסמך של כל ישות = ה-search_fields של ה-viewset שלה, כך ש-?search= מחפש באותם שדות
+register(Package, PackageViewSet.search_fields)
+register(Product, ProductViewSet.search_fields)
+register(VendorProfile, VendorProfileViewSet.search_fields)
+register(Review, ReviewViewSet.search_fields)
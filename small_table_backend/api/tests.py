@@ -1,3 +1,704 @@
-from django.test import TestCase
+import gc
+import io
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from logging.handlers import QueueListener
+from pathlib import Path
+from queue import SimpleQueue
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver
+from django.utils.http import http_date
+from PIL import Image
+from rest_framework.test import APIClient
+
+from addons.catalog import clear_addon_catalogs
+from addons.models import Addon, AddonCategory
+from api.images import get_image_variants, render_variants
+from api.models import SearchDocument, SearchIndexBuild
+from api.request_logging import DeferredQueueHandler, StructuredFormatter
+from api.search import get_index, normalize, search
+from orders.services import PackageCatalog, build_order, save_orders
+from packages.models import Package, PackageCategory, PackageCategoryItem
+from packages.rules import clear_package_rules
+from products.models import Product
+from products.serializers import ProductSerializer
+from reviews.models import Review
+from users.authentication import clear_cached_users
+from users.models import User, Role, UserRole
+from users.roles import clear_role_contexts
+from users.serializers import RoleClaimsTokenObtainPairSerializer
+from vendors.models import VendorProfile
+
+BASELINE_PATH = Path(__file__).with_name('benchmark_baseline.json')
+
+# UPDATE_BENCHMARK_BASELINE=1 python manage.py test api – rewrites the baseline instead of comparing
+UPDATE_BASELINE = os.environ.get('UPDATE_BENCHMARK_BASELINE') == '1'
+
+# latency is compared relative to the whole run (see latency_scale), so a slower
+# machine does not fail every endpoint – only an endpoint that got slower than the rest
+LATENCY_TOLERANCE = 3.0
+LATENCY_SLACK_MS = {'p50_ms': 25.0, 'p95_ms': 100.0}
+SIZE_TOLERANCE = 1.10
+
+# every endpoint runs in a fixed number of queries on the seeded dataset – above this it
+# is an N+1, even in a freshly written baseline
+MAX_QUERIES = 15
+
+
+
+def router_endpoints():
+    """
+    (name, url) for every GET route of the DRF routers included in small_table_config/urls.py:
+    list, detail and the GET extra actions, with the lowest pk as the detail object.
+    """
+    for pattern in get_resolver().url_patterns:
+        if not isinstance(pattern, URLResolver):
+            continue
+        router = getattr(pattern.urlconf_module, 'router', None)
+        if router is None:
+            continue
+
+        base = f'/{pattern.pattern}'
+        for prefix, viewset, basename in router.registry:
+            queryset = viewset.queryset
+            model = queryset.model if queryset is not None else viewset.serializer_class.Meta.model
+            pk = model.objects.order_by('pk').values_list('pk', flat=True).first()
+
+            yield f'{basename}-list', f'{base}{prefix}/'
+            yield f'{basename}-detail', f'{base}{prefix}/{pk}/'
+
+            for extra in viewset.get_extra_actions():
+                if 'get' not in extra.mapping:
+                    continue
+                if extra.detail:
+                    yield f'{basename}-{extra.url_path}', f'{base}{prefix}/{pk}/{extra.url_path}/'
+                else:
+                    yield f'{basename}-{extra.url_path}', f'{base}{prefix}/{extra.url_path}/'
+
+
+class EndpointBenchmarkTests(TestCase):
+    """
+    Query counts, p50/p95 latency and response size of every router GET endpoint,
+    as anonymous / customer / vendor / admin, compared to benchmark_baseline.json:
+    - queries: cold (all caches cleared) – N+1 regressions show up as a higher count
+    - warm_queries: the same request again – a cache that stops hitting shows up here
+    - p50_ms / p95_ms: of `runs` warm requests, scaled by the speed of this machine
+      relative to the baseline run (latency_scale) before they are compared
+    """
+
+    runs = 20
+    roles = ['anonymous', 'customer', 'vendor', 'admin']
+
+    @classmethod
+    def setUpTestData(cls):
+        # הלקוח, הספק וההזמנה הראשונים הם אובייקטי ה-detail של כל התפקידים
+        cls.customer = User.objects.create_user(username='customer', password='pass1234')
+        customers = [cls.customer] + [
+            User.objects.create_user(username=f'customer_{i}', password='pass1234')
+            for i in range(9)
+        ]
+
+        # is_staff – גם ה-views של ניהול משתמשים ותפקידים נמדדים, לא רק ה-403 שלהם
+        cls.admin = User.objects.create_user(username='admin', password='pass1234', is_staff=True)
+        UserRole.objects.create(user=cls.admin, role=Role.objects.create(code=Role.ADMIN, name='admin'))
+
+        addon_categories = [
+            AddonCategory.objects.create(name=name) for name in ('שתייה', 'צוות', 'עיצוב')
+        ]
+
+        vendors = []
+        for v in range(3):
+            user = User.objects.create_user(username=f'vendor_{v}', password='pass1234')
+            vendor = VendorProfile.objects.create(user=user, business_name=f'קייטרינג {v}', is_active=True)
+            vendors.append(vendor)
+
+            products = [
+                Product.objects.create(vendor=vendor, product_name=f'מנה {v}-{i}')
+                for i in range(15)
+            ]
+
+            for p in range(2):
+                package = Package.objects.create(
+                    vendor=vendor, name=f'חבילה {v}-{p}', price_per_person=Decimal('100.00') + p * 20,
+                )
+                for c in range(3):
+                    category = PackageCategory.objects.create(package=package, name=f'קטגוריה {c}')
+                    for i in range(5):
+                        PackageCategoryItem.objects.create(
+                            package_category=category,
+                            product=products[c * 5 + i],
+                            is_premium=i == 4,
+                            extra_price_per_person=Decimal('10.00') if i == 4 else Decimal('0'),
+                        )
+                for a in range(4):
+                    Addon.objects.create(
+                        package=package,
+                        category=addon_categories[a % 3],
+                        name=f'תוספת {a}',
+                        price=Decimal('15.00') if a % 2 else Decimal('500.00'),
+                        pricing_type=Addon.PRICING_PER_PERSON if a % 2 else Addon.PRICING_FIXED,
+                    )
+
+        cls.vendor = vendors[0]
+
+        packages = list(Package.objects.order_by('pk'))
+        catalog = PackageCatalog.load_ids(package.id for package in packages)
+
+        built = []
+        for n in range(60):
+            package = catalog.packages[packages[n % len(packages)].id]
+            items = [
+                {'package_category_id': item.package_category_id, 'product_id': item.product_id}
+                for item in catalog.items.values()
+                if item.package_category.package_id == package.id
+            ][:6]
+            addons = [
+                {'addon_id': addon.id, 'quantity': 1}
+                for addon in catalog.addons.values()
+                if addon.package_id == package.id
+            ][:2]
+            built.append(build_order(
+                catalog, package=package, guests_count=50 + n * 5,
+                items=items, addons=addons, user=customers[n % len(customers)],
+            ))
+        orders = save_orders(built)
+
+        Review.objects.bulk_create(
+            Review(
+                user=order.user, vendor=order.vendor, order=order,
+                rating=1 + n % 5, title=f'חוות דעת {n}', comment='טעים', is_public=n % 3 != 0,
+            )
+            for n, order in enumerate(orders[::2])
+        )
+
+    def client_for(self, role):
+        client = APIClient()
+        user = {
+            'customer': self.customer,
+            'vendor': self.vendor.user,
+            'admin': self.admin,
+        }.get(role)
+        if user is not None:
+            token = RoleClaimsTokenObtainPairSerializer.get_token(user).access_token
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def measure(self, client, url):
+        cache.clear()
+        clear_role_contexts()
+        clear_cached_users()
+        clear_package_rules()
+        clear_addon_catalogs()
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+            body = response.getvalue()
+        queries = len(ctx.captured_queries)
+
+        with CaptureQueriesContext(connection) as ctx:
+            client.get(url).getvalue()
+        warm_queries = len(ctx.captured_queries)
+
+        # like timeit – a GC pause in one run should not read as a regression
+        timings = []
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(self.runs):
+                start = time.perf_counter()
+                client.get(url).getvalue()
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            gc.enable()
+        timings.sort()
+
+        return {
+            'status': response.status_code,
+            'queries': queries,
+            'warm_queries': warm_queries,
+            'p50_ms': round(timings[len(timings) // 2], 2),
+            'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+            'bytes': len(body),
+        }
+
+    @staticmethod
+    def latency_scale(results, baseline):
+        """
+        How much slower (> 1) or faster this run is than the baseline run overall:
+        the median ratio of p50 over the endpoints of both – the machine's speed,
+        not a single endpoint's.
+        """
+        ratios = sorted(
+            result['p50_ms'] / baseline[key]['p50_ms']
+            for key, result in results.items()
+            if baseline.get(key, {}).get('p50_ms')
+        )
+        return ratios[len(ratios) // 2] if ratios else 1.0
+
+    def test_endpoints_do_not_regress(self):
+        endpoints = list(router_endpoints())
+        results = {}
+        for role in self.roles:
+            client = self.client_for(role)
+            for name, url in endpoints:
+                results[f'{role} {name}'] = self.measure(client, url)
+
+        too_many = [
+            f"{key}: {result['queries']} queries (max {MAX_QUERIES})"
+            for key, result in sorted(results.items())
+            if result['queries'] > MAX_QUERIES
+        ]
+        self.assertFalse(too_many, "Endpoints with an N+1:\n" + "\n".join(too_many))
+
+        if UPDATE_BASELINE or not BASELINE_PATH.exists():
+            BASELINE_PATH.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+            self.skipTest(f"Benchmark baseline written to {BASELINE_PATH.name}")
+
+        baseline = json.loads(BASELINE_PATH.read_text())
+        scale = self.latency_scale(results, baseline)
+        failures = []
+        for key, result in sorted(results.items()):
+            expected = baseline.get(key)
+            if expected is None:
+                failures.append(f"{key}: not in the baseline (UPDATE_BENCHMARK_BASELINE=1)")
+                continue
+
+            if result['status'] != expected['status']:
+                failures.append(f"{key}: status {result['status']} (baseline {expected['status']})")
+            if result['queries'] > expected['queries']:
+                failures.append(f"{key}: {result['queries']} queries (baseline {expected['queries']})")
+            if result['warm_queries'] > expected['warm_queries']:
+                failures.append(f"{key}: {result['warm_queries']} warm queries (baseline {expected['warm_queries']})")
+            for metric in ('p50_ms', 'p95_ms'):
+                if metric not in expected:
+                    continue
+                limit = max(expected[metric] * LATENCY_TOLERANCE, expected[metric] + LATENCY_SLACK_MS[metric]) * scale
+                if result[metric] > limit:
+                    failures.append(
+                        f"{key}: {metric} {result[metric]} (baseline {expected[metric]}, machine ×{scale:.2f})"
+                    )
+            if result['bytes'] > expected['bytes'] * SIZE_TOLERANCE:
+                failures.append(f"{key}: {result['bytes']} bytes (baseline {expected['bytes']})")
+
+        self.assertFalse(failures, "Endpoint regressions:\n" + "\n".join(failures))
+
+
+class ConditionalGetTests(TestCase):
+    """ETag / Last-Modified of the catalog viewsets (api.conditional.ConditionalGetMixin)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='vendor', email='vendor@example.com', password='pass1234')
+        cls.vendor = VendorProfile.objects.create(user=user, business_name='קייטרינג', is_active=True)
+        cls.product = Product.objects.create(vendor=cls.vendor, product_name='סלט')
+
+        cls.package = Package.objects.create(vendor=cls.vendor, name='חבילה', price_per_person=Decimal('100.00'))
+        category = PackageCategory.objects.create(package=cls.package, name='סלטים')
+        PackageCategoryItem.objects.create(package_category=category, product=cls.product)
+
+        drinks = AddonCategory.objects.create(name='שתייה')
+        Addon.objects.create(package=cls.package, category=drinks, name='בר', price=Decimal('10.00'))
+        Addon.objects.create(
+            package=cls.package, category=drinks, name='יין', price=Decimal('20.00'), is_active=False,
+        )
+
+    def setUp(self):
+        cache.clear()
+        clear_role_contexts()
+        clear_cached_users()
+        self.client = APIClient()
+
+    def etag(self, url, client=None):
+        response = (client or self.client).get(url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_unchanged_list_is_not_modified(self):
+        response = self.client.get('/api/products/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Authorization', response['Vary'])
+
+        # only the validator query – no page, no serialization
+        with CaptureQueriesContext(connection) as ctx:
+            not_modified = self.client.get('/api/products/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+
+    def test_unchanged_object_is_not_modified(self):
+        url = f'/api/products/{self.product.id}/'
+        etag = self.etag(url)
+        self.assertIn('Last-Modified', self.client.get(url))
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(response.status_code, 304)
+
+    def test_related_changes_change_the_etag(self):
+        products = self.etag('/api/products/')
+        vendors = self.etag('/api/vendors/')
+        package = self.etag(f'/api/packages/{self.package.id}/')
+
+        # vendor_name של המוצרים
+        self.vendor.business_name = 'קייטרינג חדש'
+        self.vendor.save()
+        self.assertNotEqual(self.etag('/api/products/'), products)
+
+        # email של הספק מגיע מהמשתמש
+        vendors = self.etag('/api/vendors/')
+        self.vendor.user.email = 'new@example.com'
+        self.vendor.user.save()
+        self.assertNotEqual(self.etag('/api/vendors/'), vendors)
+
+        # שם מוצר בתוך תפריט החבילה
+        self.product.product_name = 'טבולה'
+        self.product.save()
+        response = self.client.get(f'/api/packages/{self.package.id}/', HTTP_IF_NONE_MATCH=package)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['categories'][0]['items'][0]['product_name'], 'טבולה')
+
+    def test_deleted_row_changes_the_list_etag(self):
+        staff = AddonCategory.objects.create(name='צוות')
+        AddonCategory.objects.get(name='שתייה').save()
+        etag = self.etag('/api/addon-categories/')
+
+        # אותו תוכן – אותו ETag
+        AddonCategory.objects.create(name='עיצוב').delete()
+        self.assertEqual(self.etag('/api/addon-categories/'), etag)
+
+        # לא השורה האחרונה שעודכנה – רק ה-COUNT משתנה
+        response = self.client.get('/api/addon-categories/')
+        staff.delete()
+        self.assertNotEqual(self.etag('/api/addon-categories/'), etag)
+
+        # בלי Last-Modified ברשימה – If-Modified-Since לבדו לא מחזיר רשימה ישנה
+        self.assertNotIn('Last-Modified', response)
+        since = http_date(time.time() + 60)
+        self.assertEqual(self.client.get('/api/addon-categories/', HTTP_IF_MODIFIED_SINCE=since).status_code, 200)
+
+    def test_role_scoped_lists_do_not_share_etags(self):
+        vendor = APIClient()
+        token = RoleClaimsTokenObtainPairSerializer.get_token(self.vendor.user).access_token
+        vendor.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        # הספק רואה גם את התוספת הלא פעילה
+        self.assertNotEqual(self.etag('/api/addons/'), self.etag('/api/addons/', vendor))
+
+
+class FullTextSearchTests(TestCase):
+    """api.search – documents, Hebrew normalization, ranking and the SearchFilter replacement."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='dana', email='dana@example.com', password='pass1234')
+        cls.vendor = VendorProfile.objects.create(user=user, business_name='קייטרינג השף', is_active=True)
+
+        cls.cake = Product.objects.create(
+            vendor=cls.vendor, product_name='עוגת שוקולד', description='עוגה עם קרם שוקולד ושוקולד מריר',
+        )
+        cls.salad = Product.objects.create(
+            vendor=cls.vendor, product_name='סלט ירוק', description='עם רוטב שוקולד',
+        )
+        cls.bread = Product.objects.create(vendor=cls.vendor, product_name='לחם בית', description='מחמצת')
+        call_command('rebuild_search_index', stdout=open(os.devnull, 'w'))
+
+    def setUp(self):
+        cache.clear()
+
+    def search_products(self, text):
+        response = APIClient().get('/api/products/', {'search': text})
+        self.assertEqual(response.status_code, 200)
+        return [product['id'] for product in response.data['results']]
+
+    def test_normalize_strips_niqqud_and_folds_final_letters(self):
+        self.assertEqual(normalize('שָׁלוֹם'), 'שלומ')
+        self.assertEqual(normalize('צ׳יפס בית־ספר'), 'ציפס בית ספר')
+        self.assertEqual(normalize('ךםןףץ'), 'כמנפצ')
+
+    def test_documents_follow_saves_and_deletes(self):
+        index = get_index(Product)
+        self.assertEqual(
+            SearchDocument.objects.get(entity=index.entity, object_id=self.bread.id).body,
+            'לחמ בית מחמצת קייטרינג השפ',
+        )
+
+        # the vendor name is part of the product document
+        self.vendor.business_name = 'אירועי דנה'
+        self.vendor.save()
+        self.assertEqual(set(self.search_products('דנה')), {self.cake.id, self.salad.id, self.bread.id})
+
+        self.vendor.user.email = 'chef@example.com'
+        self.vendor.user.save()
+        self.assertEqual(list(search(get_index(VendorProfile), 'chef')), [self.vendor.id])
+
+        self.bread.delete()
+        self.assertFalse(SearchDocument.objects.filter(entity=index.entity, object_id=self.bread.id).exists())
+
+    def test_ranked_prefix_search_with_niqqud(self):
+        # "שוקולד" שלוש פעמים בעוגה, פעם אחת בסלט
+        self.assertEqual(self.search_products('שׁוֹקוֹ'), [self.cake.id, self.salad.id])
+        self.assertEqual(self.search_products('שוקולד מריר'), [self.cake.id])
+        self.assertEqual(self.search_products('פיצה'), [])
+
+        # explicit ?ordering= wins over the rank
+        response = APIClient().get('/api/products/', {'search': 'שוקולד', 'ordering': 'product_name'})
+        self.assertEqual([product['id'] for product in response.data['results']], [self.salad.id, self.cake.id])
+
+    def test_ranked_within_the_scoped_queryset(self):
+        # better matches that the viewset scopes out (is_available=False) do not push
+        # the visible ones past a cutoff – the rank is a subquery of the scoped queryset
+        for i in range(30):
+            Product.objects.create(
+                vendor=self.vendor, product_name=f'שוקולד {i}', description='שוקולד שוקולד שוקולד',
+                is_available=False,
+            )
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.search_products('שוקולד'), [self.cake.id, self.salad.id])
+        page_sql = ctx.captured_queries[-1]['sql']
+        self.assertIn('bm25', page_sql)
+        self.assertNotIn('CASE', page_sql)
+
+    def test_unbuilt_index_falls_back_to_icontains(self):
+        # right after the migration: no documents until a row is saved, no rebuild yet
+        index = get_index(Product)
+        SearchIndexBuild.objects.all().delete()
+        SearchDocument.objects.filter(entity=index.entity).delete()
+        self.cake.save()
+        self.assertEqual(SearchDocument.objects.filter(entity=index.entity).count(), 1)
+
+        # the salad has no document – still found
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(set(self.search_products('שוקולד')), {self.cake.id, self.salad.id})
+        self.assertNotIn('bm25', ctx.captured_queries[-1]['sql'])
+
+        call_command('rebuild_search_index', 'products.product', stdout=open(os.devnull, 'w'))
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.search_products('שוקולד'), [self.cake.id, self.salad.id])
+        self.assertIn('bm25', ctx.captured_queries[-1]['sql'])
+
+    def test_final_letters_and_joined_fields_match(self):
+        # "לחם" נשמר כ"לחמ" – גם חיפוש בלי אות סופית מוצא אותו
+        self.assertEqual(self.search_products('לחמ'), [self.bread.id])
+
+        # the vendor document holds the username / email of its user
+        self.assertEqual(list(search(get_index(VendorProfile), 'DANA@example.com')), [self.vendor.id])
+
+    def test_rebuild_command(self):
+        SearchDocument.objects.all().delete()
+        Product.objects.filter(pk=self.cake.pk).update(product_name='טירמיסו')
+        self.assertEqual(self.search_products('טירמיסו'), [])
+
+        call_command('rebuild_search_index', 'products.product', stdout=open(os.devnull, 'w'))
+        self.assertEqual(self.search_products('טירמיסו'), [self.cake.id])
+
+
+class RequestLoggingTests(TestCase):
+    """api.request_logging – the per-request record and the queued, off-thread formatting."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='vendor', password='pass1234')
+        cls.vendor = VendorProfile.objects.create(user=user, business_name='קייטרינג', is_active=True)
+        cls.product = Product.objects.create(vendor=cls.vendor, product_name='עוגת שוקולד')
+
+    def setUp(self):
+        clear_role_contexts()
+        self.client = APIClient()
+        self.client.force_authenticate(self.vendor.user)
+
+    def test_request_record(self):
+        with self.assertLogs('small_table.requests', 'INFO') as logs, \
+                CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/packages/my_packages/', HTTP_X_REQUEST_ID='req-1')
+
+        self.assertEqual(response['X-Request-ID'], 'req-1')
+        [record] = logs.records
+        self.assertEqual(
+            (record.request_id, record.method, record.endpoint, record.status, record.user_id, record.vendor_id),
+            ('req-1', 'GET', 'package-my-packages', 200, self.vendor.user.id, self.vendor.id),
+        )
+        self.assertEqual(record.queries, len(ctx.captured_queries))
+        self.assertGreaterEqual(record.duration_ms, 0)
+
+    def test_request_id_is_generated(self):
+        response = APIClient().get('/api/packages/')
+        self.assertEqual(len(response['X-Request-ID']), 32)
+
+    def test_view_events(self):
+        with self.assertLogs('small_table.events', 'INFO') as logs:
+            response = self.client.delete(f'/api/products/{self.product.id}/', HTTP_X_REQUEST_ID='req-2')
+
+        self.assertEqual(response.status_code, 204)
+        [record] = logs.records
+        self.assertEqual(record.getMessage(), 'product deleted')
+        self.assertEqual((record.request_id, record.user_id), ('req-2', self.vendor.user.id))
+        self.assertEqual(record.fields, {'product_id': self.product.id, 'vendor_id': self.vendor.id})
+
+    def test_records_are_formatted_on_the_listener_thread(self):
+        formatted = []
+
+        class Collect(logging.Handler):
+            def emit(self, record):
+                formatted.append((threading.current_thread(), self.format(record)))
+
+        handler = Collect()
+        handler.setFormatter(StructuredFormatter())
+        records = SimpleQueue()
+        listener = QueueListener(records, handler)
+
+        test_logger = logging.getLogger('small_table.tests')
+        test_logger.addHandler(DeferredQueueHandler(records))
+        test_logger.propagate = False
+        listener.start()
+        try:
+            test_logger.warning('הזמנה %s', 7, extra={'request_id': 'req-3', 'fields': {'order_id': 7}})
+        finally:
+            listener.stop()
+            test_logger.handlers.clear()
+            test_logger.propagate = True
+
+        [(thread, line)] = formatted
+        self.assertIsNot(thread, threading.current_thread())
+        self.assertEqual(json.loads(line) | {'time': None}, {
+            'time': None,
+            'level': 'WARNING',
+            'logger': 'small_table.tests',
+            'message': 'הזמנה 7',
+            'request_id': 'req-3',
+            'order_id': 7,
+        })
+
+
+def image_file(name, size=(1000, 500), mode='RGB', color=(200, 30, 30), image_format='PNG'):
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, image_format)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f'image/{image_format.lower()}')
+
+
+class ImageVariantsTests(TestCase):
+    """api.images – resized variants of uploaded images and the srcset of the serializers."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='vendor', password='pass1234')
+        cls.vendor = VendorProfile.objects.create(user=user, business_name='קייטרינג', is_active=True)
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root,
+            IMAGE_VARIANTS_ASYNC=False,
+            IMAGE_VARIANT_WIDTHS=(320, 640, 1280),
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        clear_role_contexts()
+        self.client = APIClient()
+        self.client.force_authenticate(self.vendor.user)
+
+    def upload(self, url, method='post', **data):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.client, method)(url, data, format='multipart')
+        self.assertIn(response.status_code, (200, 201), response.data)
+        return response
+
+    def test_upload_builds_variants(self):
+        response = self.upload(
+            '/api/products/', vendor=self.vendor.id, product_name='עוגה', category='קינוחים',
+            is_available=True, image=image_file('cake.png'),
+        )
+        # the upload response does not wait for the variants
+        self.assertIsNone(response.data['image_srcset'])
+
+        response = self.client.get(f"/api/products/{response.data['id']}/")
+        srcset = response.data['image_srcset']
+        self.assertEqual(set(srcset), {'webp', 'jpeg'})
+        # never upscaled – 1000px wide source
+        self.assertRegex(srcset['webp'], r'^http://testserver/media/variants/products/cake\S*_320w\.webp 320w, \S+_640w\.webp 640w$')
+
+        product = Product.objects.get(pk=response.data['id'])
+        storage = product.image.storage
+        with storage.open(product.image_variants['jpeg']['640']) as file, Image.open(file) as image:
+            self.assertEqual((image.format, image.size), ('JPEG', (640, 320)))
+
+    def test_replaced_image_drops_old_variants(self):
+        package = Package.objects.create(vendor=self.vendor, name='קלאסית', price_per_person=Decimal('100.00'))
+        url = f'/api/packages/{package.id}/'
+        self.upload(url, method='patch', image=image_file('first.png'))
+
+        package.refresh_from_db()
+        old_variants = package.image_variants
+        storage = package.image.storage
+        self.assertTrue(storage.exists(old_variants['webp']['320']))
+
+        # the menu document shows the variants once they are built
+        self.assertIn('first', self.client.get(url).data['image_srcset']['jpeg'])
+
+        self.upload(url, method='patch', image=image_file('second.png', size=(300, 300)))
+        package.refresh_from_db()
+        self.assertFalse(storage.exists(old_variants['webp']['320']))
+        # narrower than every width – one copy at its own width
+        self.assertEqual(list(package.image_variants['webp']), ['300'])
+        self.assertIn('second', self.client.get(url).data['image_srcset']['webp'])
+
+    def test_stale_variants_are_not_shown(self):
+        product = Product.objects.create(vendor=self.vendor, product_name='עוגה', category='קינוחים')
+        product.image_variants = {'source': 'products/old.png', 'webp': {'320': 'variants/products/old_320w.webp'}}
+        product.image = 'products/new.png'
+        self.assertIsNone(ProductSerializer(product).data['image_srcset'])
+
+    def test_pending_build_is_not_scheduled_again(self):
+        submitted = []
+        threads = mock.Mock(submit=lambda *args: submitted.append(args[1:]))
+        variants = get_image_variants(Product)
+
+        with override_settings(IMAGE_VARIANTS_ASYNC=True), \
+                mock.patch('api.images.get_workers', return_value=(threads, None)):
+            with self.captureOnCommitCallbacks(execute=True):
+                product = Product.objects.create(
+                    vendor=self.vendor, product_name='עוגה', category='קינוחים', image=image_file('cake.png'),
+                )
+            # עריכת שם בזמן שהבנייה עוד רצה – בלי בנייה נוספת של אותה תמונה
+            with self.captureOnCommitCallbacks(execute=True):
+                product.product_name = 'עוגת גבינה'
+                product.save()
+            self.assertEqual(submitted, [(product.pk, product.image.name)])
+            self.addCleanup(variants.finished, (product.pk, product.image.name))
+
+            variants.finished((product.pk, product.image.name))
+            with self.captureOnCommitCallbacks(execute=True):
+                product.save()
+            self.assertEqual(len(submitted), 2)
+
+    def test_rendered_in_a_worker_process(self):
+        data = image_file('logo.png', size=(700, 350), mode='RGBA', color=(0, 0, 0, 0)).read()
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+            variants = pool.submit(render_variants, data, (320, 640, 1280), ['webp', 'jpeg']).result()
+
+        self.assertEqual({name: list(copies) for name, copies in variants.items()}, {
+            'webp': [320, 640], 'jpeg': [320, 640],
+        })
+        with Image.open(io.BytesIO(variants['jpeg'][320])) as image:
+            # transparent → white, not black
+            self.assertEqual((image.size, image.getpixel((0, 0))[0] > 250), ((320, 160), True))
+        with Image.open(io.BytesIO(variants['webp'][320])) as image:
+            self.assertEqual((image.format, image.mode), ('WEBP', 'RGBA'))
@@ -0,0 +1,37 @@
+import django_filters
+
+from .models import Order, OrderAddon
+
+
+class OrderFilter(django_filters.FilterSet):
+    """
+    Filters for the order list/export – filtered in the DB instead of on the client:
+    ?status=new&created_at__gte=2025-01-01&guests_count__lte=200&total_price__gte=5000
+    The combinations with vendor/user are backed by the composite indexes on Order.
+    """
+
+    class Meta:
+        model = Order
+        fields = {
+            'status': ['exact', 'in'],
+            'vendor': ['exact'],
+            'package': ['exact'],
+            'created_at': ['gte', 'lt', 'lte', 'date'],
+            'guests_count': ['gte', 'lte'],
+            'total_price': ['gte', 'lte'],
+        }
+
+
+class OrderAddonFilter(django_filters.FilterSet):
+    """
+    Filters by raw ids – ?order=<id> is a single lookup on the (order, created_at) index,
+    without first loading the order/addon rows to validate them.
+    """
+
+    order = django_filters.NumberFilter(field_name='order_id')
+    addon = django_filters.NumberFilter(field_name='addon_id')
+    addon__category = django_filters.NumberFilter(field_name='addon__category_id')
+
+    class Meta:
+        model = OrderAddon
+        fields = ['order', 'addon', 'addon__category']
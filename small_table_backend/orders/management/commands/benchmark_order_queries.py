@@ -0,0 +1,178 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from orders.models import Order
+from packages.models import Package
+from users.models import User
+from vendors.models import VendorProfile
+
+BENCH_PREFIX = 'bench_'
+
+
+@contextmanager
+def explicit_created_at():
+    """bulk_create would overwrite created_at (auto_now_add) – the seed spreads it over two years."""
+    field = Order._meta.get_field('created_at')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a large synthetic order table (users/vendors prefixed 'bench_') and show the query plan "
+        "and timing of the hot order queries – to verify they use the composite indexes on Order."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--vendors', type=int, default=50)
+        parser.add_argument('--customers', type=int, default=5000)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=20, help="Runs per query for the timing")
+        parser.add_argument('--skip-seed', action='store_true', help="Reuse previously seeded rows")
+        parser.add_argument('--cleanup', action='store_true', help="Only delete the seeded rows")
+
+    def handle(self, *args, **options):
+        if options['cleanup']:
+            self.cleanup()
+            return
+
+        if not options['skip_seed']:
+            self.seed(options)
+
+        vendor = VendorProfile.objects.filter(user__username__startswith=BENCH_PREFIX).first()
+        customer = User.objects.filter(username__startswith=f'{BENCH_PREFIX}customer').first()
+        if vendor is None or customer is None:
+            self.stderr.write("No seeded data – run without --skip-seed first.")
+            return
+
+        now = timezone.now()
+        queries = [
+            (
+                "vendor orders, newest first",
+                Order.objects.filter(vendor=vendor).order_by('-created_at')[:25],
+                ['vendor', 'created_at'],
+            ),
+            (
+                "vendor orders by status in the last 30 days",
+                Order.objects.filter(
+                    vendor=vendor, status=Order.STATUS_NEW, created_at__gte=now - timedelta(days=30),
+                ).order_by('-created_at')[:25],
+                ['vendor', 'status', 'created_at'],
+            ),
+            (
+                "vendor orders by guests range",
+                Order.objects.filter(
+                    vendor=vendor, guests_count__gte=100, guests_count__lte=300,
+                ).order_by('-created_at')[:25],
+                ['vendor', 'created_at'],
+            ),
+            (
+                "customer orders, newest first",
+                Order.objects.filter(user=customer).order_by('-created_at')[:25],
+                ['user', 'created_at'],
+            ),
+            (
+                "cursor page (created_at, id)",
+                Order.objects.filter(created_at__lt=now - timedelta(days=365))
+                .order_by('-created_at', '-id')[:25],
+                ['created_at', 'id'],
+            ),
+        ]
+
+        index_names = {tuple(index.fields): index.name for index in Order._meta.indexes}
+        failed = 0
+
+        for title, queryset, index_fields in queries:
+            plan = queryset.explain()
+
+            timings = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                list(queryset.all())
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+
+            expected = index_names[tuple(index_fields)]
+            uses_index = expected in plan
+            failed += not uses_index
+
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            self.stdout.write(plan)
+            self.stdout.write(
+                f"p50 {timings[len(timings) // 2] * 1000:.2f}ms, max {timings[-1] * 1000:.2f}ms – "
+                + (self.style.SUCCESS(f"uses {expected}") if uses_index
+                   else self.style.ERROR(f"does not use {expected}"))
+            )
+            self.stdout.write('')
+
+        if failed:
+            self.stderr.write(self.style.ERROR(f"{failed} queries do not use their index."))
+        else:
+            self.stdout.write(self.style.SUCCESS("All queries use their composite index."))
+
+    def seed(self, options):
+        self.stdout.write(f"Seeding {options['rows']} orders...")
+        rng = random.Random(42)
+
+        with transaction.atomic():
+            customers = User.objects.bulk_create(
+                User(username=f'{BENCH_PREFIX}customer_{i}', password='!')
+                for i in range(options['customers'])
+            )
+            vendor_users = User.objects.bulk_create(
+                User(username=f'{BENCH_PREFIX}vendor_{i}', password='!')
+                for i in range(options['vendors'])
+            )
+            vendors = VendorProfile.objects.bulk_create(
+                VendorProfile(user=user, business_name=f'{BENCH_PREFIX}{user.id}', is_active=True)
+                for user in vendor_users
+            )
+            packages = Package.objects.bulk_create(
+                Package(vendor=vendor, name=f'{BENCH_PREFIX}package', price_per_person=Decimal('120.00'))
+                for vendor in vendors
+            )
+
+        statuses = [status for status, _ in Order._meta.get_field('status').choices]
+        now = timezone.now()
+        batch_size = options['batch_size']
+
+        with explicit_created_at():
+            for start in range(0, options['rows'], batch_size):
+                batch = []
+                for _ in range(min(batch_size, options['rows'] - start)):
+                    package = rng.choice(packages)
+                    guests = rng.randint(10, 1000)
+                    batch.append(Order(
+                        user=rng.choice(customers),
+                        vendor_id=package.vendor_id,
+                        package=package,
+                        guests_count=guests,
+                        status=rng.choice(statuses),
+                        total_price=package.price_per_person * guests,
+                        created_at=now - timedelta(minutes=rng.randint(0, 2 * 365 * 24 * 60)),
+                    ))
+                with transaction.atomic():
+                    Order.objects.bulk_create(batch)
+                self.stdout.write(f"  {start + len(batch)} rows")
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def cleanup(self):
+        vendors = VendorProfile.objects.filter(user__username__startswith=BENCH_PREFIX)
+        with transaction.atomic():
+            Order.objects.filter(vendor__in=vendors).delete()
+            Package.objects.filter(vendor__in=vendors).delete()
+            User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+        self.stdout.write(self.style.SUCCESS("Benchmark data deleted."))
@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.services import import_orders, ORDER_IMPORT_CHUNK_SIZE
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Batch import of orders from a JSON file (a list of order payloads)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="JSON file with a list of order payloads")
+        parser.add_argument('--user', required=True, help="Username the orders belong to")
+        parser.add_argument('--chunk-size', type=int, default=ORDER_IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist.")
+
+        with open(options['path'], encoding='utf-8') as f:
+            rows = json.load(f)
+
+        if not isinstance(rows, list):
+            raise CommandError("The file must contain a JSON list of orders.")
+
+        report = import_orders(rows, user=user, chunk_size=options['chunk_size'])
+
+        failed = [row for row in report if row['status'] != 'created']
+        for row in failed:
+            self.stderr.write(f"row {row['row']}: {json.dumps(row['errors'], ensure_ascii=False, default=str)}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {len(report) - len(failed)} orders, {len(failed)} failed."
+        ))
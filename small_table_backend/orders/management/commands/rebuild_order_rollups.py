@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+from orders.models import Order, OrderDailyRollup
+
+
+class Command(BaseCommand):
+    help = "Recreate the OrderDailyRollup table (vendor dashboard) from the orders table."
+
+    def handle(self, *args, **options):
+        rows = Order.objects.annotate(day=TruncDate('created_at')) \
+            .values('vendor', 'package', 'day', 'status') \
+            .annotate(
+                orders_count=Count('id'),
+                revenue=Sum('total_price'),
+                guests=Sum('guests_count'),
+            ) \
+            .order_by()
+
+        with transaction.atomic():
+            OrderDailyRollup.objects.all().delete()
+            rollups = OrderDailyRollup.objects.bulk_create(
+                (
+                    OrderDailyRollup(
+                        vendor_id=row['vendor'],
+                        package_id=row['package'],
+                        day=row['day'],
+                        status=row['status'],
+                        orders_count=row['orders_count'],
+                        revenue=row['revenue'],
+                        guests=row['guests'],
+                    )
+                    for row in rows.iterator()
+                ),
+                batch_size=1000,
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(rollups)} rollup rows."))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from orders.models import Order, OrderDailyRollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Full recompute of Order.total_price from items and addons, "
+        "to verify the incrementally maintained totals (--fix to repair them)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help="Save the recomputed totals")
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        orders = Order.objects.select_related('package').prefetch_related('items', 'addons')
+
+        mismatched = 0
+        cells = set()
+        for order in orders.iterator(chunk_size=options['chunk_size']):
+            expected = order.calculate_total_price()
+            if order.total_price == expected:
+                continue
+
+            mismatched += 1
+            self.stdout.write(f"order #{order.id}: stored {order.total_price}, expected {expected}")
+            if options['fix']:
+                Order.objects.filter(pk=order.pk).update(total_price=expected)
+                cells.add(order.rollup_cell())
+
+        # update() עוקף את Order.save – הכנסות ה-rollup של התאים שתוקנו מחושבות מחדש
+        OrderDailyRollup.refresh_cells(cells)
+
+        style = self.style.WARNING if mismatched else self.style.SUCCESS
+        self.stdout.write(style(f"{mismatched} orders with a wrong total_price."))
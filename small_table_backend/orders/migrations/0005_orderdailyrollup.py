@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_orders_orde_created_0fb29d_idx'),
+        ('packages', '0002_initial'),
+        ('vendors', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='יום')),
+                ('status', models.CharField(max_length=50, verbose_name='סטטוס הזמנה')),
+                ('orders_count', models.PositiveIntegerField(default=0, verbose_name='מספר הזמנות')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='הכנסות')),
+                ('guests', models.PositiveBigIntegerField(default=0, verbose_name='סועדים')),
+                ('package', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_rollups', to='packages.package', verbose_name='חבילה')),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_rollups', to='vendors.vendorprofile', verbose_name='ספק')),
+            ],
+            options={
+                'verbose_name': 'סיכום הזמנות יומי',
+                'verbose_name_plural': 'סיכומי הזמנות יומיים',
+                'indexes': [models.Index(fields=['vendor', 'day'], name='orders_orde_vendor__6d1441_idx')],
+                'constraints': [models.UniqueConstraint(fields=('vendor', 'package', 'day', 'status'), name='unique_order_rollup_cell')],
+            },
+        ),
+    ]
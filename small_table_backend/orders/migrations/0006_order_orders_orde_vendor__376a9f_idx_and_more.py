@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_orderdailyrollup'),
+        ('packages', '0002_initial'),
+        ('vendors', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['vendor', 'status', 'created_at'], name='orders_orde_vendor__376a9f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['vendor', 'created_at'], name='orders_orde_vendor__d3be3d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', 'created_at'], name='orders_orde_user_id_37fed6_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('addons', '0002_initial'),
+        ('orders', '0006_order_orders_orde_vendor__376a9f_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orderaddon',
+            index=models.Index(fields=['order', 'created_at'], name='orders_orde_order_i_42c163_idx'),
+        ),
+    ]
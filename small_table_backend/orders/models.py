@@ -1,7 +1,10 @@
+from datetime import datetime, time, timedelta
 from decimal import Decimal
 
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, Count, Sum
 from django.conf import settings
+from django.utils import timezone
 
 from vendors.models import VendorProfile
 from packages.models import Package, PackageCategory
@@ -11,6 +14,17 @@ from addons.models import Addon  # חשוב: חיבור לתוספות
 
 class Order(models.Model):
 
+    STATUS_NEW = 'new'
+    STATUS_PROCESSING = 'processing'
+    STATUS_COMPLETED = 'completed'
+    STATUS_CANCELLED = 'cancelled'
+
+    # מעברי סטטוס מותרים: פעולה → (סטטוסי מקור, סטטוס יעד)
+    TRANSITIONS = {
+        'accept': ({STATUS_NEW}, STATUS_PROCESSING),
+        'complete': ({STATUS_PROCESSING}, STATUS_COMPLETED),
+        'cancel': ({STATUS_NEW, STATUS_PROCESSING}, STATUS_CANCELLED),
+    }
 
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -40,12 +54,12 @@ class Order(models.Model):
     status = models.CharField(
         max_length=50,
         choices=[
-            ('new', 'חדש'),
-            ('processing', 'בתהליך'),
-            ('completed', 'הושלם'),
-            ('cancelled', 'בוטל'),
+            (STATUS_NEW, 'חדש'),
+            (STATUS_PROCESSING, 'בתהליך'),
+            (STATUS_COMPLETED, 'הושלם'),
+            (STATUS_CANCELLED, 'בוטל'),
         ],
-        default='new',
+        default=STATUS_NEW,
         verbose_name='סטטוס הזמנה'
     )
 
@@ -71,45 +85,187 @@ class Order(models.Model):
         ordering = ['-created_at']
         verbose_name = "הזמנה"
         verbose_name_plural = "הזמנות"
+        indexes = [
+            # cursor pagination
+            models.Index(fields=['created_at', 'id']),
+            # vendor / customer lists – filtered by status / date range, newest first
+            models.Index(fields=['vendor', 'status', 'created_at']),
+            models.Index(fields=['vendor', 'created_at']),
+            models.Index(fields=['user', 'created_at']),
+        ]
+
+    # שדות שמשפיעים על הסיכומים היומיים (OrderDailyRollup)
+    ROLLUP_FIELDS = {'vendor', 'package', 'status', 'guests_count', 'total_price'}
 
     def __str__(self):
         return f"הזמנה #{self.id} ({self.user.username})"
 
-    def calculate_total_price(self) -> Decimal:
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if {'vendor_id', 'package_id', 'created_at', 'status'}.issubset(instance.__dict__):
+            instance._saved_rollup_cell = instance.rollup_cell()
+        return instance
+
+    def rollup_cell(self):
+        """The (vendor, package, day, status) cell of OrderDailyRollup this order is counted in."""
+        return (self.vendor_id, self.package_id, timezone.localdate(self.created_at), self.status)
+
+    def save(self, *args, **kwargs):
+        old_cell = getattr(self, '_saved_rollup_cell', None)
+        super().save(*args, **kwargs)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not self.ROLLUP_FIELDS.intersection(update_fields):
+            return
+
+        self._saved_rollup_cell = self.rollup_cell()
+        OrderDailyRollup.refresh_cells({old_cell, self._saved_rollup_cell} - {None})
+
+    def delete(self, *args, **kwargs):
+        cell = self.rollup_cell()
+        result = super().delete(*args, **kwargs)
+        OrderDailyRollup.refresh_cells([cell])
+        return result
+
+    def calculate_total_price(self, items=None, addons=None) -> Decimal:
         """
         Calculate total amount by specification:
         base = package price per portion * number of diners
         extras_from_items = guests_count * extra_price_per_person for each upgraded item
         addons_total = subtotal amount of each OrderAddon
+
+        items/addons can be passed in memory (e.g. before the order is saved);
+        by default they are read from the DB.
         """
+        return self.calculate_price_breakdown(items=items, addons=addons)['total']
+
+    def calculate_price_breakdown(self, items=None, addons=None) -> dict:
+        """
+        The parts of calculate_total_price: base, extras (upgraded items), addons and total.
+        """
+        zero = Decimal('0.00')
         if not self.package or not self.guests_count:
-            return Decimal('0.00')
+            return {'base': zero, 'extras': zero, 'addons': zero, 'total': zero}
 
         guests = Decimal(self.guests_count)
 
         base = self.package.price_per_person * guests
 
+        if items is None:
+            items = self.items.all()
+        if addons is None:
+            addons = self.addons.all()  # related_name='addons'
+
         # תוספות ממנות משודרגות (אסאדו וכד')
         extras_from_items = Decimal('0.00')
-        for item in self.items.all():
+        for item in items:
             extras_from_items += item.extra_price_per_person * guests
 
         # Addons from the OrderAddon table
         addons_total = Decimal('0.00')
-        for oa in self.addons.all():  # related_name='addons'
+        for oa in addons:
             addons_total += oa.subtotal
 
-        return (base + extras_from_items + addons_total).quantize(Decimal('0.01'))
+        return {
+            'base': base.quantize(Decimal('0.01')),
+            'extras': extras_from_items.quantize(Decimal('0.01')),
+            'addons': addons_total.quantize(Decimal('0.01')),
+            'total': (base + extras_from_items + addons_total).quantize(Decimal('0.01')),
+        }
 
     def update_total_price(self, save=True):
         """
         עדכון שדה total_price לפי המנות המשודרגות + תוספות.
+        Full recompute – day to day the total is kept up to date by apply_total_delta,
+        this is the explicit verification/repair path (see verify_order_totals).
         """
         self.total_price = self.calculate_total_price()
         if save:
             self.save(update_fields=['total_price'])
         return self.total_price
 
+    def reprice_for_guests(self):
+        """
+        After guests_count changed: per-person addon subtotals and the total depend on it.
+        The addons are updated in one UPDATE, then the total is fully recomputed.
+        """
+        self.addons.filter(addon__pricing_type=Addon.PRICING_PER_PERSON).update(
+            subtotal=F('price_snapshot') * self.guests_count * F('quantity')
+        )
+        # prefetched addons (if any) are stale now
+        self.refresh_from_db(fields=['addons'])
+        return self.update_total_price(save=True)
+
+    def can_transition(self, action):
+        sources, _ = self.TRANSITIONS[action]
+        return self.status in sources
+
+    def apply_transition(self, action):
+        """
+        Status change as one conditional statement:
+        UPDATE orders_order SET status=<target> WHERE id=<id> AND status=<status we read>
+        Returns False (nothing written) if the transition is not allowed
+        or the status was changed meanwhile by someone else.
+        """
+        if not self.can_transition(action):
+            return False
+
+        _, target = self.TRANSITIONS[action]
+        updated = Order.objects.filter(pk=self.pk, status=self.status).update(status=target)
+        if not updated:
+            return False
+
+        old_cell = self.rollup_cell()
+        self.status = target
+        self._saved_rollup_cell = self.rollup_cell()
+        OrderDailyRollup.refresh_cells([old_cell, self._saved_rollup_cell])
+        return True
+
+    @classmethod
+    def bulk_transition(cls, action, queryset):
+        """
+        Apply `action` to every order of queryset that allows it, with one UPDATE.
+        The rows are locked first (select_for_update), so the dashboard cells
+        refreshed afterwards are exactly the ones that changed.
+        Returns the ids of the orders that were moved.
+        """
+        sources, target = cls.TRANSITIONS[action]
+
+        with transaction.atomic():
+            rows = list(
+                cls.objects.select_for_update()
+                .filter(pk__in=queryset.values('pk'), status__in=sources)
+                .values_list('pk', 'vendor_id', 'package_id', 'created_at', 'status')
+            )
+            ids = [row[0] for row in rows]
+            if not ids:
+                return []
+
+            cls.objects.filter(pk__in=ids, status__in=sources).update(status=target)
+
+            cells = set()
+            for _, vendor_id, package_id, created_at, status in rows:
+                day = timezone.localdate(created_at)
+                cells.add((vendor_id, package_id, day, status))
+                cells.add((vendor_id, package_id, day, target))
+            OrderDailyRollup.refresh_cells(cells)
+
+        return ids
+
+    @classmethod
+    def apply_total_delta(cls, order_id, delta):
+        """
+        Add delta to total_price in a single atomic UPDATE
+        (total_price = total_price + delta) – other items/addons are not read.
+        """
+        if not delta:
+            return
+        cls.objects.filter(pk=order_id).update(total_price=F('total_price') + delta)
+
+        order = cls.objects.only('vendor', 'package', 'created_at', 'status').get(pk=order_id)
+        OrderDailyRollup.refresh_cells([order.rollup_cell()])
+
 
 class OrderItem(models.Model):
     """
@@ -160,7 +316,14 @@ class OrderItem(models.Model):
         verbose_name_plural = "פריטי הזמנה"
 
     def __str__(self):
-        return f"{self.product.name} (הזמנה {self.order.id})"
+        return f"{self.product.product_name} (הזמנה {self.order.id})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # המחיר כפי שנשמר – לחישוב ההפרש בעדכון הבא
+        instance._saved_extra_price = instance.__dict__.get('extra_price_per_person')
+        return instance
 
     @property
     def extra_subtotal(self):
@@ -170,6 +333,32 @@ class OrderItem(models.Model):
         guests = Decimal(self.order.guests_count)
         return (self.extra_price_per_person * guests).quantize(Decimal('0.01'))
 
+    def _total_delta(self, old_price, new_price):
+        if old_price == new_price:
+            return Decimal('0.00')
+        guests = Decimal(self.order.guests_count or 0)
+        return ((new_price - old_price) * guests).quantize(Decimal('0.01'))
+
+    def save(self, *args, **kwargs):
+        old_price = Decimal('0.00') if self._state.adding \
+            else getattr(self, '_saved_extra_price', self.extra_price_per_person)
+
+        super().save(*args, **kwargs)
+
+        # עדכון אינקרמנטלי של סכום ההזמנה – רק אם המחיר השתנה
+        Order.apply_total_delta(
+            self.order_id,
+            self._total_delta(old_price, self.extra_price_per_person),
+        )
+        self._saved_extra_price = self.extra_price_per_person
+
+    def delete(self, *args, **kwargs):
+        old_price = getattr(self, '_saved_extra_price', self.extra_price_per_person)
+        delta = self._total_delta(old_price, Decimal('0.00'))
+        result = super().delete(*args, **kwargs)
+        Order.apply_total_delta(self.order_id, delta)
+        return result
+
 
 class OrderAddon(models.Model):
 
@@ -215,6 +404,10 @@ class OrderAddon(models.Model):
     class Meta:
         verbose_name = "תוספת בהזמנה"
         verbose_name_plural = "תוספות בהזמנה"
+        indexes = [
+            # the addons of one order, newest first
+            models.Index(fields=['order', 'created_at']),
+        ]
 
     def __str__(self):
         return f"{self.addon.name} (הזמנה {self.order.id})"
@@ -234,11 +427,139 @@ class OrderAddon(models.Model):
 
         return (base * Decimal(self.quantity)).quantize(Decimal('0.01'))
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # ערכי התמחור כפי שנשמרו – כדי לדלג על חישוב מחדש כשהם לא השתנו
+        instance._saved_pricing = (
+            instance.__dict__.get('quantity'),
+            instance.__dict__.get('price_snapshot'),
+            instance.__dict__.get('subtotal'),
+        )
+        return instance
+
     def save(self, *args, **kwargs):
         # לוודא שתמיד יש price_snapshot
         if self.price_snapshot is None:
             self.price_snapshot = self.addon.price
 
-        # לחשב subtotal לפני שמירה
-        self.subtotal = self.calculate_subtotal()
+        saved = None if self._state.adding else getattr(self, '_saved_pricing', None)
+        old_subtotal = Decimal('0.00') if self._state.adding else self.subtotal
+
+        # לחשב subtotal רק כשכמות/מחיר השתנו (או בתוספת חדשה)
+        if saved is None or saved[:2] != (self.quantity, self.price_snapshot):
+            self.subtotal = self.calculate_subtotal()
+        if saved is not None:
+            old_subtotal = saved[2]
+
         super().save(*args, **kwargs)
+
+        Order.apply_total_delta(self.order_id, self.subtotal - old_subtotal)
+        self._saved_pricing = (self.quantity, self.price_snapshot, self.subtotal)
+
+    def delete(self, *args, **kwargs):
+        saved = getattr(self, '_saved_pricing', None)
+        old_subtotal = saved[2] if saved else self.subtotal
+        result = super().delete(*args, **kwargs)
+        Order.apply_total_delta(self.order_id, -old_subtotal)
+        return result
+
+
+class OrderDailyRollup(models.Model):
+    """
+    Daily order totals per (vendor, package, day, status) – the vendor dashboard reads only this table.
+    Maintained incrementally: every order write refreshes just the cells it touched
+    (see Order.save / OrderDailyRollup.refresh_cells); rebuild_order_rollups recreates it from scratch.
+    """
+
+    vendor = models.ForeignKey(
+        VendorProfile,
+        on_delete=models.CASCADE,
+        related_name='order_rollups',
+        verbose_name='ספק'
+    )
+
+    package = models.ForeignKey(
+        Package,
+        on_delete=models.CASCADE,
+        related_name='order_rollups',
+        verbose_name='חבילה'
+    )
+
+    day = models.DateField(
+        verbose_name='יום'
+    )
+
+    status = models.CharField(
+        max_length=50,
+        verbose_name='סטטוס הזמנה'
+    )
+
+    orders_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='מספר הזמנות'
+    )
+
+    revenue = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='הכנסות'
+    )
+
+    guests = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='סועדים'
+    )
+
+    class Meta:
+        verbose_name = "סיכום הזמנות יומי"
+        verbose_name_plural = "סיכומי הזמנות יומיים"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['vendor', 'package', 'day', 'status'],
+                name='unique_order_rollup_cell',
+            )
+        ]
+        indexes = [
+            models.Index(fields=['vendor', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.vendor_id} / {self.package_id} / {self.day} / {self.status}"
+
+    @classmethod
+    def refresh_cells(cls, cells):
+        """
+        Recalculate the given (vendor_id, package_id, day, status) cells from the orders table.
+        Each cell aggregates only one package's orders of one day,
+        so the cost does not depend on the size of the order history.
+        """
+        for vendor_id, package_id, day, status in set(cells):
+            start = timezone.make_aware(datetime.combine(day, time.min))
+
+            totals = Order.objects.filter(
+                vendor_id=vendor_id,
+                package_id=package_id,
+                status=status,
+                created_at__gte=start,
+                created_at__lt=start + timedelta(days=1),
+            ).aggregate(
+                orders_count=Count('id'),
+                revenue=Sum('total_price'),
+                guests=Sum('guests_count'),
+            )
+
+            cell = dict(vendor_id=vendor_id, package_id=package_id, day=day, status=status)
+            if not totals['orders_count']:
+                cls.objects.filter(**cell).delete()
+                continue
+
+            if cls.objects.filter(**cell).update(**totals):
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(**cell, **totals)
+            except IntegrityError:
+                # נוצר במקביל – מעדכנים
+                cls.objects.filter(**cell).update(**totals)
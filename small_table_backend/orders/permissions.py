@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from users.roles import get_role_context
+
 
 class IsOrderOwnerOrVendorOrAdmin(permissions.BasePermission):
     """
@@ -14,15 +16,13 @@ Order Permission:
         if not user or not user.is_authenticated:
             return False
 
-        has_admin_role = getattr(user, 'user_roles', None) and user.user_roles.filter(
-            role__name='admin'
-        ).exists()
+        role_context = get_role_context(request)
 
-        if has_admin_role or user.is_staff or user.is_superuser:
+        if role_context.is_admin:
             return True
 
         # האם זה הלקוח שביצע את ההזמנה?
-        if obj.user == user:
+        if obj.user_id == user.id:
             if request.method in permissions.SAFE_METHODS:
                 return True
             if 'status' in request.data:
@@ -30,7 +30,7 @@ Order Permission:
             return True
 
         # האם זה הספק של ההזמנה?
-        if hasattr(user, 'vendor_profile') and obj.vendor == user.vendor_profile:
+        if role_context.is_vendor and obj.vendor_id == role_context.vendor_id:
             return True
 
         return False
@@ -51,19 +51,17 @@ class IsOrderAddonOwnerOrVendorOrAdmin(permissions.BasePermission):
 
         order = obj.order
 
-        has_admin_role = getattr(user, 'user_roles', None) and user.user_roles.filter(
-            role__name='admin'
-        ).exists()
+        role_context = get_role_context(request)
 
-        if has_admin_role or user.is_staff or user.is_superuser:
+        if role_context.is_admin:
             return True
 
 
-        if order.user == user:
+        if order.user_id == user.id:
             return request.method in permissions.SAFE_METHODS
 
 
-        if hasattr(user, 'vendor_profile') and order.vendor == user.vendor_profile:
+        if role_context.is_vendor and order.vendor_id == role_context.vendor_id:
             return True
 
         return False
@@ -2,7 +2,9 @@ from django.db import transaction
 from rest_framework import serializers
 
 from .models import Order, OrderItem, OrderAddon
-from packages.models import PackageCategoryItem
+from .services import PackageCatalog, build_order, save_order
+from packages.models import Package
+from packages.rules import get_package_rules, with_menu_versions
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -11,7 +13,11 @@ class OrderItemSerializer(serializers.ModelSerializer):
     (As before, only without quantity – because the quantity is according to the number of diners)
     """
 
-    product_name = serializers.CharField(source='product.name', read_only=True)
+    # ids only – the whole selection is resolved in one query by OrderSerializer.create
+    package_category = serializers.IntegerField(source='package_category_id')
+    product = serializers.IntegerField(source='product_id')
+
+    product_name = serializers.CharField(source='product.product_name', read_only=True)
     category_name = serializers.CharField(source='package_category.name', read_only=True)
     extra_subtotal = serializers.SerializerMethodField()
 
@@ -47,6 +53,8 @@ class OrderAddonSerializer(serializers.ModelSerializer):
     - The server fills in price_snapshot and subtotal.
     """
 
+    addon = serializers.IntegerField(source='addon_id')
+
     addon_name = serializers.CharField(source='addon.name', read_only=True)
     category_name = serializers.CharField(source='addon.category.name', read_only=True)
     pricing_type = serializers.CharField(source='addon.pricing_type', read_only=True)
@@ -77,6 +85,43 @@ class OrderAddonSerializer(serializers.ModelSerializer):
         return value
 
 
+class OrderAddonUpdateSerializer(OrderAddonSerializer):
+    """
+    Add-on of an existing order (OrderAddonViewSet): only the quantity can change –
+    swapping the addon would leave price_snapshot / subtotal / the order total stale.
+    """
+
+    addon = serializers.IntegerField(source='addon_id', read_only=True)
+
+    class Meta(OrderAddonSerializer.Meta):
+        read_only_fields = OrderAddonSerializer.Meta.read_only_fields + ['addon']
+
+
+class OrderAddonListSerializer(serializers.ModelSerializer):
+    """
+    Compact list representation of an order addon –
+    only needs the addon row (no order/user/vendor/package/category joins).
+    """
+
+    addon_name = serializers.CharField(source='addon.name', read_only=True)
+    pricing_type = serializers.CharField(source='addon.pricing_type', read_only=True)
+
+    class Meta:
+        model = OrderAddon
+        fields = [
+            'id',
+            'order',
+            'addon',
+            'addon_name',
+            'pricing_type',
+            'quantity',
+            'price_snapshot',
+            'subtotal',
+            'created_at',
+        ]
+        read_only_fields = fields
+
+
 class OrderSerializer(serializers.ModelSerializer):
     """
     Serializer Oreder:
@@ -86,6 +131,11 @@ class OrderSerializer(serializers.ModelSerializer):
     vendor_name = serializers.CharField(source='vendor.business_name', read_only=True)
     package_name = serializers.CharField(source='package.name', read_only=True)
 
+    # גרסת התפריט מגיעה עם החבילה – חוקי ההזמנה נשלפים מה-cache בלי שאילתה נוספת
+    package = serializers.PrimaryKeyRelatedField(
+        queryset=with_menu_versions(Package.objects.select_related('vendor'))
+    )
+
     items = OrderItemSerializer(many=True)
     addons = OrderAddonSerializer(many=True, required=False)
 
@@ -111,6 +161,7 @@ class OrderSerializer(serializers.ModelSerializer):
             'id',
             'user',
             'vendor',
+            'status',  # changes only through the transition actions (accept/complete/cancel)
             'total_price',
             'created_at',
         ]
@@ -125,69 +176,41 @@ class OrderSerializer(serializers.ModelSerializer):
         package = attrs.get('package') or getattr(self.instance, 'package', None)
         if package and hasattr(package, 'is_active') and not package.is_active:
             raise serializers.ValidationError("לא ניתן להזמין חבילה שאיננה פעילה.")
-        return attrs
 
-    @transaction.atomic
-    def create(self, validated_data):
+        # עדכון – המנות לא משתנות, אבל מספר הסועדים עדיין כפוף לגבולות החבילה
+        if self.instance is not None and 'guests_count' in attrs:
+            rules = get_package_rules([self.instance.package])[self.instance.package_id]
+            errors = rules.guest_errors(attrs['guests_count'])
+            if errors:
+                raise serializers.ValidationError({'guests_count': errors})
+        return attrs
 
+    def build(self, validated_data):
+        """
+        Build the order with its items and addons in memory (no writes).
+        All package pricing data is loaded in a fixed number of queries,
+        no matter how many dishes/addons were chosen.
+        """
         request = self.context.get('request')
         user = getattr(request, 'user', None)
 
+        validated_data = dict(validated_data)
         items_data = validated_data.pop('items', [])
         addons_data = validated_data.pop('addons', [])
 
         package = validated_data['package']
 
-
-        validated_data['vendor'] = package.vendor
-
         if user and user.is_authenticated:
             validated_data['user'] = user
 
+        catalog = PackageCatalog.load([package])
+        return build_order(catalog, items=items_data, addons=addons_data, **validated_data)
 
-        order = Order.objects.create(**validated_data)
-
-        for item_data in items_data:
-            package_category = item_data['package_category']
-            product = item_data['product']
-
-            if package_category.package_id != package.id:
-                raise serializers.ValidationError(
-                    f"קטגוריה {package_category.id} לא שייכת לחבילה שנבחרה."
-                )
-
-            try:
-                pci = PackageCategoryItem.objects.get(
-                    package_category=package_category,
-                    product=product,
-                    is_active=True,
-                )
-            except PackageCategoryItem.DoesNotExist:
-                raise serializers.ValidationError(
-                    f"המנה '{product.name}' לא זמינה בקטגוריה זו בחבילה."
-                )
-
-            OrderItem.objects.create(
-                order=order,
-                package_category=package_category,
-                product=product,
-                is_premium=pci.is_premium,
-                extra_price_per_person=pci.extra_price_per_person,
-            )
-
-        for addon_data in addons_data:
-            addon = addon_data['addon']
-            quantity = addon_data.get('quantity', 1)
-
-            OrderAddon.objects.create(
-                order=order,
-                addon=addon,
-                quantity=quantity,
-                price_snapshot=addon.price,
-            )
-
-        order.update_total_price(save=True)
-        return order
+    @transaction.atomic
+    def create(self, validated_data):
+
+        order, items, addons = self.build(validated_data)
+        return save_order(order, items, addons)
 
     @transaction.atomic
     def update(self, instance, validated_data):
@@ -198,9 +221,105 @@ class OrderSerializer(serializers.ModelSerializer):
         validated_data.pop('vendor', None)
         validated_data.pop('user', None)
 
+        guests_changed = (
+            'guests_count' in validated_data
+            and validated_data['guests_count'] != instance.guests_count
+        )
+
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
-        instance.save()
-        instance.update_total_price(save=True)
+        # שמירה רק של השדות שנשלחו – לא דורסים total_price שמתעדכן באופן אינקרמנטלי
+        if validated_data:
+            instance.save(update_fields=list(validated_data))
+
+        # עריכה שאינה משפיעה על המחיר (למשל note) – בלי חישוב מחדש
+        if guests_changed:
+            instance.reprice_for_guests()
         return instance
+
+
+class OrderImportRowSerializer(serializers.Serializer):
+    """
+    One row of a batch import – validated without touching the DB.
+    The package and the chosen dishes/addons are resolved later against a PackageCatalog.
+    """
+
+    package = serializers.IntegerField(source='package_id')
+    guests_count = serializers.IntegerField(min_value=1)
+    note = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    items = OrderItemSerializer(many=True)
+    addons = OrderAddonSerializer(many=True, required=False)
+
+
+class OrderImportSerializer(serializers.Serializer):
+    """
+    Batch import request: a list of order payloads + optional chunk size.
+    Rows are validated one by one, so a bad row does not fail the whole batch.
+    """
+
+    orders = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+    chunk_size = serializers.IntegerField(min_value=1, max_value=1000, required=False)
+
+
+class OrderQuoteSerializer(serializers.Serializer):
+    """
+    Price quote for an order payload (nothing is saved):
+    base, premium extras and addons, plus the lines they were calculated from.
+    """
+
+    package = serializers.IntegerField(source='package_id')
+    guests_count = serializers.IntegerField()
+    base = serializers.DecimalField(max_digits=10, decimal_places=2)
+    extras = serializers.DecimalField(max_digits=10, decimal_places=2)
+    addons_total = serializers.DecimalField(max_digits=10, decimal_places=2)
+    total_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+    items = OrderItemSerializer(many=True)
+    addons = OrderAddonSerializer(many=True)
+
+    @classmethod
+    def for_order(cls, order, items, addons):
+        breakdown = order.calculate_price_breakdown(items=items, addons=addons)
+        return cls({
+            'package_id': order.package_id,
+            'guests_count': order.guests_count,
+            'base': breakdown['base'],
+            'extras': breakdown['extras'],
+            'addons_total': breakdown['addons'],
+            'total_price': breakdown['total'],
+            'items': items,
+            'addons': addons,
+        })
+
+
+class OrderDashboardQuerySerializer(serializers.Serializer):
+    """
+    Query params of the vendor dashboard.
+    """
+    PERIODS = ['day', 'week', 'month']
+
+    period = serializers.ChoiceField(choices=PERIODS, default='day')
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    package = serializers.IntegerField(required=False)
+    vendor = serializers.IntegerField(required=False)  # admin only
+
+    def validate(self, attrs):
+        if attrs.get('date_from') and attrs.get('date_to') and attrs['date_from'] > attrs['date_to']:
+            raise serializers.ValidationError("date_from לא יכול להיות אחרי date_to.")
+        return attrs
+
+
+class OrderBulkTransitionSerializer(serializers.Serializer):
+    """
+    Bulk status change: {"action": "accept", "ids": [1, 2, 3]}
+    """
+
+    action = serializers.ChoiceField(choices=list(Order.TRANSITIONS))
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=1000,
+    )
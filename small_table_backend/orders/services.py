@@ -0,0 +1,202 @@
+from django.db import transaction, DatabaseError
+from rest_framework import serializers
+
+from .models import Order, OrderItem, OrderAddon, OrderDailyRollup
+from packages.models import Package
+from packages.rules import get_package_rules, with_menu_versions
+
+
+class PackageCatalog:
+    """
+    Ordering rules of one or more packages (packages.rules.PackageRules):
+    - active dishes per (package_category_id, product_id), category bounds, guest bounds
+    - active addons per id
+    Compiled once per package version and cached, so resolving and validating a whole
+    order selection runs no queries.
+    """
+
+    def __init__(self, packages, rules):
+        self.packages = {package.id: package for package in packages}
+        self.rules = rules
+
+    @classmethod
+    def load(cls, packages):
+        packages = list(packages)
+        return cls(packages, get_package_rules(packages))
+
+    @classmethod
+    def load_ids(cls, package_ids):
+        return cls.load(with_menu_versions(
+            Package.objects.filter(id__in=set(package_ids)).select_related('vendor')
+        ))
+
+    @property
+    def items(self):
+        return {key: item for rules in self.rules.values() for key, item in rules.items.items()}
+
+    @property
+    def addons(self):
+        return {addon_id: addon for rules in self.rules.values() for addon_id, addon in rules.addons.items()}
+
+    def get_item(self, package, package_category_id, product_id):
+        return self.rules[package.id].get_item(package_category_id, product_id)
+
+    def get_addon(self, package, addon_id):
+        return self.rules[package.id].get_addon(addon_id)
+
+
+def build_order(catalog, package, guests_count, items=(), addons=(), **fields):
+    """
+    Build an unsaved order with its items and addons – nothing is written.
+    - items: dicts with package_category_id / product_id
+    - addons: dicts with addon_id / quantity; the package's active included addons
+      that are not in the list are attached with quantity 1
+    The whole selection is checked against the package rules first (guest bounds,
+    category min/max, allowed dishes / addons) – every violation is reported.
+    total_price is calculated in memory from the catalog data.
+    """
+    rules = catalog.rules[package.id]
+    errors = rules.validate(guests_count, items, addons)
+    if errors:
+        raise serializers.ValidationError(errors)
+
+    # תוספות שכלולות בחבילה – מצורפות גם כשהלקוח לא שלח אותן
+    requested = {addon_data['addon_id'] for addon_data in addons}
+    addons = [
+        *addons,
+        *({'addon_id': addon.id} for addon in rules.included_addons if addon.id not in requested),
+    ]
+
+    order = Order(
+        package=package,
+        vendor=package.vendor,
+        guests_count=guests_count,
+        **fields
+    )
+
+    order_items = []
+    for item_data in items:
+        package_category_id = item_data['package_category_id']
+        product_id = item_data['product_id']
+
+        pci = catalog.get_item(package, package_category_id, product_id)
+        order_items.append(OrderItem(
+            order=order,
+            package_category=pci.package_category,
+            product=pci.product,
+            is_premium=pci.is_premium,
+            extra_price_per_person=pci.extra_price_per_person,
+        ))
+
+    order_addons = []
+    for addon_data in addons:
+        addon = catalog.get_addon(package, addon_data['addon_id'])
+        order_addon = OrderAddon(
+            order=order,
+            addon=addon,
+            quantity=addon_data.get('quantity', 1),
+            price_snapshot=addon.price,
+        )
+        order_addon.subtotal = order_addon.calculate_subtotal()
+        order_addons.append(order_addon)
+
+    order.total_price = order.calculate_total_price(items=order_items, addons=order_addons)
+    return order, order_items, order_addons
+
+
+def save_orders(built_orders):
+    """
+    Write built orders (as returned by build_order) with one bulk_create per table.
+    The saved items/addons are attached to each order as its prefetched relations,
+    so serializing the result does not query them again.
+    """
+    built_orders = list(built_orders)
+    if not built_orders:
+        return []
+
+    orders = Order.objects.bulk_create([order for order, _, _ in built_orders])
+
+    items = [item for _, order_items, _ in built_orders for item in order_items]
+    addons = [addon for _, _, order_addons in built_orders for addon in order_addons]
+    OrderItem.objects.bulk_create(items)
+    OrderAddon.objects.bulk_create(addons)
+
+    # bulk_create skips Order.save – refresh the dashboard cells of the new orders here
+    OrderDailyRollup.refresh_cells(order.rollup_cell() for order in orders)
+
+    for order, order_items, order_addons in built_orders:
+        _cache_related(order, 'items', order_items)
+        _cache_related(order, 'addons', order_addons)
+
+    return orders
+
+
+def save_order(order, items, addons):
+    save_orders([(order, items, addons)])
+    return order
+
+
+def _cache_related(order, related_name, objs):
+    queryset = getattr(order, related_name).all()
+    queryset._result_cache = list(objs)
+    queryset._prefetch_done = True
+    order.__dict__.setdefault('_prefetched_objects_cache', {})[related_name] = queryset
+
+
+
+ORDER_IMPORT_CHUNK_SIZE = 200
+
+
+def import_orders(rows, user, chunk_size=ORDER_IMPORT_CHUNK_SIZE):
+    """
+    Batch import of order payloads (same shape as OrderSerializer) for one user:
+    - each row is validated without queries (OrderImportRowSerializer)
+    - all packages with their items/addons are loaded once into a PackageCatalog
+    - valid rows are inserted chunk by chunk, each chunk in its own transaction
+    Returns a report per row: {'row', 'status': 'created'|'error', 'id' | 'errors'}.
+    """
+    from .serializers import OrderImportRowSerializer
+
+    report = [None] * len(rows)
+    validated = []
+
+    for index, row in enumerate(rows):
+        serializer = OrderImportRowSerializer(data=row)
+        if serializer.is_valid():
+            validated.append((index, serializer.validated_data))
+        else:
+            report[index] = {'row': index, 'status': 'error', 'errors': serializer.errors}
+
+    catalog = PackageCatalog.load_ids(data['package_id'] for _, data in validated)
+
+    built = []
+    for index, data in validated:
+        data = dict(data)
+        package = catalog.packages.get(data.pop('package_id'))
+        if package is None or not package.is_active:
+            report[index] = {
+                'row': index,
+                'status': 'error',
+                'errors': ["החבילה לא קיימת או שאיננה פעילה."],
+            }
+            continue
+
+        try:
+            built.append((index, build_order(catalog, package=package, user=user, **data)))
+        except serializers.ValidationError as exc:
+            report[index] = {'row': index, 'status': 'error', 'errors': exc.detail}
+
+    for start in range(0, len(built), chunk_size):
+        chunk = built[start:start + chunk_size]
+        try:
+            with transaction.atomic():
+                save_orders(order for _, order in chunk)
+        except DatabaseError as exc:
+            for index, _ in chunk:
+                report[index] = {'row': index, 'status': 'error', 'errors': [str(exc)]}
+            continue
+
+        for index, (order, _, _) in chunk:
+            report[index] = {'row': index, 'status': 'created', 'id': order.id}
+
+    return report
@@ -1,3 +1,648 @@
+import json
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .models import Order, OrderItem, OrderAddon, OrderDailyRollup
+from users.models import User
+from vendors.models import VendorProfile
+from products.models import Product
+from packages.models import Package, PackageCategory, PackageCategoryItem
+from addons.models import Addon, AddonCategory
+from packages.rules import clear_package_rules
+
+
+class OrderTestData:
+    """
+    Shared fixture: a vendor with one package, two categories and a few addons.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user(username='customer', password='pass1234')
+        vendor_user = User.objects.create_user(username='vendor', password='pass1234')
+
+        cls.vendor = VendorProfile.objects.create(
+            user=vendor_user, business_name='קייטרינג', is_active=True
+        )
+        cls.package = Package.objects.create(
+            vendor=cls.vendor, name='חבילת חתונה', price_per_person=Decimal('100.00')
+        )
+        cls.salads = PackageCategory.objects.create(package=cls.package, name='סלטים')
+        cls.mains = PackageCategory.objects.create(package=cls.package, name='עיקריות')
+
+        cls.salad_items = []
+        for i in range(40):
+            product = Product.objects.create(vendor=cls.vendor, product_name=f'סלט {i}')
+            cls.salad_items.append(PackageCategoryItem.objects.create(
+                package_category=cls.salads, product=product
+            ))
+
+        asado = Product.objects.create(vendor=cls.vendor, product_name='אסאדו')
+        cls.premium_item = PackageCategoryItem.objects.create(
+            package_category=cls.mains,
+            product=asado,
+            is_premium=True,
+            extra_price_per_person=Decimal('15.00'),
+        )
+
+        drinks = AddonCategory.objects.create(name='שתייה')
+        cls.per_person_addon = Addon.objects.create(
+            package=cls.package, category=drinks, name='בר שתייה',
+            price=Decimal('12.50'), pricing_type=Addon.PRICING_PER_PERSON,
+        )
+        cls.fixed_addons = [
+            Addon.objects.create(
+                package=cls.package, category=drinks, name=f'מלצר {i}',
+                price=Decimal('400.00'), pricing_type=Addon.PRICING_FIXED,
+            )
+            for i in range(10)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+
+    def order_payload(self, salads_count, fixed_addons_count, guests_count=100):
+        items = [
+            {'package_category': pci.package_category_id, 'product': pci.product_id}
+            for pci in self.salad_items[:salads_count]
+        ]
+        items.append({
+            'package_category': self.premium_item.package_category_id,
+            'product': self.premium_item.product_id,
+        })
+        addons = [{'addon': self.per_person_addon.id, 'quantity': 1}]
+        addons += [
+            {'addon': addon.id, 'quantity': 2}
+            for addon in self.fixed_addons[:fixed_addons_count]
+        ]
+        return {
+            'package': self.package.id,
+            'guests_count': guests_count,
+            'items': items,
+            'addons': addons,
+        }
+
+
+class OrderCreateTests(OrderTestData, TestCase):
+
+    def create_order(self, payload):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/orders/', payload, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response, len(ctx.captured_queries)
+
+    def test_total_price_is_calculated_in_memory(self):
+        response, _ = self.create_order(self.order_payload(salads_count=3, fixed_addons_count=1))
+
+        # 100*100 + 15*100 + 12.5*100 + 400*2
+        self.assertEqual(response.data['total_price'], '13550.00')
+
+        order = Order.objects.get(pk=response.data['id'])
+        self.assertEqual(order.total_price, order.calculate_total_price())
+        self.assertEqual(order.items.count(), 4)
+        self.assertEqual(order.addons.count(), 2)
+        self.assertEqual(len(response.data['items']), 4)
+        self.assertEqual(response.data['items'][-1]['extra_subtotal'], Decimal('1500.00'))
+
+    def test_query_count_does_not_depend_on_menu_size(self):
+        # the first order of the day also creates its dashboard rollup row
+        self.create_order(self.order_payload(salads_count=1, fixed_addons_count=0))
+
+        _, small = self.create_order(self.order_payload(salads_count=1, fixed_addons_count=1))
+        _, large = self.create_order(self.order_payload(salads_count=40, fixed_addons_count=10))
+
+        self.assertEqual(small, large)
+
+    def test_included_addons_are_attached(self):
+        drinks = self.per_person_addon.category
+        waiters = Addon.objects.create(
+            package=self.package, category=drinks, name='מלצרים', price=Decimal('300.00'), is_included=True,
+        )
+        water = Addon.objects.create(
+            package=self.package, category=drinks, name='מים', price=Decimal('2.00'),
+            pricing_type=Addon.PRICING_PER_PERSON, is_included=True,
+        )
+        Addon.objects.create(
+            package=self.package, category=drinks, name='קפה', price=Decimal('999.00'),
+            is_included=True, is_active=False,
+        )
+
+        payload = self.order_payload(salads_count=1, fixed_addons_count=0)
+        payload['addons'].append({'addon': water.id, 'quantity': 2})
+        response, _ = self.create_order(payload)
+
+        addons = {addon.addon_id: (addon.quantity, addon.subtotal) for addon in Order.objects.get().addons.all()}
+        self.assertEqual(addons, {
+            self.per_person_addon.id: (1, Decimal('1250.00')),
+            water.id: (2, Decimal('400.00')),
+            waiters.id: (1, Decimal('300.00')),
+        })
+        # 100*100 + 15*100 + 12.5*100 + 2*100*2 + 300
+        self.assertEqual(response.data['total_price'], '13450.00')
+
+    def test_item_outside_package_is_rejected(self):
+        other_package = Package.objects.create(
+            vendor=self.vendor, name='חבילה אחרת', price_per_person=Decimal('50.00')
+        )
+        other_category = PackageCategory.objects.create(package=other_package, name='סלטים')
+        payload = self.order_payload(salads_count=1, fixed_addons_count=0)
+        payload['items'][0]['package_category'] = other_category.id
+
+        response = self.client.post('/api/orders/', payload, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+
+class OrderRulesTests(OrderTestData, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        clear_package_rules()
+
+    def post(self, payload):
+        return self.client.post('/api/orders/', payload, format='json')
+
+    def test_guest_bounds(self):
+        self.package.min_guests = 50
+        self.package.max_guests = 200
+        self.package.save()
+
+        for guests_count in (20, 300):
+            response = self.post(self.order_payload(salads_count=1, fixed_addons_count=0, guests_count=guests_count))
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.post(self.order_payload(1, 0, guests_count=200)).status_code, 201)
+
+    def test_guest_bounds_on_update(self):
+        order_id = self.post(self.order_payload(1, 0, guests_count=100)).data['id']
+        self.package.min_guests = 50
+        self.package.max_guests = 200
+        self.package.save()
+
+        for guests_count in (20, 300):
+            response = self.client.patch(f'/api/orders/{order_id}/', {'guests_count': guests_count}, format='json')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('guests_count', response.data)
+        self.assertEqual(Order.objects.get(pk=order_id).guests_count, 100)
+
+        response = self.client.patch(f'/api/orders/{order_id}/', {'guests_count': 150}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        # note בלבד – בלי בדיקת גבולות
+        response = self.client.patch(f'/api/orders/{order_id}/', {'note': 'ללא גלוטן'}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+
+    def test_all_category_violations_are_reported_together(self):
+        PackageCategory.objects.filter(pk=self.salads.pk).update(max_select=2)
+        PackageCategory.objects.filter(pk=self.mains.pk).update(min_select=1)
+        self.package.save()  # update() בלי signals – גרסת התפריט מתקדמת דרך החבילה
+
+        payload = self.order_payload(salads_count=3, fixed_addons_count=0)
+        payload['items'].pop()  # בלי מנה עיקרית
+
+        response = self.post(payload)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.data), 2)
+        self.assertFalse(Order.objects.exists())
+
+    def test_duplicate_and_inactive_dishes_are_rejected(self):
+        payload = self.order_payload(salads_count=1, fixed_addons_count=0)
+        payload['items'].append(payload['items'][0])
+        self.assertEqual(self.post(payload).status_code, 400)
+
+        self.mains.is_active = False
+        self.mains.save()
+        self.assertEqual(self.post(self.order_payload(1, 0)).status_code, 400)
+
+    def test_rules_are_compiled_once_per_package_version(self):
+        menu_tables = ('packages_packagecategory', 'packages_packagecategoryitem', 'addons_addon')
+
+        def menu_queries():
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.post(self.order_payload(salads_count=2, fixed_addons_count=1))
+            self.assertEqual(response.status_code, 201, response.data)
+            return [
+                q['sql'] for q in ctx.captured_queries
+                if any(f'FROM "{table}"' in q['sql'] for table in menu_tables)
+            ]
+
+        self.assertEqual(len(menu_queries()), 3)
+        self.assertEqual(menu_queries(), [])
+
+        # שינוי בתפריט – החוקים נבנים מחדש ונאכפים מיד
+        self.salads.max_select = 1
+        self.salads.save()
+        response = self.post(self.order_payload(salads_count=2, fixed_addons_count=1))
+        self.assertEqual(response.status_code, 400)
+
+
+class OrderQuoteTests(OrderTestData, TestCase):
+
+    def test_quote_returns_breakdown_without_writing(self):
+        payload = self.order_payload(salads_count=3, fixed_addons_count=1)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/orders/quote/', payload, format='json')
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['base'], '10000.00')
+        self.assertEqual(response.data['extras'], '1500.00')
+        self.assertEqual(response.data['addons_total'], '2050.00')
+        self.assertEqual(response.data['total_price'], '13550.00')
+        self.assertEqual(len(response.data['items']), 4)
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(any(
+            q['sql'].startswith(('INSERT', 'UPDATE', 'DELETE')) for q in ctx.captured_queries
+        ))
+
+    def test_quote_matches_created_order(self):
+        payload = self.order_payload(salads_count=5, fixed_addons_count=4, guests_count=73)
+
+        quote = self.client.post('/api/orders/quote/', payload, format='json')
+        created = self.client.post('/api/orders/', payload, format='json')
+
+        self.assertEqual(quote.data['total_price'], created.data['total_price'])
+
+
+class OrderImportTests(OrderTestData, TestCase):
+
+    def test_import_reports_each_row(self):
+        good = self.order_payload(salads_count=2, fixed_addons_count=1)
+        bad_item = self.order_payload(salads_count=2, fixed_addons_count=1)
+        bad_item['items'][0]['product'] = 999999
+        invalid = {'package': self.package.id, 'guests_count': 0, 'items': []}
+
+        response = self.client.post('/api/orders/import/', {
+            'orders': [good, bad_item, invalid, good],
+            'chunk_size': 1,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(
+            [row['status'] for row in response.data['results']],
+            ['created', 'error', 'error', 'created'],
+        )
+        self.assertEqual(Order.objects.filter(user=self.customer).count(), 2)
+        for order in Order.objects.all():
+            self.assertEqual(order.total_price, order.calculate_total_price())
+
+    def test_import_query_count_does_not_depend_on_batch_size(self):
+        def run(count):
+            rows = [self.order_payload(salads_count=3, fixed_addons_count=2)] * count
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post('/api/orders/import/', {'orders': rows}, format='json')
+            self.assertEqual(response.data['created'], count)
+            return len(ctx.captured_queries)
+
+        run(1)  # creates the dashboard rollup row of the day
+        self.assertEqual(run(2), run(20))
+
+
+class OrderTotalTests(OrderTestData, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        response = self.client.post(
+            '/api/orders/', self.order_payload(salads_count=2, fixed_addons_count=1), format='json'
+        )
+        self.order = Order.objects.get(pk=response.data['id'])
+
+    def assertTotalIsConsistent(self):
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total_price, self.order.calculate_total_price())
+
+    def test_item_changes_apply_delta(self):
+        item = OrderItem.objects.create(
+            order=self.order,
+            package_category=self.mains,
+            product=self.premium_item.product,
+            extra_price_per_person=Decimal('7.50'),
+        )
+        self.assertTotalIsConsistent()
+
+        item = OrderItem.objects.get(pk=item.pk)
+        item.extra_price_per_person = Decimal('3.00')
+        item.save()
+        self.assertTotalIsConsistent()
+
+        OrderItem.objects.get(pk=item.pk).delete()
+        self.assertTotalIsConsistent()
+
+    def test_addon_changes_apply_delta(self):
+        order_addon = OrderAddon.objects.get(order=self.order, addon=self.fixed_addons[0])
+        order_addon.quantity = 5
+        with CaptureQueriesContext(connection) as ctx:
+            order_addon.save()
+        self.assertTotalIsConsistent()
+        self.assertTrue(any('"total_price" + ' in q['sql'] for q in ctx.captured_queries))
+
+        order_addon = OrderAddon.objects.get(pk=order_addon.pk)
+        order_addon.delete()
+        self.assertTotalIsConsistent()
+
+    def test_addon_of_an_order_addon_cannot_be_swapped(self):
+        order_addon = OrderAddon.objects.get(order=self.order, addon=self.fixed_addons[0])
+        self.client.force_authenticate(self.vendor.user)
+        response = self.client.patch(
+            f'/api/order-addons/{order_addon.id}/',
+            {'addon': self.fixed_addons[1].id, 'quantity': 3},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+
+        order_addon.refresh_from_db()
+        self.assertEqual((order_addon.addon_id, order_addon.quantity), (self.fixed_addons[0].id, 3))
+        self.assertTotalIsConsistent()
+
+        response = self.client.patch(f'/api/order-addons/{order_addon.id}/', {'addon': 999999}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        order_addon.refresh_from_db()
+        self.assertEqual(order_addon.addon_id, self.fixed_addons[0].id)
+
+    def test_note_edit_skips_recompute(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.patch(
+                f'/api/orders/{self.order.id}/', {'note': 'בלי בוטנים'}, format='json'
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertFalse(any('total_price' in q['sql'] and q['sql'].startswith('UPDATE')
+                             for q in ctx.captured_queries))
+        self.assertTotalIsConsistent()
+
+    def test_guests_change_reprices_order(self):
+        response = self.client.patch(
+            f'/api/orders/{self.order.id}/', {'guests_count': 50}, format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        # 100*50 + 15*50 + 12.5*50 + 400*2
+        self.assertEqual(response.data['total_price'], '7175.00')
+        self.assertTotalIsConsistent()
+
+
+class OrderListTests(OrderTestData, TestCase):
+
+    def test_list_is_cursor_paginated(self):
+        for _ in range(5):
+            self.client.post('/api/orders/', self.order_payload(1, 0), format='json')
+
+        seen = []
+        url = '/api/orders/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen += [order['id'] for order in response.data['results']]
+            url = response.data['next']
+
+        self.assertEqual(seen, sorted(seen, reverse=True))
+        self.assertEqual(len(seen), 5)
+
+    def list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/orders/')
+        self.assertEqual(response.status_code, 200)
+        return len(response.data['results']), len(ctx.captured_queries)
+
+    def test_list_queries_do_not_grow_with_orders(self):
+        for _ in range(2):
+            self.client.post('/api/orders/', self.order_payload(2, 1), format='json')
+        self.client.get('/api/orders/')
+        few = self.list_queries()
+
+        for _ in range(4):
+            self.client.post('/api/orders/', self.order_payload(2, 1), format='json')
+        many = self.list_queries()
+
+        self.assertEqual((few[0], many[0]), (2, 6))
+        self.assertEqual(many[1], few[1])
+
+    def test_range_filters(self):
+        for guests_count in (40, 90, 150, 300):
+            self.client.post('/api/orders/', self.order_payload(1, 0, guests_count), format='json')
+
+        response = self.client.get('/api/orders/?guests_count__gte=90&guests_count__lte=150')
+        self.assertEqual(sorted(o['guests_count'] for o in response.data['results']), [90, 150])
+
+        response = self.client.get('/api/orders/?total_price__gte=20000')
+        self.assertEqual([o['guests_count'] for o in response.data['results']], [300])
+
+        response = self.client.get('/api/orders/?created_at__lt=2000-01-01T00:00:00Z')
+        self.assertEqual(response.data['results'], [])
+
+
+class OrderAddonListTests(OrderTestData, TestCase):
+
+    def test_list_is_scoped_to_the_caller(self):
+        own = self.client.post('/api/orders/', self.order_payload(1, 2), format='json').data
+
+        other = User.objects.create_user(username='other', password='pass1234')
+        self.client.force_authenticate(other)
+        self.client.post('/api/orders/', self.order_payload(1, 1), format='json')
+
+        self.client.force_authenticate(self.customer)
+        response = self.client.get('/api/order-addons/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({a['order'] for a in response.data['results']}, {own['id']})
+        self.assertEqual(len(response.data['results']), 3)
+
+        response = self.client.get(f'/api/order-addons/?order={own["id"]}')
+        self.assertEqual(len(response.data['results']), 3)
+
+        self.client.force_authenticate(self.vendor.user)
+        response = self.client.get('/api/order-addons/')
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_list_query_count_does_not_depend_on_page_size(self):
+        for _ in range(5):
+            self.client.post('/api/orders/', self.order_payload(1, 3), format='json')
+
+        def run(page_size):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(f'/api/order-addons/?page_size={page_size}')
+            self.assertEqual(len(response.data['results']), page_size)
+            return len(ctx.captured_queries)
+
+        run(1)  # the first request also resolves the caller's vendor profile
+        self.assertEqual(run(1), run(20))
+
+
+class OrderExportTests(OrderTestData, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        for guests_count in (80, 120, 200):
+            self.client.post(
+                '/api/orders/', self.order_payload(2, 1, guests_count=guests_count), format='json'
+            )
+
+    def test_ndjson_export(self):
+        response = self.client.get('/api/orders/export/?format=ndjson&ordering=guests_count')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['guests_count'] for row in rows], [80, 120, 200])
+        self.assertEqual(rows[0]['customer'], 'customer')
+
+    def test_csv_export_is_scoped_to_vendor(self):
+        self.client.force_authenticate(self.vendor.user)
+        response = self.client.get('/api/orders/export/?format=csv')
+
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertTrue(lines[0].startswith('id,created_at,status'))
+        self.assertEqual(len(lines), 4)
+
+        other = User.objects.create_user(username='other', password='pass1234')
+        self.client.force_authenticate(other)
+        response = self.client.get('/api/orders/export/?format=csv')
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lines), 1)
+
+
+class OrderDashboardTests(OrderTestData, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        for guests_count in (50, 100):
+            self.client.post('/api/orders/', self.order_payload(1, 0, guests_count), format='json')
+
+    def rollup_rows(self):
+        return sorted(OrderDailyRollup.objects.values_list(
+            'package', 'day', 'status', 'orders_count', 'revenue', 'guests'
+        ))
+
+    def test_rollups_follow_order_changes(self):
+        order = Order.objects.get(guests_count=50)
+        order.status = 'cancelled'
+        order.save(update_fields=['status'])
+
+        OrderItem.objects.create(
+            order=Order.objects.get(guests_count=100),
+            package_category=self.mains,
+            product=self.premium_item.product,
+            extra_price_per_person=Decimal('1.00'),
+        )
+
+        incremental = self.rollup_rows()
+        call_command('rebuild_order_rollups', stdout=open('/dev/null', 'w'))
+
+        self.assertEqual(incremental, self.rollup_rows())
+        self.assertEqual([row[2] for row in incremental], ['cancelled', 'new'])
+
+    def test_verify_totals_fix_refreshes_rollups(self):
+        order = Order.objects.get(guests_count=50)
+        Order.objects.filter(pk=order.pk).update(total_price=Decimal('1.00'))
+        call_command('rebuild_order_rollups', stdout=open('/dev/null', 'w'))
+
+        call_command('verify_order_totals', fix=True, stdout=open('/dev/null', 'w'))
+        self.assertEqual(Order.objects.get(pk=order.pk).total_price, order.total_price)
+
+        repaired = self.rollup_rows()
+        call_command('rebuild_order_rollups', stdout=open('/dev/null', 'w'))
+        self.assertEqual(repaired, self.rollup_rows())
+
+    def test_vendor_dashboard_reads_rollups_only(self):
+        self.client.force_authenticate(self.vendor.user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/orders/dashboard/?period=month')
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertFalse(any('"orders_order"' in q['sql'] for q in ctx.captured_queries))
+        [row] = response.data['results']
+        self.assertEqual(row['orders_count'], 2)
+        self.assertEqual(row['guests'], 150)
+        self.assertEqual(Decimal(row['revenue']), sum(o.total_price for o in Order.objects.all()))
+
+    def test_revenue_has_two_decimal_places(self):
+        self.client.force_authenticate(self.vendor.user)
+        revenue = f"{sum(o.total_price for o in Order.objects.all()):.2f}"
+
+        for period in ('day', 'week', 'month'):
+            response = self.client.get(f'/api/orders/dashboard/?period={period}')
+            self.assertEqual(response.status_code, 200, response.data)
+            self.assertEqual([row['revenue'] for row in response.data['results']], [revenue])
+
+    def test_daily_dashboard(self):
+        self.client.force_authenticate(self.vendor.user)
+
+        response = self.client.get('/api/orders/dashboard/?period=day')
+        self.assertEqual(response.status_code, 200, response.data)
+        [row] = response.data['results']
+        self.assertEqual(row['orders_count'], 2)
+
+    def test_customer_has_no_dashboard(self):
+        response = self.client.get('/api/orders/dashboard/')
+        self.assertEqual(response.status_code, 403)
+
+
+class OrderTransitionTests(OrderTestData, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.orders = [
+            Order.objects.get(pk=self.client.post(
+                '/api/orders/', self.order_payload(1, 0), format='json'
+            ).data['id'])
+            for _ in range(3)
+        ]
+        self.vendor_client = APIClient()
+        self.vendor_client.force_authenticate(self.vendor.user)
+
+    def test_vendor_moves_order_through_states(self):
+        order = self.orders[0]
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.vendor_client.post(f'/api/orders/{order.id}/accept/')
+        self.assertEqual(response.data['status'], 'processing')
+        [update] = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE "orders_order"')]
+        self.assertIn('"status" = ', update.split('WHERE')[1])
+
+        response = self.vendor_client.post(f'/api/orders/{order.id}/complete/')
+        self.assertEqual(response.data['status'], 'completed')
+
+        response = self.vendor_client.post(f'/api/orders/{order.id}/cancel/')
+        self.assertEqual(response.status_code, 409)
+
+    def test_stale_transition_does_not_overwrite(self):
+        stale = Order.objects.get(pk=self.orders[0].pk)
+        Order.objects.filter(pk=stale.pk).update(status='cancelled')
+
+        self.assertFalse(stale.apply_transition('accept'))
+        self.assertEqual(Order.objects.get(pk=stale.pk).status, 'cancelled')
+
+    def test_customer_can_only_cancel_new_orders(self):
+        order = self.orders[0]
+
+        self.assertEqual(self.client.post(f'/api/orders/{order.id}/accept/').status_code, 403)
+        self.assertEqual(self.client.patch(
+            f'/api/orders/{order.id}/', {'status': 'completed'}, format='json'
+        ).status_code, 403)
+
+        response = self.client.post(f'/api/orders/{order.id}/cancel/')
+        self.assertEqual(response.data['status'], 'cancelled')
+
+    def test_bulk_transition(self):
+        self.orders[0].apply_transition('cancel')
+
+        response = self.vendor_client.post('/api/orders/bulk-transition/', {
+            'action': 'accept',
+            'ids': [order.id for order in self.orders],
+        }, format='json')
 
-# Create your tests here.
+        self.assertEqual(response.data['moved'], sorted(o.id for o in self.orders[1:]))
+        self.assertEqual(response.data['skipped'], [self.orders[0].id])
+        self.assertEqual(
+            dict(OrderDailyRollup.objects.values_list('status', 'orders_count')),
+            {'cancelled': 1, 'processing': 2},
+        )
+        self.assertEqual(self.client.post('/api/orders/bulk-transition/', {
+            'action': 'accept', 'ids': [self.orders[1].id],
+        }, format='json').status_code, 403)
@@ -1,11 +1,40 @@
+import csv
+import json
+from itertools import chain
+
+from django.db.models import F, Prefetch, Sum
+from django.db.models.functions import TruncWeek, TruncMonth
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import viewsets
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.permissions import IsAuthenticated
 
-from .models import Order, OrderAddon
-from .serializers import OrderSerializer, OrderAddonSerializer
+from .models import Order, OrderItem, OrderAddon, OrderDailyRollup
+from .serializers import (
+    OrderSerializer,
+    OrderAddonSerializer,
+    OrderAddonListSerializer,
+    OrderAddonUpdateSerializer,
+    OrderQuoteSerializer,
+    OrderImportSerializer,
+    OrderDashboardQuerySerializer,
+    OrderBulkTransitionSerializer,
+)
+from .services import import_orders, ORDER_IMPORT_CHUNK_SIZE
+from .filters import OrderFilter, OrderAddonFilter
 from .permissions import IsOrderOwnerOrVendorOrAdmin, IsOrderAddonOwnerOrVendorOrAdmin
+from api.renderers import CSVStreamRenderer, NDJSONStreamRenderer
+from users.roles import get_role_context
+
+
+class _Echo:
+    """File-like object for csv.writer – returns each line instead of buffering it."""
+
+    def write(self, value):
+        return value
 
 
 class OrderViewSet(viewsets.ModelViewSet):
@@ -19,57 +48,290 @@ class OrderViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, IsOrderOwnerOrVendorOrAdmin]
 
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['status', 'vendor', 'package']
+    filterset_class = OrderFilter
     search_fields = ['user__username', 'vendor__business_name', 'note']
     ordering_fields = ['created_at', 'total_price', 'guests_count', 'status']
     ordering = ['-created_at']
 
-    def get_queryset(self):
-        user = self.request.user
+    # עמודות הייצוא – הזמנה אחת לשורה, בלי פריטים/תוספות מקוננים
+    export_fields = {
+        'id': 'id',
+        'created_at': 'created_at',
+        'status': 'status',
+        'package': 'package_id',
+        'package_name': 'package__name',
+        'customer': 'user__username',
+        'customer_email': 'user__email',
+        'guests_count': 'guests_count',
+        'total_price': 'total_price',
+        'note': 'note',
+    }
+    export_chunk_size = 2000
 
-        has_admin_role = getattr(user, 'user_roles', None) and user.user_roles.filter(
-            role__name='admin'
-        ).exists()
+    def get_scoped_queryset(self):
+        """
+        The orders this user may see, without joins
+        (shared by the regular endpoints and the export).
+        """
+        role_context = get_role_context(self.request)
 
-        if user.is_staff or user.is_superuser or has_admin_role:
-            return Order.objects.select_related('user', 'vendor', 'package') \
-                .prefetch_related('items', 'addons')
+        if role_context.is_admin:
+            return Order.objects.all()
 
         # ספק – רואה הזמנות אליו
-        if hasattr(user, 'vendor_profile'):
-            return Order.objects.filter(
-                vendor=user.vendor_profile
-            ).select_related('user', 'vendor', 'package') \
-             .prefetch_related('items', 'addons')
+        if role_context.is_vendor:
+            return Order.objects.filter(vendor_id=role_context.vendor_id)
+
+        return Order.objects.filter(user_id=role_context.user_id)
 
-        return Order.objects.filter(
-            user=user
-        ).select_related('user', 'vendor', 'package') \
-         .prefetch_related('items', 'addons')
+    def get_queryset(self):
+        # שמות המנות / הקטגוריות / התוספות של כל ההזמנות בעמוד – בשאילתה אחת לכל סוג
+        return self.get_scoped_queryset() \
+            .select_related('user', 'vendor', 'package') \
+            .prefetch_related(
+                Prefetch('items', queryset=OrderItem.objects.select_related('product', 'package_category')),
+                Prefetch('addons', queryset=OrderAddon.objects.select_related('addon', 'addon__category')),
+            )
 
     def perform_create(self, serializer):
 
         serializer.save()
 
+    def _is_vendor_or_admin(self, order=None):
+        role_context = get_role_context(self.request)
+
+        if role_context.is_admin:
+            return True
+
+        if not role_context.is_vendor:
+            return False
+        return order is None or order.vendor_id == role_context.vendor_id
+
+    def _transition(self, action):
+        """
+        Status change of one order – a single conditional UPDATE (see Order.apply_transition).
+        Vendor/admin: every transition; customer: only cancelling a new order.
+        """
+        order = self.get_object()
+
+        customer_cancel = action == 'cancel' and order.status == Order.STATUS_NEW
+        if not (self._is_vendor_or_admin(order) or customer_cancel):
+            return Response(
+                {"detail": "אין הרשאה לשנות את סטטוס ההזמנה."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        if not order.can_transition(action):
+            return Response(
+                {"detail": f"לא ניתן לבצע '{action}' להזמנה בסטטוס '{order.status}'."},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        if not order.apply_transition(action):
+            return Response(
+                {"detail": "סטטוס ההזמנה שונה במקביל – יש לרענן ולנסות שוב."},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        return Response(self.get_serializer(order).data)
+
+    @action(detail=True, methods=['post'])
+    def accept(self, request, pk=None):
+        return self._transition('accept')
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        return self._transition('complete')
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        return self._transition('cancel')
+
+    @action(detail=False, methods=['post'], url_path='bulk-transition')
+    def bulk_transition(self, request):
+        """
+        Move many orders at once (vendor kitchen screens):
+        {"action": "accept"|"complete"|"cancel", "ids": [...]}
+        Orders that are not in an allowed source status are skipped.
+        """
+        if not self._is_vendor_or_admin():
+            return Response(
+                {"detail": "רק ספקים יכולים לעדכן הזמנות במרוכז."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = OrderBulkTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = set(serializer.validated_data['ids'])
+
+        moved = Order.bulk_transition(
+            serializer.validated_data['action'],
+            self.get_scoped_queryset().filter(pk__in=ids),
+        )
+
+        return Response({
+            'moved': sorted(moved),
+            'skipped': sorted(ids - set(moved)),
+        })
+
+    @action(detail=False, methods=['post'])
+    def quote(self, request):
+        """
+        Price quote for an order – same payload as create, nothing is written to the DB.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        order, items, addons = serializer.build(serializer.validated_data)
+        return Response(OrderQuoteSerializer.for_order(order, items, addons).data)
+
+    @action(
+        detail=False,
+        methods=['get'],
+        renderer_classes=[NDJSONStreamRenderer, CSVStreamRenderer],
+    )
+    def export(self, request):
+        """
+        Streaming export of the user's orders (same scoping and filters as the list):
+        /api/orders/export/?format=csv|ndjson
+        Rows are read in chunks and written one by one – memory does not grow with the history.
+        """
+        queryset = self.filter_queryset(self.get_scoped_queryset())
+        names = list(self.export_fields)
+        rows = queryset.values_list(*self.export_fields.values()) \
+            .iterator(chunk_size=self.export_chunk_size)
+
+        if request.accepted_renderer.format == 'csv':
+            writer = csv.writer(_Echo())
+            # BOM – so Excel opens the Hebrew text as UTF-8
+            lines = chain(
+                ['\ufeff' + writer.writerow(names)],
+                (writer.writerow(row) for row in rows),
+            )
+            response = StreamingHttpResponse(lines, content_type='text/csv; charset=utf-8')
+            filename = 'orders.csv'
+        else:
+            body = (
+                json.dumps(dict(zip(names, row)), ensure_ascii=False, default=str) + '\n'
+                for row in rows
+            )
+            response = StreamingHttpResponse(body, content_type='application/x-ndjson')
+            filename = 'orders.ndjson'
+
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def dashboard(self, request):
+        """
+        Vendor dashboard – orders, revenue and guests per day/week/month and status.
+        Reads only the OrderDailyRollup table, never the orders themselves:
+        ?period=day|week|month&date_from=&date_to=&package=
+        (admin: &vendor=<id>)
+        """
+        params = OrderDashboardQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+
+        role_context = get_role_context(request)
+
+        if role_context.is_admin:
+            rollups = OrderDailyRollup.objects.all()
+            if 'vendor' in params:
+                rollups = rollups.filter(vendor_id=params['vendor'])
+        elif role_context.is_vendor:
+            rollups = OrderDailyRollup.objects.filter(vendor_id=role_context.vendor_id)
+        else:
+            return Response(
+                {"detail": "הדשבורד זמין לספקים בלבד."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        if 'date_from' in params:
+            rollups = rollups.filter(day__gte=params['date_from'])
+        if 'date_to' in params:
+            rollups = rollups.filter(day__lte=params['date_to'])
+        if 'package' in params:
+            rollups = rollups.filter(package_id=params['package'])
+
+        truncate = {'week': TruncWeek, 'month': TruncMonth}.get(params['period'])
+        period = truncate('day') if truncate else F('day')
+
+        rows = rollups.annotate(period=period) \
+            .values('period', 'status') \
+            .annotate(
+                orders_count=Sum('orders_count'),
+                revenue=Sum('revenue'),
+                guests=Sum('guests'),
+            ) \
+            .order_by('period', 'status')
+
+        return Response({
+            'period': params['period'],
+            'results': [
+                # SQLite מחזיר את הסכום בלי קנה המידה של השדה ('7350' במקום '7350.00')
+                {**row, 'revenue': f"{row['revenue']:.2f}"}
+                for row in rows
+            ],
+        })
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_orders(self, request):
+        """
+        Batch import of orders for the logged in user:
+        {"orders": [<order payload>, ...], "chunk_size": 200}
+        Returns success/failure per row.
+        """
+        serializer = OrderImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        report = import_orders(
+            serializer.validated_data['orders'],
+            user=request.user,
+            chunk_size=serializer.validated_data.get('chunk_size', ORDER_IMPORT_CHUNK_SIZE),
+        )
+        created = sum(1 for row in report if row['status'] == 'created')
+
+        return Response({
+            'created': created,
+            'failed': len(report) - created,
+            'results': report,
+        })
+
 
 class OrderAddonViewSet(viewsets.ModelViewSet):
     """
     Managing add-ons selected in an order (OrderAddon):
- """
-
-    queryset = OrderAddon.objects.select_related(
-        'order',
-        'order__user',
-        'order__vendor',
-        'addon',
-        'addon__package',
-        'addon__category',
-    )
+    - scoped in the DB like OrderViewSet: customer – their orders, vendor – orders to them, admin – all
+    - list uses a compact representation that only joins the addon
+    """
+
     serializer_class = OrderAddonSerializer
     permission_classes = [IsAuthenticated, IsOrderAddonOwnerOrVendorOrAdmin]
 
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['order', 'addon', 'addon__category']
+    filterset_class = OrderAddonFilter
     search_fields = ['addon__name', 'addon__category__name', 'order__user__username']
     ordering_fields = ['created_at', 'subtotal']
     ordering = ['-created_at']
+
+    def get_queryset(self):
+        role_context = get_role_context(self.request)
+
+        if role_context.is_admin:
+            qs = OrderAddon.objects.all()
+        elif role_context.is_vendor:
+            qs = OrderAddon.objects.filter(order__vendor_id=role_context.vendor_id)
+        else:
+            qs = OrderAddon.objects.filter(order__user_id=role_context.user_id)
+
+        if self.action == 'list':
+            return qs.select_related('addon')
+        return qs.select_related('order', 'addon', 'addon__category')
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return OrderAddonListSerializer
+        if self.action in ['update', 'partial_update']:
+            return OrderAddonUpdateSerializer
+        return super().get_serializer_class()
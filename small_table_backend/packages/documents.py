@@ -0,0 +1,110 @@
+from django.db.models import F, Prefetch
+from django.utils import timezone
+
+from .models import Package, PackageCategory, PackageCategoryItem, PackageMenuDocument
+
+
+def get_menu_documents(packages):
+    """
+    Prebuilt menu document per package id, for the given packages (or ids).
+    Fresh documents cost one query; stale / missing ones are rebuilt together
+    in a fixed number of queries and stored for the next read.
+    """
+    package_ids = [getattr(package, 'pk', package) for package in packages]
+    if not package_ids:
+        return {}
+
+    rows = {
+        row.package_id: row
+        for row in PackageMenuDocument.objects.filter(package_id__in=package_ids)
+    }
+
+    missing = [package_id for package_id in package_ids if package_id not in rows]
+    if missing:
+        # השורה נוצרת לפני הבנייה – כך שינוי שמגיע באמצע הבנייה מעלה את הגרסה שלה
+        PackageMenuDocument.objects.bulk_create(
+            [PackageMenuDocument(package_id=package_id) for package_id in missing],
+            ignore_conflicts=True,
+        )
+        rows.update(
+            (row.package_id, row)
+            for row in PackageMenuDocument.objects.filter(package_id__in=missing)
+        )
+
+    stale = [row for row in rows.values() if row.document is None]
+    if stale:
+        documents = build_menu_documents(row.package_id for row in stale)
+        now = timezone.now()
+        for row in stale:
+            row.document = documents.get(row.package_id)
+            if row.document is None:
+                continue
+            PackageMenuDocument.objects.filter(
+                package_id=row.package_id, version=row.version,
+            ).update(document=row.document, built_at=now)
+
+    return {
+        package_id: row.document
+        for package_id, row in rows.items()
+        if row.document is not None
+    }
+
+
+def build_menu_documents(package_ids):
+    """
+    Serialize packages with their public menu – active categories, items and addons
+    only – in 4 queries for any number of packages.
+    """
+    from addons.models import Addon
+    from .serializers import PackageSerializer
+
+    packages = Package.objects.filter(id__in=list(package_ids)) \
+        .select_related('vendor') \
+        .prefetch_related(
+            Prefetch(
+                'categories',
+                queryset=PackageCategory.objects.filter(is_active=True).prefetch_related(
+                    Prefetch(
+                        'items',
+                        queryset=PackageCategoryItem.objects.filter(is_active=True).select_related('product'),
+                    ),
+                ),
+            ),
+            Prefetch('addons', queryset=Addon.objects.filter(is_active=True).select_related('category')),
+        )
+
+    # בלי request – כתובות תמונה נשמרות כפי שה-storage מחזיר אותן (absolute_media_urls בתגובה)
+    return {
+        package.id: PackageSerializer(package).data
+        for package in packages
+    }
+
+
+def absolute_media_urls(document, request):
+    """
+    The menu document with absolute image / image_srcset URLs for this request,
+    like the serializers return them elsewhere. The stored document is not changed.
+    """
+    document = dict(document)
+    if document.get('image'):
+        document['image'] = request.build_absolute_uri(document['image'])
+
+    if document.get('image_srcset'):
+        document['image_srcset'] = {
+            name: ', '.join(
+                f'{request.build_absolute_uri(url)} {width}'
+                for url, width in (entry.rsplit(' ', 1) for entry in srcset.split(', '))
+            )
+            for name, srcset in document['image_srcset'].items()
+        }
+    return document
+
+
+def invalidate_menu_documents(**lookup):
+    """
+    Mark the menu documents matching the lookup (on PackageMenuDocument) as stale –
+    a single UPDATE, e.g. invalidate_menu_documents(package__categories__items__product=product_id).
+    queryset.update() on the menu models bypasses signals – call this after it.
+    """
+    return PackageMenuDocument.objects.filter(**lookup) \
+        .update(document=None, version=F('version') + 1, changed_at=timezone.now())
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('packages', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PackageMenuDocument',
+            fields=[
+                ('package', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='menu_document', serialize=False, to='packages.package', verbose_name='חבילה')),
+                ('version', models.PositiveBigIntegerField(default=1, verbose_name='גרסה')),
+                ('document', models.JSONField(blank=True, null=True, verbose_name='מסמך התפריט')),
+                ('built_at', models.DateTimeField(blank=True, null=True, verbose_name='תאריך בנייה')),
+            ],
+            options={
+                'verbose_name': 'מסמך תפריט חבילה',
+                'verbose_name_plural': 'מסמכי תפריט חבילות',
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('packages', '0003_packagemenudocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='packagemenudocument',
+            name='changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='תאריך שינוי'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('packages', '0004_packagemenudocument_changed_at'),
+        ('vendors', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='package',
+            index=models.Index(fields=['is_active', 'min_guests', 'max_guests'], name='packages_pa_is_acti_93124a_idx'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.core.validators import MinValueValidator
 from vendors.models import VendorProfile
 from products.models import Product
@@ -53,6 +54,14 @@ For example: basic / classic / luxury
         verbose_name='תמונה מייצגת'
     )
 
+    # גרסאות מוקטנות של image (api.images) – נבנות ברקע אחרי ההעלאה
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='גרסאות תמונה'
+    )
+
     is_active = models.BooleanField(
         default=True,
         verbose_name='פעילה להזמנה'
@@ -72,6 +81,10 @@ For example: basic / classic / luxury
         verbose_name = 'חבילה'
         verbose_name_plural = 'חבילות'
         ordering = ['-created_at']
+        indexes = [
+            # חיפוש לפי מספר סועדים (packages.services.with_guest_totals)
+            models.Index(fields=['is_active', 'min_guests', 'max_guests']),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.vendor.business_name})"
@@ -192,4 +205,51 @@ Connects Product and PackageCategory
         unique_together = ('package_category', 'product')
 
     def __str__(self):
-        return f"{self.product.name} ({self.package_category.name})"
+        return f"{self.product.product_name} ({self.package_category.name})"
+
+
+class PackageMenuDocument(models.Model):
+    """
+    The full public menu of a package (PackageSerializer output – categories, items, addons),
+    prebuilt as one JSON document so list/retrieve do not walk the ORM tree.
+    - document = None: stale, rebuilt on the next read (packages.documents)
+    - version: bumped on every invalidation, so a rebuild that raced with a change is not stored
+    - changed_at: time of the last invalidation – the Last-Modified of the menu (api.conditional)
+    """
+
+    package = models.OneToOneField(
+        Package,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='menu_document',
+        verbose_name='חבילה'
+    )
+
+    version = models.PositiveBigIntegerField(
+        default=1,
+        verbose_name='גרסה'
+    )
+
+    document = models.JSONField(
+        blank=True,
+        null=True,
+        verbose_name='מסמך התפריט'
+    )
+
+    built_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='תאריך בנייה'
+    )
+
+    changed_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='תאריך שינוי'
+    )
+
+    class Meta:
+        verbose_name = 'מסמך תפריט חבילה'
+        verbose_name_plural = 'מסמכי תפריט חבילות'
+
+    def __str__(self):
+        return f"תפריט חבילה #{self.package_id} (v{self.version})"
@@ -1,5 +1,8 @@
 from rest_framework import permissions
 
+from users.roles import get_role_context
+from .models import PackageCategory, PackageCategoryItem
+
 class IsPackageOwnerOrAdmin(permissions.BasePermission):
     """
     Package permissions:
@@ -16,14 +19,21 @@ class IsPackageOwnerOrAdmin(permissions.BasePermission):
             return False
 
         # בדיקה האם המשתמש admin דרך טבלת UserRoles
-        has_admin_role = user.user_roles.filter(
-            role__name='admin'
-        ).exists()
+        role_context = get_role_context(request)
 
-        if has_admin_role or user.is_staff or user.is_superuser:
+        if role_context.is_admin:
             return True
 
-        if hasattr(user, 'vendor_profile') and obj.vendor == user.vendor_profile:
+        if role_context.is_vendor and self.get_vendor_id(obj) == role_context.vendor_id:
             return True
 
         return False
+
+    @staticmethod
+    def get_vendor_id(obj):
+        # Package / PackageCategory / PackageCategoryItem – הספק של החבילה
+        if isinstance(obj, PackageCategoryItem):
+            obj = obj.package_category
+        if isinstance(obj, PackageCategory):
+            obj = obj.package
+        return obj.vendor_id
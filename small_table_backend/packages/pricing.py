@@ -0,0 +1,111 @@
+import numpy as np
+
+from addons.models import Addon
+from .rules import get_package_rules
+
+
+def to_cents(value):
+    """Money value (2 decimal places) as integer agorot – exact, no float on the way."""
+    return int(value * 100)
+
+
+def format_cents(cents):
+    """Integer agorot (numpy array) as decimal strings, like DRF's DecimalField output."""
+    return [f"{value // 100}.{value % 100:02d}" for value in cents.tolist()]
+
+
+def price_matrix(packages, guests):
+    """
+    Prices of the packages (Package rows) at every guest count, in one batched computation
+    over integer agorot – the same amounts as Addon.calculate_price_for_guests and
+    Order.calculate_total_price, since every price has exactly 2 decimal places:
+    - base: price_per_person × guests
+    - options: each active premium item (extra_price_per_person × guests) and each
+      active addon (per_person – price × guests, fixed – price once)
+    - included_addons / total: the cheapest valid order, as in with_guest_totals;
+      total is None where the guest count is outside the package bounds
+    Items and addons come from the compiled package rules – no queries on a cache hit.
+    Returns {'guests': [...], 'packages': [{..., 'options': [{..., 'prices': [...]}]}]}.
+    """
+    packages = list(packages)
+    rules = get_package_rules(packages)
+    guests = np.asarray(guests, dtype=np.int64)
+
+    # עמודה לכל אפשרות של כל החבילות: מחיר באגורות, האם לפי סועד, לאיזו חבילה היא שייכת
+    options, cents, per_person, owner, included = [], [], [], [], []
+    for index, package in enumerate(packages):
+        package_rules = rules[package.id]
+        for item in package_rules.items.values():
+            if not item.is_premium:
+                continue
+            options.append({
+                'type': 'premium_item',
+                'id': item.id,
+                'name': item.product.product_name,
+                'category': item.package_category.name,
+                'pricing_type': Addon.PRICING_PER_PERSON,
+                'is_included': False,
+            })
+            cents.append(to_cents(item.extra_price_per_person))
+            per_person.append(True)
+            owner.append(index)
+            included.append(False)
+
+        for addon in package_rules.addons.values():
+            options.append({
+                'type': 'addon',
+                'id': addon.id,
+                'name': addon.name,
+                'category': addon.category.name,
+                'pricing_type': addon.pricing_type,
+                'is_included': addon.is_included,
+            })
+            cents.append(to_cents(addon.price))
+            per_person.append(addon.pricing_type == Addon.PRICING_PER_PERSON)
+            owner.append(index)
+            included.append(addon.is_included)
+
+    price = np.array([to_cents(package.price_per_person) for package in packages], dtype=np.int64)
+    cents = np.array(cents, dtype=np.int64)
+    per_person = np.array(per_person, dtype=bool)
+    owner = np.array(owner, dtype=np.int64)
+
+    # (guests × packages) ו-(guests × options)
+    base = np.outer(guests, price)
+    option_prices = np.where(per_person, np.outer(guests, cents), cents)
+
+    # סכום התוספות הכלולות של כל חבילה – כפל במטריצת שיוך (options × packages)
+    membership = np.zeros((len(options), len(packages)), dtype=np.int64)
+    membership[np.arange(len(options)), owner] = np.array(included, dtype=np.int64)
+    included_addons = option_prices @ membership
+    total = base + included_addons
+
+    min_guests = np.array([package.min_guests for package in packages], dtype=np.int64)
+    max_guests = np.array(
+        [np.iinfo(np.int64).max if package.max_guests is None else package.max_guests for package in packages],
+        dtype=np.int64,
+    )
+    available = (guests[:, None] >= min_guests) & (guests[:, None] <= max_guests)
+
+    result = []
+    for index, package in enumerate(packages):
+        totals = format_cents(total[:, index])
+        result.append({
+            'id': package.id,
+            'name': package.name,
+            'min_guests': package.min_guests,
+            'max_guests': package.max_guests,
+            'base': format_cents(base[:, index]),
+            'included_addons': format_cents(included_addons[:, index]),
+            'total': [
+                value if ok else None
+                for value, ok in zip(totals, available[:, index].tolist())
+            ],
+            'options': [],
+        })
+
+    for column, option in enumerate(options):
+        option['prices'] = format_cents(option_prices[:, column])
+        result[owner[column]]['options'].append(option)
+
+    return {'guests': guests.tolist(), 'packages': result}
@@ -0,0 +1,164 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import F
+
+from addons.models import Addon
+from api.cache import LRUCache
+from .models import PackageCategory, PackageCategoryItem, PackageMenuDocument
+
+# (package_id, version, changed_at) -> PackageRules; a change to the package menu bumps
+# its PackageMenuDocument version, so old entries are simply never asked for again
+_rules_cache = LRUCache(maxsize=getattr(settings, 'PACKAGE_RULES_CACHE_SIZE', 1000))
+
+
+class PackageRules:
+    """
+    Ordering rules of one package version, compiled once into in-memory lookups,
+    so validating a whole order selection runs no queries:
+    - guest bounds (min_guests / max_guests)
+    - per active category: min_select / max_select and the allowed products
+      (its active items, with their premium surcharge)
+    - active addons, and the included-by-default ones (attached to every order)
+    The items / addons are the loaded rows, shared between requests – read only.
+    """
+
+    def __init__(self, package, categories, items, addons):
+        self.package_id = package.id
+        self.min_guests = package.min_guests
+        self.max_guests = package.max_guests
+        self.categories = {category.id: category for category in categories}
+        self.items = {
+            (item.package_category_id, item.product_id): item
+            for item in items
+            if item.package_category_id in self.categories
+        }
+        self.addons = {addon.id: addon for addon in addons}
+        self.included_addons = [addon for addon in self.addons.values() if addon.is_included]
+
+    def get_item(self, package_category_id, product_id):
+        return self.items.get((package_category_id, product_id))
+
+    def get_addon(self, addon_id):
+        return self.addons.get(addon_id)
+
+    def guest_errors(self, guests_count):
+        """Violations of the guest bounds alone – e.g. when only guests_count of an order changes."""
+        errors = []
+        if guests_count < self.min_guests:
+            errors.append(f"מספר הסועדים המינימלי בחבילה זו הוא {self.min_guests}.")
+        if self.max_guests is not None and guests_count > self.max_guests:
+            errors.append(f"מספר הסועדים המקסימלי בחבילה זו הוא {self.max_guests}.")
+        return errors
+
+    def validate(self, guests_count, items=(), addons=()):
+        """
+        All the rule violations of a selection, in one pass (an empty list – valid):
+        - items: dicts with package_category_id / product_id
+        - addons: dicts with addon_id
+        """
+        errors = self.guest_errors(guests_count)
+
+        selected = set()
+        for item in items:
+            key = (item['package_category_id'], item['product_id'])
+            if key not in self.items:
+                errors.append(f"המנה {key[1]} לא זמינה בקטגוריה {key[0]} בחבילה שנבחרה.")
+            elif key in selected:
+                errors.append(f"המנה {key[1]} נבחרה יותר מפעם אחת בקטגוריה {key[0]}.")
+            else:
+                selected.add(key)
+
+        per_category = Counter(package_category_id for package_category_id, _ in selected)
+
+        for category in self.categories.values():
+            count = per_category[category.id]
+            if count < category.min_select:
+                errors.append(f"יש לבחור לפחות {category.min_select} מנות בקטגוריה '{category.name}'.")
+            if category.max_select is not None and count > category.max_select:
+                errors.append(f"ניתן לבחור עד {category.max_select} מנות בקטגוריה '{category.name}'.")
+
+        for addon in addons:
+            if addon['addon_id'] not in self.addons:
+                errors.append(f"התוספת {addon['addon_id']} לא זמינה בחבילה שנבחרה.")
+
+        return errors
+
+
+def with_menu_versions(queryset):
+    """Package queryset with the menu version that get_package_rules needs – no extra query."""
+    return queryset.annotate(
+        menu_version=F('menu_document__version'),
+        menu_changed_at=F('menu_document__changed_at'),
+    )
+
+
+def get_package_rules(packages):
+    """
+    {package_id: PackageRules} of the packages (Package rows), from the cache when the
+    package version was already compiled, otherwise compiled together in 3 queries.
+    The version comes from with_menu_versions(), or one query when it was not annotated.
+    Nothing is written – safe for quotes.
+    """
+    packages = {package.id: package for package in packages}
+
+    versions = {
+        package.id: (package.menu_version, package.menu_changed_at)
+        for package in packages.values()
+        if getattr(package, 'menu_version', None) is not None
+    }
+    unknown = [package_id for package_id in packages if package_id not in versions]
+    if unknown:
+        versions.update(
+            (package_id, (version, changed_at))
+            for package_id, version, changed_at in PackageMenuDocument.objects
+            .filter(package_id__in=unknown)
+            .values_list('package_id', 'version', 'changed_at')
+        )
+
+    rules = {}
+    for package_id, version in versions.items():
+        cached = _rules_cache.get((package_id, *version))
+        if cached is not None:
+            rules[package_id] = cached
+
+    missing = [packages[package_id] for package_id in packages if package_id not in rules]
+    if missing:
+        # הגרסה נקראה לפני הקומפילציה – שינוי באמצע מעלה אותה, והרשומה פשוט לא תשמש שוב.
+        # חבילה בלי מסמך תפריט (לפני השמירה הראשונה שלה) – בלי גרסה, ולכן בלי cache
+        for package_rules in compile_package_rules(missing):
+            version = versions.get(package_rules.package_id)
+            if version is not None:
+                _rules_cache.set((package_rules.package_id, *version), package_rules)
+            rules[package_rules.package_id] = package_rules
+
+    return rules
+
+
+def compile_package_rules(packages):
+    package_ids = [package.id for package in packages]
+
+    categories = {package_id: [] for package_id in package_ids}
+    for category in PackageCategory.objects.filter(package_id__in=package_ids, is_active=True):
+        categories[category.package_id].append(category)
+
+    items = {package_id: [] for package_id in package_ids}
+    for item in PackageCategoryItem.objects.filter(
+        package_category__package_id__in=package_ids,
+        package_category__is_active=True,
+        is_active=True,
+    ).select_related('package_category', 'product'):
+        items[item.package_category.package_id].append(item)
+
+    addons = {package_id: [] for package_id in package_ids}
+    for addon in Addon.objects.filter(package_id__in=package_ids, is_active=True).select_related('category'):
+        addons[addon.package_id].append(addon)
+
+    return [
+        PackageRules(package, categories[package.id], items[package.id], addons[package.id])
+        for package in packages
+    ]
+
+
+def clear_package_rules():
+    _rules_cache.clear()
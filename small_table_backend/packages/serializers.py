@@ -1,6 +1,10 @@
 from rest_framework import serializers
 
 from .models import Package, PackageCategory, PackageCategoryItem
+from addons.models import Addon
+from api.images import ImageSrcsetField
+from users.roles import get_role_context
+from .services import REPRICE_TARGETS
 
 
 class PackageCategoryItemSerializer(serializers.ModelSerializer):
@@ -8,7 +12,7 @@ class PackageCategoryItemSerializer(serializers.ModelSerializer):
     Serializer for an item in a category within a package
     """
     product_name = serializers.CharField(
-        source='product.name',
+        source='product.product_name',
         read_only=True
     )
 
@@ -65,10 +69,31 @@ class PackageCategorySerializer(serializers.ModelSerializer):
         return attrs
 
 
+class PackageAddonSerializer(serializers.ModelSerializer):
+    """
+    Addon of a package, as shown in the package menu (read only)
+    """
+    category_name = serializers.CharField(source='category.name', read_only=True)
+
+    class Meta:
+        model = Addon
+        fields = [
+            'id',
+            'category',
+            'category_name',
+            'name',
+            'price',
+            'pricing_type',
+            'is_included',
+            'is_active',
+        ]
+        read_only_fields = fields
+
+
 class PackageSerializer(serializers.ModelSerializer):
     """
     Serializer for package
-    - Also shows categories and items (read only)
+    - Also shows categories, items and addons (read only)
     - vendor field taken from connected vendor (in standard vendor)
     """
     vendor_name = serializers.CharField(
@@ -81,6 +106,13 @@ class PackageSerializer(serializers.ModelSerializer):
         read_only=True
     )
 
+    addons = PackageAddonSerializer(
+        many=True,
+        read_only=True
+    )
+
+    image_srcset = ImageSrcsetField()
+
     class Meta:
         model = Package
         fields = [
@@ -93,10 +125,12 @@ class PackageSerializer(serializers.ModelSerializer):
             'min_guests',
             'max_guests',
             'image',
+            'image_srcset',
             'is_active',
             'created_at',
             'updated_at',
             'categories',
+            'addons',
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
@@ -117,9 +151,132 @@ class PackageSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         user = getattr(request, 'user', None)
 
-        if user and user.is_authenticated and hasattr(user, 'vendor_profile') \
-                and not (user.is_staff or user.is_superuser):
+        role_context = get_role_context(request) if request else None
+
+        if role_context and role_context.is_vendor and not (user.is_staff or user.is_superuser):
             # ספק רגיל – מכריח את ה-vendor להיות שלו
-            validated_data['vendor'] = user.vendor_profile
+            validated_data.pop('vendor', None)
+            validated_data['vendor_id'] = role_context.vendor_id
 
         return super().create(validated_data)
+
+
+class PackageSearchQuerySerializer(serializers.Serializer):
+    """
+    Query params of the package finder.
+    """
+    guests = serializers.IntegerField(min_value=1)
+    max_total = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=0, required=False)
+
+
+class PackageSearchResultSerializer(serializers.ModelSerializer):
+    """
+    Package with the cheapest total for the requested guests (packages.services.with_guest_totals)
+    """
+    vendor_name = serializers.CharField(source='vendor.business_name', read_only=True)
+    included_addons_total = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    total_price = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    image_srcset = ImageSrcsetField()
+
+    class Meta:
+        model = Package
+        fields = [
+            'id',
+            'vendor',
+            'vendor_name',
+            'name',
+            'price_per_person',
+            'min_guests',
+            'max_guests',
+            'image',
+            'image_srcset',
+            'included_addons_total',
+            'total_price',
+        ]
+        read_only_fields = fields
+
+
+class PackageAddonCatalogQuerySerializer(serializers.Serializer):
+    """
+    Query params of the addon catalog of a package.
+    """
+    guests = serializers.IntegerField(min_value=1)
+
+
+class PackagePriceMatrixQuerySerializer(serializers.Serializer):
+    """
+    Query params of the price matrix: ?vendor=3 or ?packages=1&packages=2,
+    guest counts guests_from..guests_to (inclusive) every guests_step.
+    The guest counts are bounded, so the agorot products stay well inside int64.
+    """
+    MAX_POINTS = 1000
+    MAX_GUESTS = 100_000
+    MAX_RANGE = 10_000
+
+    vendor = serializers.IntegerField(required=False)
+    packages = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        allow_empty=False,
+        max_length=100,
+    )
+    guests_from = serializers.IntegerField(min_value=1, max_value=MAX_GUESTS, default=10)
+    guests_to = serializers.IntegerField(min_value=1, max_value=MAX_GUESTS, default=1000)
+    guests_step = serializers.IntegerField(min_value=1, max_value=MAX_RANGE, default=10)
+
+    def validate(self, attrs):
+        if 'vendor' not in attrs and 'packages' not in attrs:
+            raise serializers.ValidationError("יש לבחור ספק (vendor) או חבילות (packages).")
+        if attrs['guests_from'] > attrs['guests_to']:
+            raise serializers.ValidationError("guests_from חייב להיות קטן או שווה ל-guests_to.")
+        if attrs['guests_to'] - attrs['guests_from'] > self.MAX_RANGE:
+            raise serializers.ValidationError(f"טווח מספרי הסועדים בבקשה מוגבל ל-{self.MAX_RANGE}.")
+
+        points = (attrs['guests_to'] - attrs['guests_from']) // attrs['guests_step'] + 1
+        if points > self.MAX_POINTS:
+            raise serializers.ValidationError(f"ניתן לחשב עד {self.MAX_POINTS} מספרי סועדים בבקשה.")
+        return attrs
+
+
+class PackageRepriceSerializer(serializers.Serializer):
+    """
+    Bulk repricing of a vendor's packages:
+    {"percent": "5"} or {"amount": "-10.00"},
+    "targets": ["packages", "premium_items", "addons"] (default: all),
+    "packages": [1, 2] (default: all the vendor's packages), "vendor": 3 (admin only),
+    "apply": false – preview only
+    """
+    TARGETS = list(REPRICE_TARGETS)
+
+    percent = serializers.DecimalField(
+        max_digits=6, decimal_places=2, min_value=-100, max_value=1000, required=False,
+    )
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    targets = serializers.MultipleChoiceField(choices=TARGETS, default=TARGETS, allow_empty=False)
+    packages = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        allow_empty=False,
+        max_length=1000,
+    )
+    vendor = serializers.IntegerField(required=False)  # admin only
+    apply = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if ('percent' in attrs) == ('amount' in attrs):
+            raise serializers.ValidationError("יש לשלוח percent או amount (אחד מהם בלבד).")
+
+        attrs['targets'] = [target for target in self.TARGETS if target in attrs['targets']]
+        return attrs
+
+
+class PackageRepriceChangeSerializer(serializers.Serializer):
+    """
+    One row of the repricing diff (packages.services.reprice)
+    """
+    id = serializers.IntegerField()
+    package = serializers.IntegerField()
+    name = serializers.CharField()
+    old_price = serializers.DecimalField(max_digits=12, decimal_places=2)
+    new_price = serializers.DecimalField(max_digits=12, decimal_places=2)
@@ -0,0 +1,119 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest, Round
+from django.utils import timezone
+
+from addons.models import Addon
+from .documents import invalidate_menu_documents
+from .models import PackageCategoryItem
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+
+
+def with_guest_totals(queryset, guests_count):
+    """
+    Packages that fit guests_count, annotated in the database with the cheapest valid order:
+    - included_addons_total: active is_included addons – per_person × guests, fixed once
+    - total_price: price_per_person × guests + included_addons_total
+    Premium dishes and the other addons are optional, so they are not part of the total.
+    """
+    included = Addon.objects.filter(
+        package=OuterRef('pk'),
+        is_included=True,
+        is_active=True,
+    ).order_by().values('package').annotate(
+        total=Sum(Case(
+            When(pricing_type=Addon.PRICING_PER_PERSON, then=F('price') * guests_count),
+            default=F('price'),
+            output_field=MONEY,
+        )),
+    ).values('total')
+
+    return queryset.filter(
+        Q(max_guests__isnull=True) | Q(max_guests__gte=guests_count),
+        is_active=True,
+        min_guests__lte=guests_count,
+    ).annotate(
+        included_addons_total=Coalesce(Subquery(included), Value(Decimal('0')), output_field=MONEY),
+        total_price=F('price_per_person') * guests_count + F('included_addons_total'),
+    )
+
+
+# target -> (price field, name lookup, package lookup) of the repriced table
+REPRICE_TARGETS = {
+    'packages': ('price_per_person', 'name', 'pk'),
+    'premium_items': ('extra_price_per_person', 'product__product_name', 'package_category__package'),
+    'addons': ('price', 'name', 'package'),
+}
+
+
+def reprice_querysets(packages):
+    """Rows of each REPRICE_TARGETS table that belong to the packages queryset."""
+    return {
+        'packages': packages.model.objects.filter(pk__in=packages.values('pk')),
+        'premium_items': PackageCategoryItem.objects.filter(
+            package_category__package__in=packages.values('pk'),
+            is_premium=True,
+        ),
+        'addons': Addon.objects.filter(package__in=packages.values('pk')),
+    }
+
+
+def repriced(field, percent=None, amount=None):
+    """New price as a database expression – rounded to agorot, never below 0."""
+    if percent is not None:
+        expression = F(field) * Value(1 + Decimal(percent) / 100)
+    else:
+        expression = F(field) + Value(Decimal(amount))
+    return Greatest(Round(expression, 2), Value(Decimal('0')), output_field=MONEY)
+
+
+def reprice(packages, targets, percent=None, amount=None, apply=False):
+    """
+    Change the prices of the packages (price_per_person), their premium items
+    (extra_price_per_person) and / or their addons by a percentage or an amount.
+    - the diff is read with the same expression the UPDATE uses, so the preview
+      is exactly what apply writes
+    - apply: one UPDATE per table in a single transaction; the menu documents of
+      the packages are invalidated (queryset.update() does not send signals)
+    Returns {target: [{id, package, name, old_price, new_price}]} of the rows that change.
+    """
+    querysets = reprice_querysets(packages)
+
+    with transaction.atomic():
+        changes = {}
+        for target in targets:
+            field, name, package = REPRICE_TARGETS[target]
+            queryset = querysets[target]
+            if apply:
+                # נעילת השורות שמתומחרות – לא של המוצר / החבילה שמצורפים לשם
+                queryset = queryset.select_for_update(of=('self',))
+
+            rows = queryset.annotate(new_price=repriced(field, percent, amount)) \
+                .order_by('pk') \
+                .values_list('pk', package, name, field, 'new_price')
+
+            changes[target] = [
+                {'id': pk, 'package': package_id, 'name': row_name, 'old_price': old, 'new_price': new}
+                for pk, package_id, row_name, old, new in rows
+                if old != new
+            ]
+
+        if apply:
+            now = timezone.now()
+            for target, rows in changes.items():
+                if not rows:
+                    continue
+                field = REPRICE_TARGETS[target][0]
+                querysets[target].model.objects.filter(pk__in=[row['id'] for row in rows]).update(**{
+                    field: repriced(field, percent, amount),
+                    'updated_at': now,
+                })
+
+            package_ids = {row['package'] for rows in changes.values() for row in rows}
+            if package_ids:
+                invalidate_menu_documents(package__in=package_ids)
+
+    return changes
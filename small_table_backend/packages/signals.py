@@ -0,0 +1,52 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from addons.models import Addon, AddonCategory
+from products.models import Product
+from vendors.models import VendorProfile
+from .documents import invalidate_menu_documents
+from .models import Package, PackageCategory, PackageCategoryItem, PackageMenuDocument
+
+# כל מודל שמופיע במסמך התפריט של חבילה מסמן את המסמכים התלויים בו כלא מעודכנים
+
+
+@receiver(post_save, sender=Package)
+def package_changed(sender, instance, created, **kwargs):
+    # השורה נוצרת עם החבילה – הגרסה שלה היא המפתח של packages.rules
+    if created:
+        PackageMenuDocument.objects.create(package=instance)
+    else:
+        invalidate_menu_documents(package=instance.pk)
+
+
+@receiver(post_save, sender=PackageCategory)
+@receiver(post_delete, sender=PackageCategory)
+@receiver(post_save, sender=Addon)
+@receiver(post_delete, sender=Addon)
+def package_part_changed(sender, instance, **kwargs):
+    invalidate_menu_documents(package=instance.package_id)
+
+
+@receiver(post_save, sender=PackageCategoryItem)
+@receiver(post_delete, sender=PackageCategoryItem)
+def package_item_changed(sender, instance, **kwargs):
+    invalidate_menu_documents(package__categories=instance.package_category_id)
+
+
+@receiver(post_save, sender=Product)
+def product_changed(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_menu_documents(package__categories__items__product=instance.pk)
+
+
+@receiver(post_save, sender=AddonCategory)
+def addon_category_changed(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_menu_documents(package__addons__category=instance.pk)
+
+
+@receiver(post_save, sender=VendorProfile)
+def vendor_changed(sender, instance, created, **kwargs):
+    # vendor_name במסמך
+    if not created:
+        invalidate_menu_documents(package__vendor=instance.pk)
@@ -1,3 +1,480 @@
+from decimal import Decimal
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from addons.catalog import clear_addon_catalogs
+from addons.models import Addon, AddonCategory
+from orders.models import Order, OrderAddon, OrderItem
+from products.models import Product
+from users.models import User
+from users.roles import clear_role_contexts
+from vendors.models import VendorProfile
+from .documents import invalidate_menu_documents
+from .models import Package, PackageCategory, PackageCategoryItem, PackageMenuDocument
+from .rules import clear_package_rules
+
+
+class PackageMenuDocumentTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='vendor', password='pass1234')
+        cls.vendor = VendorProfile.objects.create(user=user, business_name='קייטרינג', is_active=True)
+        cls.drinks = AddonCategory.objects.create(name='שתייה')
+
+        cls.packages = []
+        for p in range(4):
+            package = Package.objects.create(
+                vendor=cls.vendor, name=f'חבילה {p}', price_per_person=Decimal('100.00')
+            )
+            category = PackageCategory.objects.create(package=package, name='סלטים')
+            for i in range(5):
+                product = Product.objects.create(vendor=cls.vendor, product_name=f'סלט {p}-{i}')
+                PackageCategoryItem.objects.create(package_category=category, product=product)
+            Addon.objects.create(
+                package=package, category=cls.drinks, name='בר שתייה', price=Decimal('12.50'),
+            )
+            cls.packages.append(package)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get_package(self, package):
+        response = self.client.get(f'/api/packages/{package.id}/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_list_serves_prebuilt_documents(self):
+        response = self.client.get('/api/packages/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(PackageMenuDocument.objects.exclude(document=None).count(), 4)
+
+        [item] = [
+            item
+            for package in response.data['results'] if package['id'] == self.packages[0].id
+            for item in package['categories'][0]['items']
+        ][:1]
+        self.assertEqual(item['product_name'], 'סלט 0-0')
+
+        # ETag aggregate + page query + documents query, whatever the size of the menus
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/packages/')
+        self.assertEqual(len(ctx.captured_queries), 3)
+
+    def test_changes_rebuild_only_dependent_documents(self):
+        first, second = self.packages[:2]
+        self.get_package(first)
+        self.get_package(second)
+
+        item = PackageCategoryItem.objects.filter(package_category__package=first).first()
+        item.product.product_name = 'טבולה'
+        item.product.save()
+
+        self.assertIsNone(PackageMenuDocument.objects.get(package=first).document)
+        self.assertIsNotNone(PackageMenuDocument.objects.get(package=second).document)
+
+        names = [i['product_name'] for i in self.get_package(first)['categories'][0]['items']]
+        self.assertIn('טבולה', names)
+
+        addon = Addon.objects.get(package=first)
+        addon.price = Decimal('20.00')
+        addon.save()
+        self.assertEqual(self.get_package(first)['addons'][0]['price'], '20.00')
+
+        self.drinks.name = 'משקאות'
+        self.drinks.save()
+        self.assertEqual(self.get_package(second)['addons'][0]['category_name'], 'משקאות')
+
+    def test_stale_build_is_not_stored(self):
+        self.get_package(self.packages[0])
+        row = PackageMenuDocument.objects.get(package=self.packages[0])
+        version = row.version
+
+        PackageCategory.objects.create(package=self.packages[0], name='קינוחים')
+        row.refresh_from_db()
+        self.assertIsNone(row.document)
+        self.assertEqual(row.version, version + 1)
+
+        self.assertEqual(len(self.get_package(self.packages[0])['categories']), 2)
+
+    def test_inactive_rows_are_not_in_the_menu(self):
+        package = self.packages[0]
+        PackageCategory.objects.create(package=package, name='קינוחים', is_active=False)
+        item = PackageCategoryItem.objects.filter(package_category__package=package).first()
+        item.is_active = False
+        item.save()
+        addon = Addon.objects.get(package=package)
+        addon.is_active = False
+        addon.save()
+
+        document = self.get_package(package)
+        self.assertEqual([category['name'] for category in document['categories']], ['סלטים'])
+        self.assertNotIn(item.id, [i['id'] for i in document['categories'][0]['items']])
+        self.assertEqual(len(document['categories'][0]['items']), 4)
+        self.assertEqual(document['addons'], [])
+
+    def test_media_urls_are_absolute(self):
+        package = self.packages[0]
+        Package.objects.filter(pk=package.pk).update(
+            image='packages/menu.jpg',
+            image_variants={'source': 'packages/menu.jpg', 'webp': {
+                '320': 'variants/packages/menu_320w.webp', '640': 'variants/packages/menu_640w.webp',
+            }},
+        )
+        invalidate_menu_documents(package=package)
+
+        document = self.get_package(package)
+        self.assertTrue(document['image'].startswith('http://testserver/'))
+        self.assertEqual(
+            [entry.split(' ')[0][:18] for entry in document['image_srcset']['webp'].split(', ')],
+            ['http://testserver/'] * 2,
+        )
+        self.assertTrue(document['image_srcset']['webp'].endswith(' 640w'))
+
+        # במסמך השמור – כתובות כפי שה-storage מחזיר אותן
+        stored = PackageMenuDocument.objects.get(package=package).document
+        self.assertFalse(stored['image'].startswith('http'))
+
+
+class PackageSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='vendor', password='pass1234')
+        vendor = VendorProfile.objects.create(user=user, business_name='קייטרינג', is_active=True)
+        drinks = AddonCategory.objects.create(name='שתייה')
+
+        cls.classic = Package.objects.create(
+            vendor=vendor, name='קלאסית', price_per_person=Decimal('100.00'), min_guests=10, max_guests=200,
+        )
+        for name, price, pricing_type, is_included, is_active in [
+            ('שתייה קלה', '5.00', Addon.PRICING_PER_PERSON, True, True),
+            ('מלצרים', '300.00', Addon.PRICING_FIXED, True, True),
+            ('בר אלכוהול', '1000.00', Addon.PRICING_FIXED, False, True),
+            ('קפה', '999.00', Addon.PRICING_FIXED, True, False),
+        ]:
+            Addon.objects.create(
+                package=cls.classic, category=drinks, name=name, price=Decimal(price),
+                pricing_type=pricing_type, is_included=is_included, is_active=is_active,
+            )
+
+        cls.basic = Package.objects.create(vendor=vendor, name='בסיסית', price_per_person=Decimal('110.00'))
+        Package.objects.create(vendor=vendor, name='אירוע גדול', price_per_person=Decimal('50.00'), min_guests=200)
+        Package.objects.create(vendor=vendor, name='ישנה', price_per_person=Decimal('1.00'), is_active=False)
+
+    def search(self, **params):
+        response = APIClient().get('/api/packages/search/', params)
+        self.assertEqual(response.status_code, 200)
+        return [(package['id'], package['total_price']) for package in response.data['results']]
+
+    def test_cheapest_total_first(self):
+        # 100 × 150 + 5 × 150 + 300
+        self.assertEqual(self.search(guests=150), [
+            (self.classic.id, '16050.00'),
+            (self.basic.id, '16500.00'),
+        ])
+
+    def test_guest_bounds_and_budget(self):
+        self.assertEqual(self.search(guests=5), [(self.basic.id, '550.00')])
+        self.assertEqual(self.search(guests=150, max_total='16100'), [(self.classic.id, '16050.00')])
+
+    def test_fixed_number_of_queries(self):
+        client = APIClient()
+        client.get('/api/packages/search/', {'guests': 150})
+
+        # the page – the count is cached
+        with CaptureQueriesContext(connection) as ctx:
+            client.get('/api/packages/search/', {'guests': 150})
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_guests_is_required(self):
+        response = APIClient().get('/api/packages/search/', {'max_total': '1000'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('guests', response.data)
+
+
+class PackageRepriceTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='vendor', password='pass1234')
+        vendor = VendorProfile.objects.create(user=cls.user, business_name='קייטרינג', is_active=True)
+        cls.package = Package.objects.create(vendor=vendor, name='קלאסית', price_per_person=Decimal('100.00'))
+
+        category = PackageCategory.objects.create(package=cls.package, name='עיקריות')
+        cls.premium = PackageCategoryItem.objects.create(
+            package_category=category,
+            product=Product.objects.create(vendor=vendor, product_name='אנטריקוט'),
+            is_premium=True,
+            extra_price_per_person=Decimal('10.00'),
+        )
+        PackageCategoryItem.objects.create(
+            package_category=category,
+            product=Product.objects.create(vendor=vendor, product_name='שניצל'),
+        )
+        cls.addon = Addon.objects.create(
+            package=cls.package, category=AddonCategory.objects.create(name='שתייה'),
+            name='בר', price=Decimal('12.50'),
+        )
+
+        other_user = User.objects.create_user(username='other', password='pass1234')
+        other = VendorProfile.objects.create(user=other_user, business_name='אחר', is_active=True)
+        cls.other_package = Package.objects.create(vendor=other, name='זרה', price_per_person=Decimal('90.00'))
+
+    def setUp(self):
+        clear_role_contexts()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def reprice(self, **data):
+        return self.client.post('/api/packages/bulk-reprice/', data, format='json')
+
+    def prices(self):
+        return (
+            Package.objects.get(pk=self.package.pk).price_per_person,
+            PackageCategoryItem.objects.get(pk=self.premium.pk).extra_price_per_person,
+            Addon.objects.get(pk=self.addon.pk).price,
+        )
+
+    def test_preview_does_not_write(self):
+        response = self.reprice(percent='10')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['applied'])
+
+        changes = {
+            target: [(row['id'], row['old_price'], row['new_price']) for row in rows]
+            for target, rows in response.data['changes'].items()
+        }
+        self.assertEqual(changes, {
+            'packages': [(self.package.id, '100.00', '110.00')],
+            'premium_items': [(self.premium.id, '10.00', '11.00')],
+            'addons': [(self.addon.id, '12.50', '13.75')],
+        })
+        self.assertEqual(self.prices(), (Decimal('100.00'), Decimal('10.00'), Decimal('12.50')))
+
+    def test_apply_one_update_per_table(self):
+        self.client.get(f'/api/packages/{self.package.id}/')
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.reprice(amount='-5.00', targets=['packages', 'addons'], apply=True)
+        self.assertEqual(response.status_code, 200)
+
+        updates = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        # packages + addons + the menu documents
+        self.assertEqual(len(updates), 3)
+        self.assertEqual(self.prices(), (Decimal('95.00'), Decimal('10.00'), Decimal('7.50')))
+
+        document = self.client.get(f'/api/packages/{self.package.id}/').data
+        self.assertEqual(document['price_per_person'], '95.00')
+        self.assertEqual(document['addons'][0]['price'], '7.50')
+
+    def test_prices_do_not_go_below_zero(self):
+        self.reprice(amount='-50.00', targets=['addons'], apply=True)
+        self.assertEqual(self.prices()[2], Decimal('0.00'))
+
+    def test_only_own_packages(self):
+        response = self.reprice(percent='10', packages=[self.package.id, self.other_package.id], apply=True)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data['packages'], [self.other_package.id])
+        self.assertEqual(self.prices()[0], Decimal('100.00'))
+        self.assertEqual(Package.objects.get(pk=self.other_package.pk).price_per_person, Decimal('90.00'))
+
+        customer = APIClient()
+        customer.force_authenticate(User.objects.create_user(username='customer', password='pass1234'))
+        response = customer.post('/api/packages/bulk-reprice/', {'percent': '10'}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_percent_or_amount(self):
+        self.assertEqual(self.reprice(percent='10', amount='5').status_code, 400)
+        self.assertEqual(self.reprice(targets=['packages']).status_code, 400)
+
+
+class PackagePriceMatrixTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='vendor', password='pass1234')
+        cls.vendor = VendorProfile.objects.create(user=user, business_name='קייטרינג', is_active=True)
+        drinks = AddonCategory.objects.create(name='שתייה')
+
+        cls.package = Package.objects.create(
+            vendor=cls.vendor, name='קלאסית', price_per_person=Decimal('99.90'), min_guests=20, max_guests=500,
+        )
+        category = PackageCategory.objects.create(package=cls.package, name='עיקריות', min_select=1, max_select=2)
+        for name, is_premium, extra in [('עוף', False, '0.00'), ('אסאדו', True, '17.35')]:
+            product = Product.objects.create(vendor=cls.vendor, product_name=name)
+            PackageCategoryItem.objects.create(
+                package_category=category, product=product, is_premium=is_premium,
+                extra_price_per_person=Decimal(extra),
+            )
+
+        cls.addons = [
+            Addon.objects.create(
+                package=cls.package, category=drinks, name=name, price=Decimal(price),
+                pricing_type=pricing_type, is_included=is_included, is_active=is_active,
+            )
+            for name, price, pricing_type, is_included, is_active in [
+                ('שתייה קלה', '4.45', Addon.PRICING_PER_PERSON, True, True),
+                ('מלצרים', '333.33', Addon.PRICING_FIXED, True, True),
+                ('בר אלכוהול', '1000.00', Addon.PRICING_FIXED, False, True),
+                ('קפה', '999.00', Addon.PRICING_FIXED, True, False),
+            ]
+        ]
+
+        other = VendorProfile.objects.create(
+            user=User.objects.create_user(username='other', password='pass1234'), business_name='אחר',
+        )
+        Package.objects.create(vendor=other, name='של ספק אחר', price_per_person=Decimal('10.00'))
+
+    def setUp(self):
+        clear_package_rules()
+
+    def matrix(self, **params):
+        response = APIClient().get('/api/packages/price-matrix/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_matches_order_and_addon_pricing(self):
+        data = self.matrix(vendor=self.vendor.id, guests_from=10, guests_to=1000, guests_step=7)
+        self.assertEqual(data['guests'], list(range(10, 1001, 7)))
+
+        [package] = data['packages']
+        self.assertEqual(package['id'], self.package.id)
+        options = {(option['type'], option['name']): option for option in package['options']}
+        self.assertEqual(set(options), {
+            ('premium_item', 'אסאדו'),
+            ('addon', 'שתייה קלה'),
+            ('addon', 'מלצרים'),
+            ('addon', 'בר אלכוהול'),
+        })
+
+        premium = PackageCategoryItem.objects.get(is_premium=True)
+        included = [addon for addon in self.addons if addon.is_included and addon.is_active]
+        for index, guests in enumerate(data['guests']):
+            order = Order(package=self.package, guests_count=guests)
+            order_addons = [
+                OrderAddon(order=order, addon=addon, quantity=1, price_snapshot=addon.price)
+                for addon in included
+            ]
+            for order_addon in order_addons:
+                order_addon.subtotal = order_addon.calculate_subtotal()
+
+            breakdown = order.calculate_price_breakdown(items=[], addons=order_addons)
+            self.assertEqual(package['base'][index], str(breakdown['base']))
+            self.assertEqual(package['included_addons'][index], str(breakdown['addons']))
+
+            expected_total = str(breakdown['total']) if 20 <= guests <= 500 else None
+            self.assertEqual(package['total'][index], expected_total)
+
+            upgraded = order.calculate_price_breakdown(
+                items=[OrderItem(extra_price_per_person=premium.extra_price_per_person)], addons=[],
+            )
+            self.assertEqual(options['premium_item', 'אסאדו']['prices'][index], str(upgraded['extras']))
+
+            for addon in self.addons[:3]:
+                self.assertEqual(
+                    options['addon', addon.name]['prices'][index],
+                    str(addon.calculate_price_for_guests(guests)),
+                )
+
+    def test_no_menu_queries_when_rules_are_cached(self):
+        client = APIClient()
+        params = {'packages': [self.package.id], 'guests_to': 100}
+        client.get('/api/packages/price-matrix/', params)
+
+        # the validators aggregate + the packages
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get('/api/packages/price-matrix/', params)
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertEqual(response['ETag'], client.get('/api/packages/price-matrix/', params)['ETag'])
+
+        Addon.objects.filter(name='בר אלכוהול').get().delete()
+        response = client.get('/api/packages/price-matrix/', params)
+        names = [option['name'] for option in response.data['packages'][0]['options']]
+        self.assertNotIn('בר אלכוהול', names)
+
+    def test_invalid_params(self):
+        client = APIClient()
+        self.assertEqual(client.get('/api/packages/price-matrix/').status_code, 400)
+        response = client.get('/api/packages/price-matrix/', {
+            'vendor': self.vendor.id, 'guests_from': 1, 'guests_to': 100_000, 'guests_step': 1,
+        })
+        self.assertEqual(response.status_code, 400)
+
+        # מעט נקודות, אבל מספרי סועדים שהיו גולשים מ-int64 / טווח ענק
+        for params in (
+            {'guests_from': 1, 'guests_to': 10 ** 18, 'guests_step': 10 ** 17},
+            {'guests_from': 1, 'guests_to': 100_000, 'guests_step': 10_000},
+        ):
+            response = client.get('/api/packages/price-matrix/', {'vendor': self.vendor.id, **params})
+            self.assertEqual(response.status_code, 400)
+
+
+class PackageAddonCatalogTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='vendor', password='pass1234')
+        vendor = VendorProfile.objects.create(user=user, business_name='קייטרינג', is_active=True)
+        cls.drinks = AddonCategory.objects.create(name='שתייה')
+        staff = AddonCategory.objects.create(name='צוות')
+
+        cls.package = Package.objects.create(vendor=vendor, name='קלאסית', price_per_person=Decimal('100.00'))
+        for category, name, price, pricing_type, is_included, is_active in [
+            (cls.drinks, 'שתייה קלה', '5.00', Addon.PRICING_PER_PERSON, True, True),
+            (cls.drinks, 'בר אלכוהול', '1000.00', Addon.PRICING_FIXED, False, True),
+            (cls.drinks, 'קפה', '999.00', Addon.PRICING_FIXED, True, False),
+            (staff, 'מלצרים', '300.00', Addon.PRICING_FIXED, True, True),
+        ]:
+            Addon.objects.create(
+                package=cls.package, category=category, name=name, price=Decimal(price),
+                pricing_type=pricing_type, is_included=is_included, is_active=is_active,
+            )
+
+    def setUp(self):
+        clear_addon_catalogs()
+        self.client = APIClient()
+        self.url = f'/api/packages/{self.package.id}/addon-catalog/'
+
+    def test_grouped_by_category_with_prices(self):
+        response = self.client.get(self.url, {'guests': 150})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['included_total'], '1050.00')
+
+        catalog = {
+            category['name']: [
+                (addon['name'], addon['is_included'], addon['price_for_guests'])
+                for addon in category['addons']
+            ]
+            for category in response.data['categories']
+        }
+        self.assertEqual(catalog, {
+            'צוות': [('מלצרים', True, '300.00')],
+            'שתייה': [('בר אלכוהול', False, '1000.00'), ('שתייה קלה', True, '750.00')],
+        })
+
+    def test_cached_per_package_version(self):
+        self.client.get(self.url, {'guests': 150})
+
+        # the package (with its menu version) – the catalog comes from the cache
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, {'guests': 20})
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(response.data['included_total'], '400.00')
+
+        self.drinks.name = 'משקאות'
+        self.drinks.save()
+        response = self.client.get(self.url, {'guests': 20})
+        self.assertIn('משקאות', [category['name'] for category in response.data['categories']])
+
+        Addon.objects.filter(name='מלצרים').get().delete()
+        response = self.client.get(self.url, {'guests': 20})
+        self.assertEqual(response.data['included_total'], '100.00')
 
-# Create your tests here.
+    def test_guests_is_required(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('guests', response.data)
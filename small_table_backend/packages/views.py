@@ -2,6 +2,7 @@ from rest_framework import viewsets, filters, status
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db.models import Prefetch
 from django_filters.rest_framework import DjangoFilterBackend
 
 from .models import Package, PackageCategory, PackageCategoryItem
@@ -9,24 +10,45 @@ from .serializers import (
     PackageSerializer,
     PackageCategorySerializer,
     PackageCategoryItemSerializer,
+    PackageSearchQuerySerializer,
+    PackageSearchResultSerializer,
+    PackagePriceMatrixQuerySerializer,
+    PackageAddonCatalogQuerySerializer,
+    PackageRepriceSerializer,
+    PackageRepriceChangeSerializer,
 )
 from .permissions import IsPackageOwnerOrAdmin
+from .documents import absolute_media_urls, get_menu_documents
+from .pricing import price_matrix
+from .rules import with_menu_versions
+from .services import reprice, with_guest_totals
+from addons.catalog import addon_catalog
+from api.conditional import ConditionalGetMixin
+from api.search import FullTextSearchFilter, RankedOrderingFilter
+from api.pagination import CatalogPageNumberPagination
+from users.roles import get_role_context
 
 
-class PackageViewSet(viewsets.ModelViewSet):
+class PackageViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing packages:
     - list/retrieve: everyone can see active packages
     - create: only connected provider (or admin)
     - update/destroy: package owner or admin
+    list/retrieve/my_packages serve the prebuilt menu documents (PackageMenuDocument)
+    instead of serializing the categories/items/addons tree, with ETag / Last-Modified
+    from the package and its menu document (ConditionalGetMixin).
     """
-    queryset = Package.objects.select_related('vendor', 'vendor__user').all()
+    queryset = Package.objects.select_related('vendor', 'vendor__user', 'menu_document').all()
     serializer_class = PackageSerializer
 
+    # changed_at זז בכל שינוי בקטגוריות / פריטים / מוצרים / תוספות של החבילה
+    conditional_fields = ('updated_at', 'menu_document__changed_at')
+
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        FullTextSearchFilter,
+        RankedOrderingFilter,
     ]
 
     filterset_fields = [
@@ -54,11 +76,11 @@ class PackageViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         """
         Dynamic permissions:
-        - list, retrieve: free read (with is_active filtering)
+        - list, retrieve, search, price_matrix, addon_catalog: free read (with is_active filtering)
         - my_packages: only for logged in users
         - create/update/partial_update/destroy: only for owner or admin
         """
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'search', 'price_matrix', 'addon_catalog']:
             permission_classes = [IsAuthenticatedOrReadOnly]
 
         elif self.action in ['create', 'update', 'partial_update', 'destroy', 'my_packages']:
@@ -80,13 +102,45 @@ class PackageViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return qs.filter(is_active=True)
 
-        has_admin_role = user.user_roles.filter(role__name='admin').exists()
-
-        if user.is_staff or user.is_superuser or has_admin_role:
+        if get_role_context(self.request).is_admin:
             return qs
 
         return qs.filter(is_active=True)
 
+    def menu_documents(self, packages):
+        """Documents of the packages, in their order, with absolute media URLs."""
+        documents = get_menu_documents(packages)
+        return [
+            absolute_media_urls(documents[package.id], self.request)
+            for package in packages if package.id in documents
+        ]
+
+    def menu_response(self, queryset):
+        """Documents of the (paginated) packages, in the queryset order."""
+        page = self.paginate_queryset(queryset)
+        data = self.menu_documents(list(page if page is not None else queryset))
+
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def list(self, request, *args, **kwargs):
+        # the documents hold vendor/categories/items – no joins needed for the page itself
+        queryset = self.filter_queryset(self.get_queryset()).select_related(None)
+        return self.conditional_response(
+            request,
+            self.get_list_validators(queryset),
+            lambda: self.menu_response(queryset),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        package = self.get_object()
+        return self.conditional_response(
+            request,
+            self.get_object_validators(package),
+            lambda: Response(self.menu_documents([package])[0]),
+        )
+
     def create(self, request, *args, **kwargs):
 
         user = request.user
@@ -96,7 +150,8 @@ class PackageViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_401_UNAUTHORIZED
             )
 
-        if not (hasattr(user, 'vendor_profile') or user.is_staff or user.is_superuser):
+        role_context = get_role_context(request)
+        if not (role_context.is_vendor or user.is_staff or user.is_superuser):
             return Response(
                 {"detail": "רק ספקים יכולים ליצור חבילות."},
                 status=status.HTTP_403_FORBIDDEN
@@ -104,19 +159,139 @@ class PackageViewSet(viewsets.ModelViewSet):
 
         return super().create(request, *args, **kwargs)
 
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Packages that fit ?guests=, cheapest total first, optionally up to ?max_total=.
+        The total is calculated, filtered and sorted in the database (with_guest_totals).
+        """
+        params = PackageSearchQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+
+        packages = with_guest_totals(self.get_queryset(), params['guests'])
+        if 'max_total' in params:
+            packages = packages.filter(total_price__lte=params['max_total'])
+        packages = packages.order_by('total_price', 'id')
+
+        # מיון לפי המחיר המחושב – לא ה-cursor של created_at
+        paginator = CatalogPageNumberPagination()
+        page = paginator.paginate_queryset(packages, request, view=self)
+        serializer = PackageSearchResultSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='price-matrix')
+    def price_matrix(self, request):
+        """
+        Total-price curve of a vendor's packages (or of ?packages=) across guest counts:
+        base, included addons, total and the price of every premium item / addon at
+        each count – computed together in integer agorot (packages.pricing).
+        """
+        params = PackagePriceMatrixQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+
+        packages = self.get_queryset().select_related(None).order_by('id')
+        if 'vendor' in params:
+            packages = packages.filter(vendor_id=params['vendor'])
+        if 'packages' in params:
+            packages = packages.filter(pk__in=params['packages'])
+
+        guests = range(params['guests_from'], params['guests_to'] + 1, params['guests_step'])
+        # פריטים ותוספות משנים את גרסת מסמך התפריט – כך שה-ETag של הרשימה מכסה גם אותם
+        return self.conditional_response(
+            request,
+            self.get_list_validators(packages),
+            lambda: Response(price_matrix(with_menu_versions(packages), guests)),
+        )
+
+    @action(detail=True, methods=['get'], url_path='addon-catalog')
+    def addon_catalog(self, request, pk=None):
+        """
+        Active addons of the package grouped by category, with the included-by-default
+        flags and the price of each addon for ?guests= (addons.catalog).
+        The grouping is cached per package version – one query when it is built.
+        """
+        params = PackageAddonCatalogQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        package = self.get_object()
+        return self.conditional_response(
+            request,
+            self.get_object_validators(package),
+            lambda: Response(addon_catalog(package, params.validated_data['guests'])),
+        )
+
+    @action(detail=False, methods=['post'], url_path='bulk-reprice')
+    def bulk_reprice(self, request):
+        """
+        Reprice many packages / premium items / addons at once (PackageRepriceSerializer):
+        returns the diff, and writes it only with {"apply": true}.
+        Ownership as in IsPackageOwnerOrAdmin – a vendor reprices only their own packages.
+        """
+        role_context = get_role_context(request)
+        if not (role_context.is_admin or role_context.is_vendor):
+            return Response(
+                {"detail": "רק ספקים יכולים לעדכן מחירים במרוכז."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = PackageRepriceSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        if role_context.is_admin:
+            packages = Package.objects.all()
+            if 'vendor' in params:
+                packages = packages.filter(vendor_id=params['vendor'])
+            elif 'packages' not in params:
+                return Response(
+                    {"detail": "יש לבחור ספק (vendor) או חבילות (packages)."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            packages = Package.objects.filter(vendor_id=role_context.vendor_id)
+
+        if 'packages' in params:
+            requested = set(params['packages'])
+            packages = packages.filter(pk__in=requested)
+
+            # כל החבילות או כלום – לא מתמחרים חלק מהבקשה בשקט
+            missing = requested - set(packages.values_list('pk', flat=True))
+            if missing:
+                return Response(
+                    {"detail": "אין הרשאה לחלק מהחבילות.", "packages": sorted(missing)},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+
+        changes = reprice(
+            packages,
+            params['targets'],
+            percent=params.get('percent'),
+            amount=params.get('amount'),
+            apply=params['apply'],
+        )
+
+        return Response({
+            'applied': params['apply'],
+            'changes': {
+                target: PackageRepriceChangeSerializer(rows, many=True).data
+                for target, rows in changes.items()
+            },
+        })
+
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def my_packages(self, request):
 
-        user = request.user
-        if not hasattr(user, 'vendor_profile'):
+        role_context = get_role_context(request)
+        if not role_context.is_vendor:
             return Response(
                 {"detail": "משתמש זה אינו ספק."},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        qs = self.get_queryset().filter(vendor=user.vendor_profile)
-        serializer = self.get_serializer(qs, many=True)
-        return Response(serializer.data)
+        packages = list(self.get_queryset().filter(vendor_id=role_context.vendor_id).select_related(None))
+        return Response(self.menu_documents(packages))
 
 
 class PackageCategoryViewSet(viewsets.ModelViewSet):
@@ -124,9 +299,13 @@ class PackageCategoryViewSet(viewsets.ModelViewSet):
     Manage categories within a package
     (Usually used in vendor management screens, less for the public)
     """
-    queryset = PackageCategory.objects.select_related('package', 'package__vendor').all()
+    # product_name של כל פריט – שאילתה אחת לכל העמוד
+    queryset = PackageCategory.objects.select_related('package', 'package__vendor').prefetch_related(
+        Prefetch('items', queryset=PackageCategoryItem.objects.select_related('product')),
+    )
     serializer_class = PackageCategorySerializer
     permission_classes = [IsAuthenticated, IsPackageOwnerOrAdmin]
+    pagination_class = CatalogPageNumberPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['package', 'is_active']
     ordering_fields = ['created_at']
@@ -144,6 +323,7 @@ class PackageCategoryItemViewSet(viewsets.ModelViewSet):
     ).all()
     serializer_class = PackageCategoryItemSerializer
     permission_classes = [IsAuthenticated, IsPackageOwnerOrAdmin]
+    pagination_class = CatalogPageNumberPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['package_category', 'is_active', 'is_premium']
     ordering_fields = ['created_at', 'extra_price_per_person']
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_products_pr_created_3be21c_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='גרסאות תמונה'),
+        ),
+    ]
@@ -42,6 +42,14 @@ class Product(models.Model):
         verbose_name='תמונת מוצר'
     )
 
+    # גרסאות מוקטנות של image (api.images) – נבנות ברקע אחרי ההעלאה
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='גרסאות תמונה'
+    )
+
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='תאריך יצירה'
@@ -61,6 +69,8 @@ class Product(models.Model):
         indexes = [
             models.Index(fields=['vendor', 'is_available']),
             models.Index(fields=['category']),
+            # cursor pagination
+            models.Index(fields=['created_at', 'id']),
         ]
 
     def __str__(self):
@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from users.roles import get_role_context
+
 
 class IsVendorOwnerOrReadOnly(permissions.BasePermission):
 
@@ -19,11 +21,7 @@ class IsVendorOwnerOrReadOnly(permissions.BasePermission):
         # ✅ בדיקה 2: האם המשתמש הוא מנהל? (RBAC)
         if request.user and request.user.is_authenticated:
             # בדיקה אם יש תפקיד admin
-            has_admin_role = request.user.user_roles.filter(
-                role__name='admin'
-            ).exists()
-
-            if has_admin_role:
+            if get_role_context(request).has_admin_role:
                 return True
 
 
@@ -33,7 +31,7 @@ class IsVendorOwnerOrReadOnly(permissions.BasePermission):
 
         if request.user and request.user.is_authenticated:
             # בדיקה שהמשתמש הוא הספק של המוצר
-          return obj.vendor.user == request.user
+          return obj.vendor_id == get_role_context(request).vendor_id
 
           return False
 
@@ -48,15 +46,13 @@ class IsVendorOwner(permissions.BasePermission):
             return False
 
         # בדיקת מנהל
-        has_admin_role = request.user.user_roles.filter(
-            role__name='admin'
-        ).exists()
+        role_context = get_role_context(request)
 
-        if has_admin_role:
+        if role_context.has_admin_role:
             return True
 
         # בדיקת בעלות
-        return obj.vendor.user == request.user
+        return role_context.is_vendor and obj.vendor_id == role_context.vendor_id
 
 
 class IsVendor(permissions.BasePermission):
@@ -75,8 +71,4 @@ class IsVendor(permissions.BasePermission):
             return False
 
 
-        try:
-            vendor_profile = request.user.vendor_profile
-            return vendor_profile.is_active
-        except:
-            return False
\ No newline at end of file
+        return get_role_context(request).vendor_is_active
\ No newline at end of file
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Product
 from vendors.models import VendorProfile
+from api.images import ImageSrcsetField
 
 
 class ProductSerializer(serializers.ModelSerializer):
@@ -8,6 +9,8 @@ class ProductSerializer(serializers.ModelSerializer):
     vendor = serializers.PrimaryKeyRelatedField(queryset=VendorProfile.objects.all())
     vendor_name = serializers.CharField(source='vendor.business_name', read_only=True)
 
+    image_srcset = ImageSrcsetField()
+
     class Meta:
         model = Product
         fields = [
@@ -19,6 +22,7 @@ class ProductSerializer(serializers.ModelSerializer):
             'category',
             'is_available',
             'image',
+            'image_srcset',
             'created_at',
             'updated_at',
         ]
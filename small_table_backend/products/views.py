@@ -1,4 +1,4 @@
-from rest_framework import viewsets, filters, status
+from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action
@@ -6,19 +6,26 @@ from django_filters.rest_framework import DjangoFilterBackend
 from .models import Product
 from .permissions import IsVendorOwnerOrReadOnly, IsVendor
 from .serializers import ProductSerializer
+from api.conditional import ConditionalGetMixin
+from api.request_logging import log_event
+from api.search import FullTextSearchFilter, RankedOrderingFilter
+from users.roles import get_role_context
 
 
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
 
     queryset = Product.objects.select_related('vendor', 'vendor__user').all()
     serializer_class = ProductSerializer
 
+    # vendor_name מגיע מהספק
+    conditional_fields = ('updated_at', 'vendor__updated_at')
+
     filter_backends = [
         DjangoFilterBackend,  # סינון מדויק
-        filters.SearchFilter,  # חיפוש טקסט
-        filters.OrderingFilter  # מיון
+        FullTextSearchFilter,  # חיפוש טקסט (אינדקס full-text)
+        RankedOrderingFilter  # מיון
     ]
 
 
@@ -31,7 +38,7 @@ class ProductViewSet(viewsets.ModelViewSet):
 
     # שדות למיון
     ordering_fields = [
-        'name',
+        'product_name',
 
         'created_at',
         'category'
@@ -78,9 +85,7 @@ class ProductViewSet(viewsets.ModelViewSet):
         return queryset
 
     def create(self, request, *args, **kwargs):
-        try:
-            vendor_profile = request.user.vendor_profile
-        except:
+        if not get_role_context(request).is_vendor:
             return Response(
                 {
                     'error': 'רק ספקים יכולים ליצור מוצרים',
@@ -94,14 +99,14 @@ class ProductViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
 
         product = serializer.save()
-        print(f"מוצר חדש: {product.product_name} (ספק: {product.vendor.business_name})")
+        log_event(self.request, 'product created', product_id=product.id, vendor_id=product.vendor_id)
 
     def perform_update(self, serializer):
 
         product = serializer.save()
-        print(f"️ מוצר עודכן: {product.product_name}")
+        log_event(self.request, 'product updated', product_id=product.id, vendor_id=product.vendor_id)
 
     def perform_destroy(self, instance):
 
-        print(f" מוצר נמחק: {instance.product_name} (ID: {instance.id})")
+        log_event(self.request, 'product deleted', product_id=instance.id, vendor_id=instance.vendor_id)
         instance.delete()
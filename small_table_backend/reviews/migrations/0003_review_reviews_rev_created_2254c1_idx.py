@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_orders_orde_created_0fb29d_idx'),
+        ('reviews', '0002_initial'),
+        ('vendors', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['created_at', 'id'], name='reviews_rev_created_2254c1_idx'),
+        ),
+    ]
@@ -70,6 +70,10 @@ class Review(models.Model):
         verbose_name = 'חוות דעת'
         verbose_name_plural = 'חוות דעת'
         ordering = ['-created_at']
+        indexes = [
+            # cursor pagination
+            models.Index(fields=['created_at', 'id']),
+        ]
         # לא תהיה יותר מחוות דעת אחת לכל הזמנה
         constraints = [
             models.UniqueConstraint(
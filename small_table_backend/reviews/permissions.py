@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from users.roles import get_role_context
+
 
 class IsReviewOwnerVendorOrAdmin(permissions.BasePermission):
     """
@@ -18,11 +20,9 @@ class IsReviewOwnerVendorOrAdmin(permissions.BasePermission):
         if not user or not user.is_authenticated:
             return False
 
-        has_admin_role = getattr(user, 'user_roles', None) and user.user_roles.filter(
-            role__name='admin'
-        ).exists()
+        role_context = get_role_context(request)
 
-        if has_admin_role or user.is_staff or user.is_superuser:
+        if role_context.is_admin:
             return True
 
         # SAFE_METHODS - קריאה בלבד
@@ -30,7 +30,7 @@ class IsReviewOwnerVendorOrAdmin(permissions.BasePermission):
             if obj.user_id == user.id:
                 return True
 
-            if hasattr(user, 'vendor_profile') and obj.vendor_id == user.vendor_profile.id:
+            if role_context.is_vendor and obj.vendor_id == role_context.vendor_id:
                 return True
 
             return obj.is_public
@@ -1,11 +1,13 @@
+from django.db import models
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
 
 from .models import Review
 from .serializers import ReviewSerializer
 from .permissions import IsReviewOwnerVendorOrAdmin
+from api.search import FullTextSearchFilter, RankedOrderingFilter
+from users.roles import get_role_context
 
 
 class ReviewViewSet(viewsets.ModelViewSet):
@@ -13,7 +15,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsReviewOwnerVendorOrAdmin]
 
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, RankedOrderingFilter]
     filterset_fields = ['vendor', 'rating', 'is_public']
     search_fields = ['comment', 'title', 'user__username', 'vendor__business_name']
     ordering_fields = ['created_at', 'rating']
@@ -26,16 +28,14 @@ class ReviewViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return qs.filter(is_public=True)
 
-        has_admin_role = getattr(user, 'user_roles', None) and user.user_roles.filter(
-            role__name='admin'
-        ).exists()
+        role_context = get_role_context(self.request)
 
-        if user.is_staff or user.is_superuser or has_admin_role:
+        if role_context.is_admin:
             return qs
 
-        if hasattr(user, 'vendor_profile'):
-            return qs.filter(vendor=user.vendor_profile)
+        if role_context.is_vendor:
+            return qs.filter(vendor_id=role_context.vendor_id)
 
         return qs.filter(
-            models.Q(is_public=True) | models.Q(user=user)
+            models.Q(is_public=True) | models.Q(user_id=role_context.user_id)
         ).distinct()
@@ -2,8 +2,10 @@
 Django settings for small_table_config project.
 """
 
+from datetime import timedelta
 from pathlib import Path
 import os
+import sys
 import dj_database_url
 
 # ✅ ייבוא Cloudinary
@@ -49,6 +51,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # ראשון – כדי שהמשך והשאילתות של כל הבקשה ייכנסו לרשומה
+    'api.request_logging.RequestLogMiddleware',
     'django.middleware.security.SecurityMiddleware',
     # הורדנו את WhiteNoise בשלב זה כדי שלא יפיל את השרת לוקאלית
     'corsheaders.middleware.CorsMiddleware',
@@ -118,11 +122,21 @@ CLOUDINARY_STORAGE = {
 # ✅ כל ImageField / FileField ישתמשו ב-Cloudinary (לא בשמירה לדיסק)
 DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 
+# resized variants of product / package / vendor images (api.images): WebP + JPEG at
+# these widths, built in a process pool after upload – IMAGE_VARIANTS_ASYNC=False builds
+# them on commit, in the request. The variants are stored in the storage of the image
+# field itself, next to the uploads
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+IMAGE_VARIANT_FORMATS = ('webp', 'jpeg')
+IMAGE_VARIANT_WORKERS = 2
+IMAGE_VARIANTS_ASYNC = True
+
 
 # DRF settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # safe requests are authorized from the token's role claims, without the DB
+        'users.authentication.RoleClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
@@ -130,6 +144,10 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
+    # keyset pagination on (created_at, id) – catalogs opt in to
+    # api.pagination.CatalogPageNumberPagination
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': 25,
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
@@ -138,5 +156,60 @@ REST_FRAMEWORK = {
 
 AUTH_USER_MODEL = 'users.User'
 
+# per-process cache of each user's roles / vendor profile (users.roles) –
+# invalidated by signals, the TTL bounds staleness in other worker processes
+ROLE_CONTEXT_CACHE_SIZE = 10_000
+ROLE_CONTEXT_CACHE_TTL = 300
+
+# writes load the full User row even when the token carries role claims
+# (views save request.user on the objects they create)
+JWT_CLAIMS_LOAD_USER_FOR_WRITES = True
+
+# per-process cache of authenticated users (users.authentication.CachedJWTAuthentication);
+# every request – claims tokens too – is checked against it, so a deactivation or
+# password change is seen at once in this process and within the TTL in the others
+JWT_USER_CACHE_SIZE = 10_000
+JWT_USER_CACHE_TTL = 60
+
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=5),
+    # tokens carry a hash of the password – changing it revokes them
+    'CHECK_REVOKE_TOKEN': True,
+}
+
+# per-process cache of compiled package ordering rules (packages.rules),
+# keyed by the package menu version – no TTL needed
+PACKAGE_RULES_CACHE_SIZE = 1000
+
+# per-process cache of the grouped addon catalog of a package (addons.catalog), same key
+ADDON_CATALOG_CACHE_SIZE = 1000
+
+# structured JSON logs (api.request_logging): the handlers of the 'small_table' logger
+# run on a QueueListener thread, request handlers only enqueue records
+TESTING = 'test' in sys.argv
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "WARNING" if TESTING else "INFO")
+QUEUE_LOGGERS = ['small_table']
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'structured': {'()': 'api.request_logging.StructuredFormatter'},
+    },
+    'handlers': {
+        'structured_console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'structured',
+        },
+    },
+    'loggers': {
+        'small_table': {
+            'handlers': ['structured_console'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+    },
+}
+
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
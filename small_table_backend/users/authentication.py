@@ -0,0 +1,119 @@
+import copy
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework import permissions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from api.cache import LRUCache
+from .roles import token_user_id
+
+# user id -> User; cleared by users.signals when the user row is saved or deleted
+_user_cache = LRUCache(
+    maxsize=getattr(settings, 'JWT_USER_CACHE_SIZE', 10_000),
+    ttl=getattr(settings, 'JWT_USER_CACHE_TTL', 60),
+)
+
+
+def invalidate_cached_user(user_id):
+    _user_cache.delete(user_id)
+
+
+def clear_cached_users():
+    _user_cache.clear()
+
+
+def user_cache_stats():
+    return _user_cache.stats()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that keeps the authenticated User in a per-process TTL cache
+    keyed by user id, instead of selecting users_user on every request.
+    - the cached user is copied per request, so per-request state never leaks
+    - is_active / password-change checks still run against the cached row
+    - save (incl. password change / deactivation) and delete invalidate the entry
+    """
+
+    def get_user(self, validated_token):
+        if jwt_settings.USER_ID_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        return copy.copy(self.get_cached_user(validated_token))
+
+    def get_cached_user(self, validated_token):
+        """The shared cached User of the token, after the is_active / password checks – do not modify."""
+        user_id = token_user_id(validated_token)
+
+        user = _user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            _user_cache.set(user_id, user)
+        else:
+            self.check_user(user, validated_token)
+        return user
+
+    def check_user(self, user, validated_token):
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if jwt_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            jwt_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+
+
+class RoleClaimsUser(TokenUser):
+    """TokenUser whose id has the User pk type, like request.user.id of a DB user."""
+
+    @cached_property
+    def id(self):
+        return token_user_id(self.token)
+
+
+class RoleClaimsJWTAuthentication(CachedJWTAuthentication):
+    """
+    JWT authentication that trusts the role claims of tokens issued by
+    RoleClaimsTokenObtainPairSerializer:
+    - safe requests (GET/HEAD/OPTIONS) – a TokenUser built from the claims;
+      users.roles.get_role_context reads the roles / vendor from the same claims.
+      The user is still checked (inactive / password changed) against the user cache –
+      no query on a hit, and a deactivation or password change is seen at once
+    - writes – the full User row (JWT_CLAIMS_LOAD_USER_FOR_WRITES, default True),
+      served from the user cache of CachedJWTAuthentication
+    - tokens without role claims (issued before) – always the full User row
+    """
+
+    claims_user_class = RoleClaimsUser
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        if self.can_use_claims(request, validated_token):
+            # token של משתמש שהושבת / שהחליף סיסמה – נדחה גם בקריאה
+            self.get_cached_user(validated_token)
+            return self.claims_user_class(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
+
+    def can_use_claims(self, request, validated_token):
+        if 'roles' not in validated_token:
+            return False
+
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        return not getattr(settings, 'JWT_CLAIMS_LOAD_USER_FOR_WRITES', True)
@@ -0,0 +1,143 @@
+from dataclasses import dataclass
+
+from django.conf import settings
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from api.cache import LRUCache
+from .models import User, Role, UserRole
+
+
+@dataclass(frozen=True)
+class RoleContext:
+    """
+    Who the caller is, resolved once per request:
+    - roles: codes of the user's roles
+    - has_admin_role: has the 'admin' role (UserRole)
+    - is_admin: admin role or staff/superuser
+    - vendor_id / vendor_is_active: the user's VendorProfile, if any
+    """
+    user_id: int = None
+    roles: frozenset = frozenset()
+    has_admin_role: bool = False
+    is_admin: bool = False
+    vendor_id: int = None
+    vendor_is_active: bool = False
+
+    @property
+    def is_authenticated(self):
+        return self.user_id is not None
+
+    @property
+    def is_vendor(self):
+        return self.vendor_id is not None
+
+
+ANONYMOUS = RoleContext()
+
+# user id -> (role codes, has admin role, vendor id, vendor is_active);
+# cleared by users.signals when UserRole / VendorProfile rows change
+_role_cache = LRUCache(
+    maxsize=getattr(settings, 'ROLE_CONTEXT_CACHE_SIZE', 10_000),
+    ttl=getattr(settings, 'ROLE_CONTEXT_CACHE_TTL', 300),
+)
+
+
+def get_role_context(request):
+    """
+    RoleContext of request.user – stored on the request, so every permission class
+    and get_queryset of the same request share it, and cached per user in the process.
+    """
+    user = getattr(request, 'user', None)
+    if not user or not user.is_authenticated:
+        return ANONYMOUS
+
+    http_request = getattr(request, '_request', request)
+    context = getattr(http_request, '_role_context', None)
+    if context is None or context.user_id != user.id:
+        if isinstance(user, TokenUser):
+            # משתמש שנבנה מה-claims של ה-JWT – בלי גישה ל-DB
+            context = role_context_from_token(user.token)
+        else:
+            context = _build_role_context(user)
+        http_request._role_context = context
+    return context
+
+
+def role_claims(user):
+    """
+    Signed JWT claims describing the user's roles (see users.serializers).
+    Always read from the DB, so a new token reflects the current roles.
+    """
+    roles, has_admin_role, vendor_id, vendor_is_active = _load_roles(user.id)
+    _role_cache.set(user.id, (roles, has_admin_role, vendor_id, vendor_is_active))
+
+    return {
+        'username': user.get_username(),
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser,
+        'roles': sorted(roles),
+        'admin_role': has_admin_role,
+        'vendor_id': vendor_id,
+        'vendor_active': vendor_is_active,
+    }
+
+
+def token_user_id(token):
+    # simplejwt stores the id claim as a string – compare it to FK ids as the pk type
+    return User._meta.pk.to_python(token[jwt_settings.USER_ID_CLAIM])
+
+
+def role_context_from_token(token):
+    is_staff = bool(token.get('is_staff') or token.get('is_superuser'))
+    has_admin_role = bool(token.get('admin_role'))
+
+    return RoleContext(
+        user_id=token_user_id(token),
+        roles=frozenset(token.get('roles', ())),
+        has_admin_role=has_admin_role,
+        is_admin=has_admin_role or is_staff,
+        vendor_id=token.get('vendor_id'),
+        vendor_is_active=bool(token.get('vendor_active')),
+    )
+
+
+def invalidate_role_context(user_id):
+    _role_cache.delete(user_id)
+
+
+def clear_role_contexts():
+    _role_cache.clear()
+
+
+def _build_role_context(user):
+    cached = _role_cache.get(user.id)
+    if cached is None:
+        cached = _load_roles(user.id)
+        _role_cache.set(user.id, cached)
+
+    roles, has_admin_role, vendor_id, vendor_is_active = cached
+    return RoleContext(
+        user_id=user.id,
+        roles=roles,
+        has_admin_role=has_admin_role,
+        is_admin=has_admin_role or user.is_staff or user.is_superuser,
+        vendor_id=vendor_id,
+        vendor_is_active=vendor_is_active,
+    )
+
+
+def _load_roles(user_id):
+    from vendors.models import VendorProfile
+
+    codes = set()
+    has_admin_role = False
+    for code, name in UserRole.objects.filter(user_id=user_id).values_list('role__code', 'role__name'):
+        codes.add(code)
+        # התפקיד מזוהה לפי הקוד, או לפי השם הישן 'admin'
+        has_admin_role = has_admin_role or Role.ADMIN in (code, name)
+
+    vendor = VendorProfile.objects.filter(user_id=user_id).values_list('id', 'is_active').first()
+    vendor_id, vendor_is_active = vendor or (None, False)
+
+    return frozenset(codes), has_admin_role, vendor_id, vendor_is_active
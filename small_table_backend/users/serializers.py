@@ -1,6 +1,11 @@
 # users/serializers.py
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
 from .models import User, Role, UserRole
+from .roles import role_claims
 
 
 class RoleSerializer(serializers.ModelSerializer):
@@ -113,3 +118,42 @@ class UserSerializer(serializers.ModelSerializer):
             instance.roles.set(roles)
 
         return instance
+
+
+class RoleClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Login – the tokens also carry the user's role codes and vendor profile
+    (users.roles.role_claims), so safe requests can be authorized without the DB
+    (users.authentication.RoleClaimsJWTAuthentication).
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token.payload.update(role_claims(user))
+        return token
+
+
+class RoleClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh – the claims are read again from the DB,
+    so role / vendor changes show up in the new access token.
+    """
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+
+        user_id = RefreshToken(attrs['refresh'], verify=False).payload.get(jwt_settings.USER_ID_CLAIM)
+        user = User.objects.get(**{jwt_settings.USER_ID_FIELD: user_id})
+        claims = role_claims(user)
+
+        access = AccessToken(data['access'], verify=False)
+        access.payload.update(claims)
+        data['access'] = str(access)
+
+        if 'refresh' in data:
+            refresh = RefreshToken(data['refresh'], verify=False)
+            refresh.payload.update(claims)
+            data['refresh'] = str(refresh)
+
+        return data
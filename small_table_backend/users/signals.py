@@ -0,0 +1,57 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from vendors.models import VendorProfile
+from .authentication import invalidate_cached_user
+from .models import User, Role, UserRole
+from .roles import invalidate_role_context, clear_role_contexts
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # כל שמירה (סיסמה, is_active, is_staff...) – טעינה מחדש בבקשה הבאה
+    invalidate_cached_user(instance.pk)
+
+    # משתמש חדש לא יורש רשומה ישנה עם אותו id
+    if created:
+        invalidate_role_context(instance.pk)
+
+    # username / email מוצגים בפרופיל הספק – מקדמים את updated_at שלו (ETag של /api/vendors/)
+    elif update_fields is None or {'username', 'email'} & set(update_fields):
+        VendorProfile.objects.filter(user_id=instance.pk).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+@receiver(post_save, sender=VendorProfile)
+@receiver(post_delete, sender=VendorProfile)
+def user_roles_changed(sender, instance, **kwargs):
+    invalidate_role_context(instance.user_id)
+
+
+@receiver(m2m_changed, sender=User.roles.through)
+def user_roles_m2m_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # user.roles.add()/remove() עוקפים את ה-save של UserRole
+    if not action.startswith('post_'):
+        return
+
+    if not reverse:
+        invalidate_role_context(instance.pk)
+    elif pk_set:
+        for user_id in pk_set:
+            invalidate_role_context(user_id)
+    else:
+        clear_role_contexts()
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def role_changed(sender, instance, **kwargs):
+    # שינוי בתפקיד עצמו משפיע על כל המשתמשים שלו
+    clear_role_contexts()
@@ -1,3 +1,198 @@
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from api.cache import LRUCache
+from vendors.models import VendorProfile
+from .authentication import CachedJWTAuthentication, clear_cached_users, user_cache_stats
+from .models import User, Role, UserRole
+from .roles import get_role_context, clear_role_contexts
+
+
+class LRUCacheTests(TestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(len(cache), 2)
+
+    def test_ttl_expires_entries(self):
+        cache = LRUCache(maxsize=2, ttl=-1)
+        cache.set('a', 1)
+        self.assertIsNone(cache.get('a'))
+
+
+class RoleContextTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='someone', password='pass1234')
+        cls.admin_role = Role.objects.create(code=Role.ADMIN, name='admin')
+
+    def setUp(self):
+        clear_role_contexts()
+
+    def request(self):
+        request = RequestFactory().get('/')
+        request.user = User.objects.get(pk=self.user.pk)
+        return request
+
+    def test_resolved_once_per_request_and_cached_per_user(self):
+        request = self.request()
+        with CaptureQueriesContext(connection) as ctx:
+            context = get_role_context(request)
+            get_role_context(request)
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertFalse(context.is_admin)
+        self.assertFalse(context.is_vendor)
+
+        request = self.request()
+        with CaptureQueriesContext(connection) as ctx:
+            get_role_context(request)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_role_and_vendor_changes_invalidate_the_cache(self):
+        get_role_context(self.request())
+
+        UserRole.objects.create(user=self.user, role=self.admin_role)
+        context = get_role_context(self.request())
+        self.assertTrue(context.is_admin)
+        self.assertEqual(context.roles, {Role.ADMIN})
+
+        UserRole.objects.filter(user=self.user).delete()
+        self.assertFalse(get_role_context(self.request()).is_admin)
+
+        vendor = VendorProfile.objects.create(user=self.user, business_name='קייטרינג', is_active=True)
+        context = get_role_context(self.request())
+        self.assertEqual(context.vendor_id, vendor.id)
+        self.assertTrue(context.vendor_is_active)
+
+        self.user.roles.add(self.admin_role)
+        self.assertTrue(get_role_context(self.request()).is_admin)
+
+
+class RoleClaimsJWTTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='vendor', password='pass1234')
+        cls.vendor = VendorProfile.objects.create(user=cls.user, business_name='קייטרינג', is_active=True)
+        cls.admin_role = Role.objects.create(code=Role.ADMIN, name='admin')
+
+    def setUp(self):
+        clear_role_contexts()
+        clear_cached_users()
+        self.client = APIClient()
+
+    def login(self):
+        response = self.client.post(
+            '/api/auth/login/', {'username': 'vendor', 'password': 'pass1234'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_safe_requests_are_authorized_from_claims(self):
+        tokens = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.client.get('/api/orders/')
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/orders/')
+        self.assertEqual(response.status_code, 200)
+
+        # רק שאילתת ההזמנות עצמה – המשתמש מה-cache, בלי user_roles / vendor_profile
+        [query] = ctx.captured_queries
+        self.assertTrue(query['sql'].startswith('SELECT "orders_order"'))
+        self.assertIn(f'"orders_order"."vendor_id" = {self.vendor.id}', query['sql'])
+
+    def test_claims_user_owns_their_objects(self):
+        customer = User.objects.create_user(username='customer', password='pass1234')
+        response = self.client.post(
+            '/api/auth/login/', {'username': 'customer', 'password': 'pass1234'}, format='json'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+        response = self.client.get('/api/reviews/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.user.id, customer.id)
+
+    def test_revoked_users_cannot_read_with_claims(self):
+        tokens = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.assertEqual(self.client.get('/api/orders/').status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/orders/').status_code, 401)
+
+        self.user.is_active = True
+        self.user.set_password('new-pass1234')
+        self.user.save()
+        self.assertEqual(self.client.get('/api/orders/').status_code, 401)
+
+    def test_refresh_picks_up_role_changes(self):
+        tokens = self.login()
+        UserRole.objects.create(user=self.user, role=self.admin_role)
+
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+
+        access = AccessToken(response.data['access'])
+        self.assertEqual(access['roles'], [Role.ADMIN])
+        self.assertTrue(access['admin_role'])
+        self.assertEqual(access['vendor_id'], self.vendor.id)
+
+        # אדמין רואה את הדשבורד של כל הספקים
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        response = self.client.get(f'/api/orders/dashboard/?vendor={self.vendor.id}')
+        self.assertEqual(response.status_code, 200, response.data)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='someone', password='pass1234')
+
+    def setUp(self):
+        clear_cached_users()
+        self.token = AccessToken.for_user(self.user)
+
+    def get_user(self):
+        with CaptureQueriesContext(connection) as ctx:
+            user = CachedJWTAuthentication().get_user(self.token)
+        return user, len(ctx.captured_queries)
+
+    def test_user_is_loaded_once(self):
+        before = user_cache_stats()
+
+        first, queries = self.get_user()
+        self.assertEqual(queries, 1)
+
+        second, queries = self.get_user()
+        self.assertEqual(queries, 0)
+        self.assertEqual(second.pk, self.user.pk)
+        self.assertIsNot(first, second)
+
+        after = user_cache_stats()
+        self.assertEqual(after['hits'] - before['hits'], 1)
+        self.assertEqual(after['misses'] - before['misses'], 1)
+
+    def test_save_invalidates_the_cached_user(self):
+        self.get_user()
+
+        user = User.objects.get(pk=self.user.pk)
+        user.is_active = False
+        user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.get_user()
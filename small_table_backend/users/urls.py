@@ -4,6 +4,7 @@ from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 from .views import UserViewSet, RoleViewSet, UserRoleViewSet, RegisterView
+from .serializers import RoleClaimsTokenObtainPairSerializer, RoleClaimsTokenRefreshSerializer
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet, basename='user')
@@ -12,8 +13,16 @@ router.register(r'user-roles', UserRoleViewSet, basename='userrole')
 
 urlpatterns = [
     path('auth/register/', RegisterView.as_view(), name='register'),
-    path('auth/login/', TokenObtainPairView.as_view(), name='login'),
-    path('auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path(
+        'auth/login/',
+        TokenObtainPairView.as_view(serializer_class=RoleClaimsTokenObtainPairSerializer),
+        name='login',
+    ),
+    path(
+        'auth/token/refresh/',
+        TokenRefreshView.as_view(serializer_class=RoleClaimsTokenRefreshSerializer),
+        name='token_refresh',
+    ),
 ]
 
 # חשוב: לחבר את כל ה־router לתוך urlpatterns
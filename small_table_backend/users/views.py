@@ -1,7 +1,6 @@
 # users/views.py
 from rest_framework import viewsets, filters, generics
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from .models import User, Role, UserRole
 from .serializers import (
@@ -11,6 +10,8 @@ from .serializers import (
     RegisterSerializer,
 )
 from .permissions import IsAdmin, IsAdminOrSelf
+from .authentication import CachedJWTAuthentication
+from api.pagination import CatalogPageNumberPagination
 
 
 class RegisterView(generics.CreateAPIView):
@@ -37,9 +38,11 @@ class UserViewSet(viewsets.ModelViewSet):
         * partial_update → אדמין או המשתמש עצמו
     """
 
-    queryset = User.objects.all()
+    # roles של כל המשתמשים בעמוד – שאילתה אחת
+    queryset = User.objects.prefetch_related('roles')
     serializer_class = UserSerializer
-    authentication_classes = [JWTAuthentication]
+    # תמיד משתמש מלא מה-DB (דרך ה-cache) – לא משתמש מבוסס claims
+    authentication_classes = [CachedJWTAuthentication]
 
     filter_backends = [filters.OrderingFilter, filters.SearchFilter]
     ordering_fields = ["username", "email", "date_joined"]
@@ -64,7 +67,8 @@ class RoleViewSet(viewsets.ModelViewSet):
     """
     queryset = Role.objects.all()
     serializer_class = RoleSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
+    pagination_class = CatalogPageNumberPagination
 
     filter_backends = [filters.OrderingFilter, filters.SearchFilter]
     ordering_fields = ["name"]
@@ -82,7 +86,7 @@ class UserRoleViewSet(viewsets.ModelViewSet):
     """
     queryset = UserRole.objects.select_related("user", "role")
     serializer_class = UserRoleSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     filter_backends = [filters.OrderingFilter, filters.SearchFilter]
     ordering_fields = ["assigned_at"]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vendorprofile',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='גרסאות תמונה'),
+        ),
+    ]
@@ -45,6 +45,14 @@ class VendorProfile(models.Model):
         verbose_name='תמונה/לוגו'
     )
 
+    # גרסאות מוקטנות של image (api.images) – נבנות ברקע אחרי ההעלאה
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='גרסאות תמונה'
+    )
+
     is_active = models.BooleanField(
         default=False,
         verbose_name='פעיל במערכת'
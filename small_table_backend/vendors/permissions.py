@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from users.roles import get_role_context
+
 class IsVendorOwnerOrAdmin(permissions.BasePermission):
 
 #בדיקה ברמת האובייקט
@@ -7,15 +9,11 @@ class IsVendorOwnerOrAdmin(permissions.BasePermission):
 
         #  בדיקה 1: האם המשתמש הוא מנהל? (RBAC)
         if request.user and request.user.is_authenticated:
-            has_admin_role = request.user.user_roles.filter(
-                role__name='admin'
-            ).exists()
-
-            if has_admin_role:
+            if get_role_context(request).has_admin_role:
                 return True
 
         #  בדיקה 2: האם המשתמש הוא הבעלים? (Least Privilege)
-        if request.user and obj.user == request.user:
+        if request.user and obj.user_id == request.user.id:
             return True  # בעלים - מורשה לערוך את עצמו בלבד
 
         #  ברירת מחדל: אסור (Fail Secure)
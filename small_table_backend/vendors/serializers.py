@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from rest_framework.fields import CharField
 
+from api.images import ImageSrcsetField
 from .models import VendorProfile
 
 
@@ -12,6 +13,8 @@ class VendorProfileSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username',read_only=True )
     email = serializers.EmailField(source='user.email', read_only=True)
 
+    image_srcset = ImageSrcsetField()
+
     class Meta:
         model = VendorProfile
         fields = [
@@ -24,6 +27,7 @@ class VendorProfileSerializer(serializers.ModelSerializer):
             'kashrut_level',
             'address',
             'image',
+            'image_srcset',
             'is_active',
             'created_at',
             'updated_at',
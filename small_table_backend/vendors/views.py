@@ -1,4 +1,4 @@
-from rest_framework import viewsets, filters, status
+from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action
@@ -7,9 +7,12 @@ from django_filters.rest_framework import DjangoFilterBackend
 from .models import VendorProfile
 from .serializers import VendorProfileSerializer
 from .permissions import IsVendorOwnerOrAdmin
+from api.conditional import ConditionalGetMixin
+from api.search import FullTextSearchFilter, RankedOrderingFilter
+from users.roles import get_role_context
 
 
-class VendorProfileViewSet(viewsets.ModelViewSet):
+class VendorProfileViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
 
 
     queryset = VendorProfile.objects.select_related('user').all()
@@ -18,8 +21,8 @@ class VendorProfileViewSet(viewsets.ModelViewSet):
     # פילטרים, חיפוש ומיון
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        FullTextSearchFilter,
+        RankedOrderingFilter,
     ]
 
     search_fields = [
@@ -87,7 +90,7 @@ class VendorProfileViewSet(viewsets.ModelViewSet):
         user = request.user
 
         # אם כבר יש לו VendorProfile – לא ניצור שוב
-        if hasattr(user, 'vendor_profile'):
+        if get_role_context(request).is_vendor:
             return Response(
                 {"error": "כבר קיים פרופיל ספק עבור משתמש זה."},
                 status=status.HTTP_400_BAD_REQUEST